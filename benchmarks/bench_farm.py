@@ -0,0 +1,33 @@
+"""Measures how simulation farm throughput scales with the number of worker processes.
+
+Run from the repository root: python -m benchmarks.bench_farm [pets] [ticks]
+"""
+import os
+import sys
+import time
+
+from simulation.farm import SimulationFarm
+
+
+def measure(size, ticks, workers):
+    with SimulationFarm.create(size, workers=workers, seed=0) as farm:
+        # Keep every pet alive so each tick does the same amount of work
+        farm.batch.hunger[:] = farm.batch.health[:] = farm.batch.cleanliness[:] = 100
+        started = time.perf_counter()
+        for stats in farm.run(ticks):
+            pass
+        return size * stats['tick'] / (time.perf_counter() - started)
+
+
+def main(size=2000000, ticks=8):
+    single = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        rate = measure(size, ticks, workers)
+        single = single or rate
+        print(f"{workers:3d} workers {rate / 1e6:8.1f}M pet-ticks/s  speedup {rate / single:5.2f}x")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
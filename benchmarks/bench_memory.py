@@ -0,0 +1,94 @@
+"""Measures bytes per pet for the slotted Pet against the old __dict__-based layout.
+
+Run from the repository root: python -m benchmarks.bench_memory [pets]
+"""
+import gc
+import random
+import sys
+import tracemalloc
+
+from models.dog import Dog
+
+NAMES = ['Rex', 'Bella', 'Max', 'Luna', 'Charlie', 'Lucy', 'Cooper', 'Daisy']
+COLORS = ['brown', 'black', 'white', 'golden']
+PATTERNS = ['spotted', 'striped', 'plain']
+
+
+class Owner:
+    def update_status(self):
+        pass
+
+    def on_pet_death(self):
+        pass
+
+
+class LegacyDog:
+    """Replica of the attribute layout Dog had before Pet used __slots__."""
+
+    LIFE_STAGES = ['Baby', 'Child', 'Teenager', 'Adult', 'Senior']
+
+    def __init__(self, name, color, pattern, accessories, update_status_callback, game_over_callback, pet_type):
+        self.name = name
+        self.pet_type = pet_type
+        self.color = color
+        self.pattern = pattern
+        self.accessories = accessories
+        self.hunger = 50
+        self.happiness = 50
+        self.training = 0
+        self.health = 100
+        self.cleanliness = 100
+        self.age = 0
+        self.weight = 5
+        self.life_stage_index = 0
+        self.life_stage = self.LIFE_STAGES[self.life_stage_index]
+        self.alive = True
+        self.sick = False
+        self.update_status_callback = update_status_callback
+        self.game_over_callback = game_over_callback
+        self.game_over = False
+        self.notifier = None
+        self.saved_at = None
+        self.kennel_id = None
+        self.rng = random
+        self.journal = None
+        self.muted = False
+        self.favorite_toy = "Ball"
+
+
+def fresh(text):
+    # Text typed into an Entry arrives as a new string object for every pet
+    return ''.join(list(text))
+
+
+def bytes_per_pet(pet_class, count, owner=None):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    pets = []
+    for i in range(count):
+        pet = pet_class(fresh(NAMES[i % len(NAMES)]), fresh(COLORS[i % len(COLORS)]),
+                        fresh(PATTERNS[i % len(PATTERNS)]), fresh('collar'),
+                        owner and owner.update_status, owner and owner.on_pet_death, fresh('dog'))
+        pet.weight += 0.5
+        pets.append(pet)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # Don't count the list holding the pets
+    return (used - sys.getsizeof(pets)) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    # Simulated populations have no UI callbacks; a pet shown in the game has both
+    for label, owner in (("headless", None), ("with UI callbacks", Owner())):
+        legacy = bytes_per_pet(LegacyDog, count, owner)
+        slotted = bytes_per_pet(Dog, count, owner)
+        print(label)
+        print(f"  {'legacy __dict__ pet':<22}{legacy:8.0f} bytes/pet")
+        print(f"  {'slotted pet':<22}{slotted:8.0f} bytes/pet")
+        print(f"  {'reduction':<22}{legacy / slotted:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Compares save/load latency and size of the binary save format with the old pickle path.
+
+Run from the repository root: python -m benchmarks.bench_save
+"""
+import os
+import pickle
+import tempfile
+import timeit
+
+from helpers.savegame import decode_pet, encode_pet, load_pet, save_pet
+from models.dog import Dog
+
+ROUNDS = 200
+
+
+def bench(label, func):
+    seconds = min(timeit.repeat(func, number=ROUNDS, repeat=3)) / ROUNDS
+    print(f"{label:<28}{seconds * 1e6:10.1f} us")
+
+
+def main():
+    pet = Dog("Rex", "brown", "spotted", "collar,bell", None, None, "dog")
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, 'saved_game.pkl')
+        save_path = os.path.join(directory, 'saved_game.sav')
+
+        def pickle_save():
+            with open(pickle_path, 'wb') as f:
+                pickle.dump(pet, f)
+
+        def pickle_load():
+            with open(pickle_path, 'rb') as f:
+                pickle.load(f)
+
+        pickle_save()
+        save_pet(pet, save_path)
+        bench("pickle save", pickle_save)
+        bench("pickle load", pickle_load)
+        bench("binary save (fsync+rename)", lambda: save_pet(pet, save_path))
+        bench("binary load", lambda: load_pet(save_path, legacy_path=pickle_path))
+        bench("binary encode", lambda: encode_pet(pet))
+        blob = encode_pet(pet)
+        bench("binary decode", lambda: decode_pet(blob))
+        print(f"{'pickle size':<28}{os.path.getsize(pickle_path):10d} bytes")
+        print(f"{'binary size':<28}{os.path.getsize(save_path):10d} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Load-tests the pet service with many concurrent WebSocket clients.
+
+Starts `game.server` in a child process on a scratch kennel, connects `clients`
+WebSockets that each create a pet and then send a random command every
+`period` seconds, and reports command latency percentiles.
+
+Run from the repository root: python -m benchmarks.load_test [--clients 10000] [--duration 30] [--period 5]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from game.server import OP_TEXT, encode_frame, raise_open_file_limit, read_frame
+
+CONNECT_CONCURRENCY = 200
+COMMANDS = [
+    {'command': 'feed', 'food_type': 'meal'},
+    {'command': 'feed', 'food_type': 'snack'},
+    {'command': 'sleep'},
+    {'command': 'exercise'},
+    {'command': 'clean'},
+    {'command': 'play', 'guess': '3'},
+    {'command': 'special_ability'},
+]
+
+
+class Client:
+    def __init__(self, host, port, results):
+        self.host = host
+        self.port = port
+        self.results = results
+        self.pending = {}
+        self.next_id = 0
+        self.pet_id = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        self.writer.write((f'GET /ws HTTP/1.1\r\nHost: {self.host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                           f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n').encode('ascii'))
+        await self.reader.readuntil(b'\r\n\r\n')
+        self.listener = asyncio.create_task(self.listen())
+        reply = await self.request({'op': 'create', 'pet': {'name': f"Pet{id(self)}", 'pet_type': 'dog'}})
+        self.pet_id = reply['status']['id']
+
+    async def listen(self):
+        try:
+            while True:
+                opcode, payload = await read_frame(self.reader, require_mask=False)
+                if opcode != OP_TEXT:
+                    continue
+                message = json.loads(payload)
+                if 'event' in message:
+                    self.results['pushes'] += 1
+                else:
+                    self.pending.pop(message['id']).set_result(message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def request(self, message):
+        self.next_id += 1
+        message['id'] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        self.writer.write(encode_frame(json.dumps(message), mask=True))
+        return await future
+
+    async def run(self, deadline, period):
+        await asyncio.sleep(random.uniform(0, period))
+        while time.monotonic() < deadline:
+            command = dict(random.choice(COMMANDS), op='command', pet_id=self.pet_id)
+            started = time.perf_counter()
+            reply = await self.request(command)
+            self.results['latencies'].append(time.perf_counter() - started)
+            if not reply['ok']:
+                self.results['errors'] += 1
+            await asyncio.sleep(period)
+
+    def close(self):
+        self.listener.cancel()
+        self.writer.close()
+
+
+async def load_test(host, port, clients, duration, period):
+    results = {'latencies': [], 'errors': 0, 'pushes': 0}
+    connected = []
+    gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def connect():
+        async with gate:
+            client = Client(host, port, results)
+            await client.connect()
+            connected.append(client)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connect() for _ in range(clients)))
+    print(f"{len(connected)} clients connected with a pet each in {time.perf_counter() - started:.1f} s")
+
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(client.run(deadline, period) for client in connected))
+    for client in connected:
+        client.close()
+    return results
+
+
+def report(results, duration):
+    latencies = sorted(results['latencies'])
+    if not latencies:
+        print("No commands completed.")
+        return
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(latencies)} commands in {duration} s ({len(latencies) / duration:.0f}/s), "
+          f"{results['errors']} errors, {results['pushes']} pushes received")
+    print(f"latency ms: p50 {percentiles[49] * 1000:.2f}  p95 {percentiles[94] * 1000:.2f}  "
+          f"p99 {percentiles[98] * 1000:.2f}  max {latencies[-1] * 1000:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the pet service.")
+    parser.add_argument('--clients', type=int, default=10000)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--period', type=float, default=5, help="seconds between commands of one client")
+    args = parser.parse_args()
+    raise_open_file_limit()
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = subprocess.Popen([sys.executable, '-m', 'game.server', '--port', '0',
+                                   '--kennel', os.path.join(directory, 'kennel.db')],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            line = server.stdout.readline()  # "Serving on http://host:port"
+            host, port = line.strip().rsplit('/', 1)[-1].split(':')
+            results = asyncio.run(load_test(host, int(port), args.clients, args.duration, args.period))
+        finally:
+            server.terminate()
+            server.wait()
+    report(results, args.duration)
+
+
+if __name__ == '__main__':
+    main()
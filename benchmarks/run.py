@@ -0,0 +1,286 @@
+"""Headless benchmark suite for the tick, command, persistence and startup hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run                    # print results, compare with benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline    # record this machine's results as the baseline
+    python -m benchmarks.run --json out.json    # also write the results to a file
+
+Dialogs are stubbed and SDL uses its dummy audio driver, so no display or sound
+card is needed. The exit status is 1 if any result is worse than the baseline by
+more than the tolerance, and 2 if there is no baseline to compare with.
+
+Timings only compare meaningfully on the same machine, so no baseline is
+committed: record one with `--save-baseline` on the machine that runs the
+comparisons, and point `--baseline PATH` at it if it lives somewhere else.
+"""
+import os
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import json
+import pickle
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tkinter
+from tkinter import messagebox, simpledialog
+
+import numpy as np
+
+from game.commands import (CleanCommand, ExerciseCommand, FeedCommand, PlayCommand, SleepCommand,
+                           SpecialAbilityCommand)
+from helpers.kennel import KennelStore
+from helpers.savegame import decode_pet, encode_pet, load_pet, save_pet
+from helpers.sound import audio
+from models.dog import Dog
+from models.events import Event, EventTable
+from simulation.batch import PetBatch
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+TOLERANCE = 0.5  # allowed relative slowdown before a timing counts as a regression; sizes get none
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS = ('sounds', 'images', 'dog.jpeg', 'cat.jpeg')
+
+COMMANDS = {
+    'feed': FeedCommand,
+    'sleep': SleepCommand,
+    'exercise': ExerciseCommand,
+    'play': PlayCommand,
+    'clean': CleanCommand,
+    'special_ability': SpecialAbilityCommand,
+}
+
+# Runs in a fresh interpreter, mirroring main.py up to the first idle frame
+COLD_START = """
+import os, sys, time, json
+started = time.perf_counter()
+import tkinter as tk
+from game.game_manger import GameManager
+imported = time.perf_counter()
+result = {'imports': imported - started}
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    result['skipped'] = str(e)
+else:
+    root.withdraw()
+    before = time.perf_counter()
+    manager = GameManager(root)
+    root.update_idletasks()
+    result['game_manager_init'] = time.perf_counter() - before
+    manager.autosaver.close()
+print(json.dumps(result))
+"""
+
+
+def stub_dialogs():
+    """Replaces every blocking dialog with an instant answer."""
+    for name in ('showinfo', 'showwarning', 'showerror'):
+        setattr(messagebox, name, lambda *args, **kwargs: 'ok')
+    simpledialog.askstring = lambda *args, **kwargs: '1'
+
+
+def make_pet(pet_class=Dog):
+    return pet_class("Rex", "brown", "spotted", "collar,bell", None, None, pet_class.__name__.lower())
+
+
+def per_call(func, number, repeat=5):
+    """Best-of-`repeat` seconds per call, to keep scheduler noise out of the numbers."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def bench_update_meters(results):
+    for size in (1, 1000):
+        pets = [make_pet() for _ in range(size)]
+
+        def update_all():
+            for pet in pets:
+                pet.update_meters()
+        seconds = per_call(update_all, number=max(1, 10000 // size))
+        results[f'update_meters.scalar.{size}'] = (size / seconds, 'pets/s', 'higher')
+
+    # A million Pet objects don't fit the scalar loop; the batch engine is the 1M path
+    for size in (1, 1000, 1000000):
+        batch = PetBatch.create(size, rng=np.random.default_rng(0))
+        seconds = per_call(batch.tick, number=max(1, 10000 // size), repeat=3)
+        results[f'update_meters.batch.{size}'] = (size / seconds, 'pets/s', 'higher')
+
+
+def bench_commands(results):
+    pet = make_pet()
+    for name, command_class in COMMANDS.items():
+        # The guess is given up front; asking for it would open a dialog
+        command = command_class(pet, guess='1') if name == 'play' else command_class(pet)
+        samples = []
+        for _ in range(200):
+            # Reset outside the timed region so the pet never dies or levels up mid-run
+            pet.hunger, pet.happiness, pet.health, pet.cleanliness = 50, 50, 100, 100
+            pet.life_stage_index, pet.alive, pet.sick = 2, True, False
+            started = time.perf_counter()
+            command.execute()
+            samples.append(time.perf_counter() - started)
+        samples = samples[20:]  # first calls decode sounds
+        results[f'command.{name}.median'] = (statistics.median(samples) * 1e6, 'us', 'lower')
+        results[f'command.{name}.p95'] = (statistics.quantiles(samples, n=20)[-1] * 1e6, 'us', 'lower')
+
+
+def bench_events(results):
+    # Alias sampling costs the same whatever the number of event types
+    rng = random.Random(0)
+    for count in (4, 4096):
+        table = EventTable([Event(f"event {i}", weight=1 + i % 7) for i in range(count)], odds=5)
+        results[f'events.pick.{count}'] = (per_call(lambda: table.pick(rng), number=100000) * 1e9, 'ns', 'lower')
+
+
+def bench_status(results):
+    pet = make_pet()
+    results['status.format'] = (per_call(pet.status, number=20000) * 1e6, 'us', 'lower')
+    results['status.fields'] = (per_call(pet.status_fields, number=20000) * 1e6, 'us', 'lower')
+
+
+def bench_persistence(results):
+    pet = make_pet()
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, 'saved_game.pkl')
+        save_path = os.path.join(directory, 'saved_game.sav')
+
+        def pickle_round_trip():
+            with open(pickle_path, 'wb') as f:
+                pickle.dump(pet, f)
+            with open(pickle_path, 'rb') as f:
+                pickle.load(f)
+
+        results['save.pickle.round_trip'] = (per_call(pickle_round_trip, number=200) * 1e6, 'us', 'lower')
+        results['save.pickle.size'] = (os.path.getsize(pickle_path), 'bytes', 'lower')
+
+        def binary_round_trip():
+            save_pet(pet, save_path)
+            load_pet(save_path, legacy_path=pickle_path + '.missing')
+
+        results['save.binary.round_trip'] = (per_call(binary_round_trip, number=200) * 1e6, 'us', 'lower')
+        results['save.binary.size'] = (os.path.getsize(save_path), 'bytes', 'lower')
+        blob = encode_pet(pet)
+        results['save.binary.encode'] = (per_call(lambda: encode_pet(pet), number=5000) * 1e6, 'us', 'lower')
+        results['save.binary.decode'] = (per_call(lambda: decode_pet(blob), number=5000) * 1e6, 'us', 'lower')
+
+        kennel = KennelStore(os.path.join(directory, 'kennel.db'))
+        kennel.add(pet)
+
+        def kennel_round_trip():
+            kennel.save(pet)
+            kennel.load(pet.kennel_id)
+
+        results['save.kennel.round_trip'] = (per_call(kennel_round_trip, number=200) * 1e6, 'us', 'lower')
+        kennel.close()
+
+
+def bench_cold_start(results):
+    """Launches a fresh interpreter in a scratch directory, so nothing is cached yet."""
+    with tempfile.TemporaryDirectory() as directory:
+        for asset in ASSETS:
+            os.symlink(os.path.join(ROOT, asset), os.path.join(directory, asset))
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', COLD_START], cwd=directory, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        total = time.perf_counter() - started
+    report = json.loads(output.strip().splitlines()[-1])
+    results['cold_start.imports'] = (report['imports'] * 1000, 'ms', 'lower')
+    if 'game_manager_init' in report:
+        results['cold_start.game_manager_init'] = (report['game_manager_init'] * 1000, 'ms', 'lower')
+        results['cold_start.process'] = (total * 1000, 'ms', 'lower')
+
+
+def display_available():
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        return False
+    root.destroy()
+    return True
+
+
+def run():
+    stub_dialogs()
+    audio.start(preload=False)
+    audio.ready.wait()
+    has_display = display_available()
+    results = {}
+    bench_update_meters(results)
+    bench_commands(results)
+    bench_events(results)
+    bench_status(results)
+    bench_persistence(results)
+    bench_cold_start(results)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'display': has_display,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {name: {'value': value, 'unit': unit, 'better': better}
+                    for name, (value, unit, better) in results.items()},
+    }
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Returns a line per result plus the names of the ones that regressed."""
+    lines, regressions = [], []
+    for name, result in report['results'].items():
+        value = result['value']
+        line = f"{name:<36}{value:14.2f} {result['unit']:<7}"
+        previous = baseline['results'].get(name) if baseline else None
+        if previous:
+            change = value / previous['value'] - 1 if previous['value'] else 0.0
+            allowed = 0.0 if result['unit'] == 'bytes' else tolerance
+            worse = change > allowed if result['better'] == 'lower' else change < -allowed
+            line += f"{change:+8.1%}"
+            if worse:
+                line += "  REGRESSION"
+                regressions.append(name)
+        lines.append(line)
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    report = run()
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    lines, regressions = compare(report, baseline, args.tolerance)
+    print("\n".join(lines))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        sys.exit(2)
+    elif regressions:
+        print(f"{len(regressions)} result(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
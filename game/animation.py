@@ -0,0 +1,160 @@
+import glob
+import math
+import os
+import time
+import tkinter as tk
+
+from helpers.images import SPRITE_SIZE, sprites
+
+FPS = 20
+ACTIVITY_MS = 2500  # how long an activity shows after its command ran, before going back to idle
+FRAMES_PER_SECOND_OF_SPRITES = 4  # how fast multi-frame activities flip between sprite frames
+OVERLAY = os.environ.get('TAMAGOTCHI_FPS_OVERLAY', '').lower() in ('1', 'true', 'yes', 'on')
+CANVAS_SIZE = (220, 190)
+
+# activity -> (bob amplitude in pixels, seconds per bob, bounce instead of sway)
+MOTIONS = {
+    'idle': (3, 2.0, False),
+    'play': (14, 0.5, True),
+    'eat': (5, 0.35, False),
+    'sleep': (2, 3.0, False),
+}
+# Mood from Pet.get_mood -> how lively the pet moves
+MOOD_SPEED = {'happy': 1.4, 'neutral': 1.0, 'sad': 0.6}
+# Activities without sprites of their own borrow another one's frames
+FALLBACKS = {'eat': 'idle', 'play': 'idle', 'sleep': 'idle'}
+
+
+def sprite_sources(pet_type, activity):
+    """The sprite files for one activity, e.g. images/dog_play1.png, images/dog_play2.png..."""
+    return sorted(path.replace(os.sep, '/') for path in glob.glob(f'images/{pet_type}_{activity}*.png'))
+
+
+class PetAnimation:
+    """Animates the pet's sprite on a canvas at a fixed frame rate from the Tk event loop.
+
+    Frames are scheduled against a fixed timeline with `after`. When the loop
+    falls behind, missed frames are dropped instead of queued, and since the
+    motion is a function of time, the pet just jumps to where it should be.
+    Canvas items are created once; a frame only moves or re-images them when
+    their position or sprite actually changed, so Tk only repaints those
+    regions. Sprites come from the shared atlas and are never decoded here.
+    """
+
+    def __init__(self, canvas, pet, fps=FPS, overlay=OVERLAY):
+        self.canvas = canvas
+        self.pet = pet
+        self.period = 1 / fps
+        self.center = (CANVAS_SIZE[0] // 2, CANVAS_SIZE[1] // 2 + 10)
+        self.sprite = canvas.create_image(*self.center)
+        self.zzz = canvas.create_text(self.center[0] + 60, self.center[1] - 70, text="", font=("Helvetica", 14, "bold"),
+                                      fill="#5d6d7e")
+        self.overlay = canvas.create_text(4, 4, text="", anchor='nw', font=("Courier", 9),
+                                          state=tk.NORMAL if overlay else tk.HIDDEN)
+        self.frames = {}  # activity -> [PhotoImage]
+        self.activity = 'idle'
+        self.activity_until = 0.0
+        self.mood = 'neutral'
+        self.shown = {}  # what is on the canvas right now: image, offset, zzz text
+        self.job = None
+        self.due = 0.0
+        self.started = 0.0
+        self.stats = {'frames': 0, 'dropped': 0, 'frame_seconds': 0.0, 'max_frame_seconds': 0.0}
+        self._overlay_at = 0.0
+
+    def start(self):
+        if self.job is None:
+            self.started = self.due = time.perf_counter()
+            self._frame()
+
+    def stop(self):
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+
+    def toggle_overlay(self, event=None):
+        hidden = self.canvas.itemcget(self.overlay, 'state') == tk.HIDDEN
+        self.canvas.itemconfig(self.overlay, state=tk.NORMAL if hidden else tk.HIDDEN)
+
+    def show(self, activity):
+        """Plays `activity` for a while, e.g. 'eat' right after a feed."""
+        if activity in MOTIONS:
+            self.activity = activity
+            self.activity_until = time.perf_counter() + ACTIVITY_MS / 1000
+
+    def set_mood(self, mood):
+        self.mood = mood
+
+    def set_pet(self, pet):
+        """Reuses the animation for another pet; the canvas items stay and just get its sprites."""
+        self.pet = pet
+        self.frames = {}
+        self.activity = 'idle'
+        self.mood = 'neutral'
+
+    def _frame(self):
+        now = time.perf_counter()
+        behind = now - self.due
+        if behind >= self.period:
+            # Skip the frames we're too late for rather than rendering them back to back
+            missed = int(behind // self.period)
+            self.stats['dropped'] += missed
+            self.due += missed * self.period
+        self.due += self.period
+        self.job = self.canvas.after(max(1, int((self.due - now) * 1000)), self._frame)
+
+        self.draw(now)
+        elapsed = time.perf_counter() - now
+        self.stats['frames'] += 1
+        self.stats['frame_seconds'] += elapsed
+        self.stats['max_frame_seconds'] = max(self.stats['max_frame_seconds'], elapsed)
+        if self.canvas.itemcget(self.overlay, 'state') != tk.HIDDEN and now - self._overlay_at >= 0.25:
+            self._overlay_at = now
+            self.draw_overlay(now)
+
+    def frames_for(self, activity):
+        frames = self.frames.get(activity)
+        if frames is None:
+            sources = sprite_sources(self.pet.pet_type, activity)
+            if not sources and activity in FALLBACKS:
+                frames = self.frames_for(FALLBACKS[activity])
+            else:
+                frames = [sprites.photo(source, SPRITE_SIZE) for source in sources]
+            self.frames[activity] = frames
+        return frames
+
+    def draw(self, now):
+        if not sprites.loaded:
+            return  # the atlas is still decoding on its preload thread
+        if self.activity != 'idle' and now >= self.activity_until:
+            self.activity = 'idle'
+        activity = 'sleep' if not self.pet.alive else self.activity
+        frames = self.frames_for(activity)
+        if not frames:
+            return
+        seconds = now - self.started
+        image = frames[int(seconds * FRAMES_PER_SECOND_OF_SPRITES) % len(frames)]
+
+        amplitude, period, bounce = MOTIONS[activity]
+        phase = math.sin(2 * math.pi * seconds * MOOD_SPEED.get(self.mood, 1.0) / period)
+        offset = -round(amplitude * abs(phase)) if bounce else round(amplitude * phase)
+        zzz = "z" * (1 + int(seconds) % 3) if activity == 'sleep' else ""
+
+        # Only touch the items that changed, so Tk only repaints their regions
+        if self.shown.get('image') is not image:
+            self.shown['image'] = image
+            self.canvas.itemconfig(self.sprite, image=image)
+        if self.shown.get('offset', 0) != offset:
+            self.canvas.move(self.sprite, 0, offset - self.shown.get('offset', 0))
+            self.shown['offset'] = offset
+        if self.shown.get('zzz', "") != zzz:
+            self.shown['zzz'] = zzz
+            self.canvas.itemconfig(self.zzz, text=zzz)
+
+    def draw_overlay(self, now):
+        frames = self.stats['frames']
+        mean = self.stats['frame_seconds'] / frames * 1000 if frames else 0.0
+        running = max(now - self.started, 1e-9)
+        self.canvas.itemconfig(self.overlay, text=(
+            f"{frames / running:4.1f} fps  {mean:.2f} ms avg  {self.stats['max_frame_seconds'] * 1000:.2f} ms max\n"
+            f"{self.stats['dropped']} dropped  {self.activity}/{self.mood}"))
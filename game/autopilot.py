@@ -0,0 +1,170 @@
+"""Autopilot: picks a care command for a pet every tick from a precomputed table.
+
+The table comes from an offline value iteration solve (`simulation.care_solver`)
+over pet states discretized to STEP-wide buckets per meter plus the sick flag.
+Each species gets one byte per state holding the index of the best action in
+ACTIONS, so choosing a command at runtime is one index into a bytes object and
+needs neither numpy nor the solver.
+
+Every species table is stored with a fingerprint of the rules it was solved
+for: the Pet tuning constants, the species' events and data file entry, the
+solver settings, and what the rules actually do to a spread of probe states
+(see `probe_rules`). Editing code without changing what it does keeps the
+table. A table whose fingerprint no longer matches is stale and gets rebuilt,
+if numpy is available to rebuild it.
+"""
+import hashlib
+import itertools
+import json
+import os
+import random
+import struct
+
+from game.commands import CleanCommand, ExerciseCommand, FeedCommand, PlayCommand, SleepCommand, \
+    SpecialAbilityCommand
+from models.species import registry
+
+TABLE_FILE = 'autopilot.bin'
+STEP = 10  # meter bucket width
+LEVELS = 100 // STEP + 1
+STATES = LEVELS ** 4 * 2  # hunger x happiness x health x cleanliness x sick
+GAMMA = 0.97  # discount per tick
+HAPPINESS_WEIGHT = 0.5  # reward per tick alive is 1 + HAPPINESS_WEIGHT * happiness / 100
+
+# Index in the table -> (action name, command class, command arguments). Index 0 means do nothing.
+ACTIONS = (
+    ('wait', None, {}),
+    ('feed_meal', FeedCommand, {'food_type': 'meal'}),
+    ('feed_snack', FeedCommand, {'food_type': 'snack'}),
+    ('sleep', SleepCommand, {}),
+    ('exercise', ExerciseCommand, {}),
+    ('clean', CleanCommand, {}),
+    ('play', PlayCommand, {'guess': '1'}),
+    ('special_ability', SpecialAbilityCommand, {}),
+)
+PET_CLASSES = registry.classes()
+
+# Everything the solve depends on, hashed into each table's fingerprint
+RULE_CONSTANTS = ('HUNGER_DECAY', 'HAPPINESS_DECAY', 'CLEANLINESS_DECAY', 'HEALTH_DECAY', 'SICKNESS_THRESHOLD',
+                  'SICKNESS_DAMAGE')
+PROBE_VALUES = (0, 50, 95)  # meter values probed, both sides of every clamp
+
+MAGIC = b'TPAP'
+HEADER = struct.Struct('<4sBBB')  # magic, step, levels, number of species tables
+ENTRY = struct.Struct('<8s32s')  # species name, rules fingerprint; followed by STATES action bytes
+
+
+def probe_rules(pet_class):
+    """Meters after every action and after a seeded tick, from every combination of PROBE_VALUES.
+
+    A few hundred command runs, so it's cheap enough to check on every load.
+    """
+    pet = pet_class("Probe", "", "", "", None, None, pet_class.SPECIES.name)
+    pet.muted = True
+    pet.notifier = lambda kind, title, message: None
+    outcomes = []
+    states = itertools.product(PROBE_VALUES, PROBE_VALUES, PROBE_VALUES, PROBE_VALUES, (False, True))
+    for state, (hunger, happiness, health, cleanliness, sick) in enumerate(states):
+        for _, command_class, kwargs in ACTIONS:
+            pet.hunger, pet.happiness, pet.health, pet.cleanliness = hunger, happiness, health, cleanliness
+            pet.sick, pet.alive, pet.rng = sick, True, random.Random(state)
+            if command_class is None:
+                pet.tick()  # 'wait' is followed by nothing but the tick
+            else:
+                command_class(pet, **kwargs).execute()
+            outcomes.append((pet.hunger, pet.happiness, pet.health, pet.cleanliness, pet.sick, pet.alive))
+    return outcomes
+
+
+def fingerprint(pet_class):
+    """Hash of the rules and solver settings a table for `pet_class` depends on."""
+    rules = {
+        'constants': {name: getattr(pet_class, name) for name in RULE_CONSTANTS},
+        'probes': probe_rules(pet_class),
+        'events': pet_class.EVENTS.to_dict(),
+        'species': pet_class.SPECIES.data,
+        'solver': [STEP, GAMMA, HAPPINESS_WEIGHT, [action[0] for action in ACTIONS]],
+    }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode('utf-8')).digest()
+
+
+def level(value):
+    """The bucket a meter value falls in, rounding to the nearest one."""
+    return min(LEVELS - 1, max(0, (int(value) + STEP // 2) // STEP))
+
+
+def state_index(hunger, happiness, health, cleanliness, sick):
+    return (((level(hunger) * LEVELS + level(happiness)) * LEVELS + level(health)) * LEVELS
+            + level(cleanliness)) * 2 + bool(sick)
+
+
+def read_tables(path=TABLE_FILE):
+    """Species -> (fingerprint, table bytes) for every table in the file. Empty if there is no usable file."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    if len(data) < HEADER.size:
+        return {}
+    magic, step, levels, count = HEADER.unpack_from(data)
+    if magic != MAGIC or step != STEP or levels != LEVELS:
+        return {}
+    tables, offset = {}, HEADER.size
+    for _ in range(count):
+        if offset + ENTRY.size + STATES > len(data):
+            break
+        name, digest = ENTRY.unpack_from(data, offset)
+        offset += ENTRY.size
+        tables[name.rstrip(b'\0').decode('ascii')] = (digest, data[offset:offset + STATES])
+        offset += STATES
+    return tables
+
+
+def write_tables(tables, path=TABLE_FILE):
+    out = bytearray(HEADER.pack(MAGIC, STEP, LEVELS, len(tables)))
+    for species, (digest, table) in sorted(tables.items()):
+        out += ENTRY.pack(species.encode('ascii'), digest) + table
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(out)
+    os.replace(tmp_path, path)
+
+
+class Autopilot:
+    """Chooses the precomputed best command for a pet's current state."""
+
+    def __init__(self, tables):
+        self.tables = tables  # species -> table bytes
+
+    @classmethod
+    def load(cls, path=TABLE_FILE, rebuild=True):
+        """Loads the tables that match the current rules, solving stale or missing ones again if `rebuild`."""
+        stored = read_tables(path)
+        tables = {species: table for species, (digest, table) in stored.items()
+                  if species in PET_CLASSES and digest == fingerprint(PET_CLASSES[species])}
+        if rebuild and len(tables) < len(PET_CLASSES):
+            try:
+                from simulation.care_solver import build_tables
+            except ImportError as e:
+                print(f"Autopilot tables are out of date and can't be rebuilt: {e}")
+            else:
+                tables = {species: table for species, (_, table) in build_tables(path).items()}
+        return cls(tables)
+
+    def available(self, pet):
+        return pet.pet_type in self.tables
+
+    def action(self, pet):
+        """The ACTIONS entry for `pet`'s current state."""
+        table = self.tables[pet.pet_type]
+        return ACTIONS[table[state_index(pet.hunger, pet.happiness, pet.health, pet.cleanliness, pet.sick)]]
+
+    def choose(self, pet):
+        """The command to run on `pet` before its next tick, or None when it's best to leave it alone."""
+        if not pet.alive or not self.available(pet):
+            return None
+        _, command_class, kwargs = self.action(pet)
+        if command_class is None:
+            return None
+        return command_class(pet, **kwargs)
@@ -0,0 +1,133 @@
+import time
+from collections import defaultdict
+
+from game.commands import MacroCommand
+
+FLUSH_MS = 50  # commands submitted within one window are merged and run together
+
+
+class CommandStats:
+    __slots__ = ('executed', 'merged', 'dropped', 'failed', 'total_seconds', 'max_seconds')
+
+    def __init__(self):
+        self.executed = self.merged = self.dropped = self.failed = 0
+        self.total_seconds = self.max_seconds = 0.0
+
+    def as_dict(self):
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats['mean_seconds'] = self.total_seconds / self.executed if self.executed else 0.0
+        return stats
+
+
+class CommandBus:
+    """Queues commands and runs them in batches from the Tk event loop.
+
+    Dialog input is collected by `Command.prepare` when a command is submitted,
+    so the flush itself never blocks. Consecutive repeatable commands for the
+    same pet are merged before running, e.g. three feeds become one feed with
+    `times=3`. Macros are expanded so their steps merge like any other command.
+    Without a `root` nothing is scheduled and `flush` must be called directly.
+    `on_execute` is called with each command after it ran.
+    """
+
+    def __init__(self, root=None, flush_ms=FLUSH_MS, on_execute=None):
+        self.root = root
+        self.flush_ms = flush_ms
+        self.on_execute = on_execute
+        self.queue = []
+        self.max_depth = 0
+        self.flushes = 0
+        self.stats = defaultdict(CommandStats)
+        self._after_id = None
+
+    def __len__(self):
+        return len(self.queue)
+
+    @property
+    def depth(self):
+        return len(self.queue)
+
+    def submit(self, command):
+        """Prepares and queues a command. Returns False if it was cancelled while preparing."""
+        if not command.prepare():
+            return False
+        self._enqueue(command)
+        self.max_depth = max(self.max_depth, len(self.queue))
+        if self.root is not None and self._after_id is None:
+            self._after_id = self.root.after(self.flush_ms, self.flush)
+        return True
+
+    def _enqueue(self, command):
+        if isinstance(command, MacroCommand):
+            for step in command.commands:
+                self._enqueue(step)
+        else:
+            self.queue.append(command)
+
+    def merged_queue(self):
+        """The queue with every command merged into the previous one for the same pets when possible."""
+        merged = []
+        latest = {}  # id(pet) -> index in `merged` of the last command touching that pet
+        for command in self.queue:
+            pet_ids = [id(pet) for pet in command.targets()]
+            indexes = {latest.get(pet_id) for pet_id in pet_ids}
+            if len(indexes) == 1 and None not in indexes:
+                index = indexes.pop()
+                combined = merged[index].merge(command)
+                if combined is not None:
+                    merged[index] = combined
+                    continue
+            for pet_id in pet_ids:
+                latest[pet_id] = len(merged)
+            merged.append(command)
+        return merged
+
+    def flush(self):
+        """Runs everything queued so far. Commands for pets that died in the meantime are dropped.
+
+        A command that raises is counted as failed and the rest still run.
+        """
+        self._cancel()
+        commands = self.merged_queue()
+        for command in self.queue:
+            self.stats[type(command).__name__].merged += 1
+        for command in commands:
+            self.stats[type(command).__name__].merged -= 1
+        self.queue = []
+        self.flushes += 1
+        for command in commands:
+            stats = self.stats[type(command).__name__]
+            if not any(pet.alive for pet in command.targets()):
+                stats.dropped += 1
+                continue
+            started = time.perf_counter()
+            try:
+                command.execute()
+            except Exception as e:
+                stats.failed += 1
+                print(f"Error running {type(command).__name__}: {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            stats.executed += 1
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            if self.on_execute is not None:
+                self.on_execute(command)
+
+    def clear(self):
+        self.queue = []
+        self._cancel()
+
+    def _cancel(self):
+        # Harmless when the pending flush is the one running right now
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def metrics(self):
+        return {
+            'depth': len(self.queue),
+            'max_depth': self.max_depth,
+            'flushes': self.flushes,
+            'commands': {name: stats.as_dict() for name, stats in self.stats.items()},
+        }
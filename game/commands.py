@@ -1,56 +1,116 @@
 from abc import ABC, abstractmethod
-import tkinter as tk
-from tkinter import messagebox, simpledialog
+import copy
+
+from helpers.metrics import timed
 
 
 class Command(ABC):
+    INPUTS = ()  # constructor arguments that prepare() may fill in from a dialog
+    ACTIVITY = None  # what the pet animation shows while this runs, see game.animation
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'execute' in cls.__dict__:
+            cls.execute = timed(f'command.{cls.__name__}')(cls.execute)
+
     @abstractmethod
     def execute(self):
         pass
 
-class FeedCommand(Command):
-    def __init__(self, pet):
+    def prepare(self):
+        """Asks for any input up front, before the command is queued. Returns False to drop it."""
+        return True
+
+    def merge(self, other):
+        """Returns one command with the effect of running self then `other`, or None if they don't combine."""
+        return None
+
+    def targets(self):
+        return [self.pet]
+
+class RepeatableCommand(Command):
+    """A command whose repeats on the same pet collapse into one call with `times`."""
+
+    def __init__(self, pet, times=1):
         self.pet = pet
+        self.times = times
 
-    def execute(self):
-        food_choice = tk.simpledialog.askstring(
+    def same_action(self, other):
+        return type(other) is type(self) and other.pet is self.pet
+
+    def merge(self, other):
+        if not self.same_action(other):
+            return None
+        merged = copy.copy(other)
+        merged.times = self.times + other.times
+        return merged
+
+class FeedCommand(RepeatableCommand):
+    INPUTS = ('food_type',)
+    ACTIVITY = 'eat'
+
+    def __init__(self, pet, food_type=None, times=1):
+        super().__init__(pet, times)
+        self.food_type = food_type
+
+    def prepare(self):
+        if self.food_type is not None:
+            return True
+        # Dialogs are imported on demand, so commands given their inputs up front run without tkinter
+        from tkinter import messagebox, simpledialog
+        food_choice = simpledialog.askstring(
             "Feeding",
             "What would you like to feed your pet?\n1. Meal\n2. Snack"
         )
         if food_choice == '1':
-            self.pet.feed('meal')
+            self.food_type = 'meal'
         elif food_choice == '2':
-            self.pet.feed('snack')
+            self.food_type = 'snack'
         else:
             messagebox.showerror("Error", "Invalid choice.")
+            return False
+        return True
 
-class SleepCommand(Command):
-    def __init__(self, pet):
-        self.pet = pet
+    def same_action(self, other):
+        return super().same_action(other) and self.food_type is not None and other.food_type == self.food_type
 
     def execute(self):
-        self.pet.sleep()
+        if self.prepare():
+            self.pet.feed(self.food_type, self.times)
 
-class ExerciseCommand(Command):
-    def __init__(self, pet):
-        self.pet = pet
+class SleepCommand(RepeatableCommand):
+    ACTIVITY = 'sleep'
 
     def execute(self):
-        self.pet.exercise()
+        self.pet.sleep(self.times)
 
-class PlayCommand(Command):
-    def __init__(self, pet):
-        self.pet = pet
+class ExerciseCommand(RepeatableCommand):
+    ACTIVITY = 'play'
 
     def execute(self):
-        self.pet.play_with()
+        self.pet.exercise(self.times)
 
-class CleanCommand(Command):
-    def __init__(self, pet):
+class PlayCommand(Command):
+    INPUTS = ('guess',)
+    ACTIVITY = 'play'
+
+    def __init__(self, pet, guess=None):
         self.pet = pet
+        self.guess = guess
+
+    def prepare(self):
+        if self.guess is None:
+            from game.dialogs import ask_guess
+            self.guess = ask_guess()
+        return self.guess is not None
+
+    def execute(self):
+        if self.prepare():
+            self.pet.play_guess(self.guess)
 
+class CleanCommand(RepeatableCommand):
     def execute(self):
-        self.pet.clean()
+        self.pet.clean(self.times)
 
 class SpecialAbilityCommand(Command):
     def __init__(self, pet):
@@ -58,3 +118,54 @@ class SpecialAbilityCommand(Command):
 
     def execute(self):
         self.pet.activate_special_ability()
+
+class MacroCommand(Command):
+    """Runs several commands in order as one action, e.g. a whole care routine."""
+
+    def __init__(self, commands, name="Macro"):
+        self.commands = list(commands)
+        self.name = name
+
+    def prepare(self):
+        return all(command.prepare() for command in self.commands)
+
+    def execute(self):
+        for command in self.commands:
+            command.execute()
+
+    def targets(self):
+        return [pet for command in self.commands for pet in command.targets()]
+
+class BulkCommand(Command):
+    """Applies one kind of command to a whole selection of pets in a single pass.
+
+    Per-pet popups are collected into `messages` instead of being shown one by one.
+    """
+
+    def __init__(self, pets, command_class, **kwargs):
+        self.pets = list(pets)
+        self.command_class = command_class
+        self.kwargs = kwargs
+        self.messages = []
+
+    def prepare(self):
+        # Ask once for the whole selection instead of once per pet
+        if not self.pets:
+            return False
+        sample = self.command_class(self.pets[0], **self.kwargs)
+        if not sample.prepare():
+            return False
+        self.kwargs.update({name: getattr(sample, name) for name in sample.INPUTS})
+        return True
+
+    def execute(self):
+        for pet in self.pets:
+            notifier = pet.notifier
+            pet.notifier = lambda kind, title, message: self.messages.append((kind, title, message))
+            try:
+                self.command_class(pet, **self.kwargs).execute()
+            finally:
+                pet.notifier = notifier
+
+    def targets(self):
+        return self.pets
@@ -0,0 +1,56 @@
+import tkinter as tk
+
+
+class GuessDialog:
+    """The number guessing game's input window, built once and hidden between games.
+
+    `ask` waits with `wait_variable`, so the event loop and the pets' ticks
+    keep running while the player thinks.
+    """
+
+    def __init__(self, parent=None):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Guess the Number")
+        tk.Label(self.window, text="Guess a number between 1 and 5").pack()
+        self.guess_entry = tk.Entry(self.window)
+        self.guess_entry.pack()
+        tk.Button(self.window, text="Submit", command=self.submit).pack()
+        self.window.bind('<Return>', self.submit)
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.answered = tk.BooleanVar(self.window, value=False)
+        self.guess = None
+        self.window.withdraw()
+
+    def ask(self):
+        """Returns the raw guess text, or None if the window was closed."""
+        self.guess = None
+        self.guess_entry.delete(0, tk.END)
+        self.window.deiconify()
+        self.window.lift()
+        self.guess_entry.focus_set()
+        self.window.grab_set()
+        self.window.wait_variable(self.answered)
+        return self.guess
+
+    def submit(self, event=None):
+        self.guess = self.guess_entry.get()
+        self._close()
+
+    def cancel(self):
+        self._close()
+
+    def _close(self):
+        self.window.grab_release()
+        self.window.withdraw()
+        self.answered.set(not self.answered.get())
+
+
+_guess_dialog = None
+
+
+def ask_guess(parent=None):
+    """Asks for a guess in the shared guessing dialog, building it on first use."""
+    global _guess_dialog
+    if _guess_dialog is None or not _guess_dialog.window.winfo_exists():
+        _guess_dialog = GuessDialog(parent)
+    return _guess_dialog.ask()
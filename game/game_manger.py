@@ -1,38 +1,105 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
+from helpers.images import ICON_SIZE, sprites
+from helpers.journal import JOURNAL_DIR, Journal
+from helpers.kennel import PAGE_SIZE, KennelStore
+from helpers.savegame import AutoSaver, SaveError, delete_save, load_pet
 from helpers.sound import *
 import os
-import pickle
+import time
+from collections import deque
+from functools import partial
 from tkinter.ttk import Progressbar
 from game.commands import *
+from game.animation import CANVAS_SIZE, PetAnimation
+from game.autopilot import Autopilot
+from game.command_bus import CommandBus
+from game.history_chart import HistoryChart
+from game.household import HouseholdView
+from game.toasts import ToastManager
+from helpers.history import MeterHistory
+from game.scheduler import TickScheduler
+from helpers.metrics import ENABLED as METRICS_ENABLED, observe, timed
 
-from models.cat import Cat
-from models.dog import Dog
+from models.pet import Pet
+from models.species import registry
+
+
+AUTOSAVE_EVERY = 4  # ticks
+FRAME_MS = 50  # render loop period; status updates inside one frame share a repaint
+METERS = ('hunger', 'happiness', 'health')
+ICON_POLL_MS = 50
+HOUSEHOLD_PAGE = 500  # kennel rows listed per query when loading the household
+HOUSEHOLD_SLICE_MS = 30  # time spent restoring household pets per event loop turn, so the window stays responsive
 
 
 class GameManager:
     def __init__(self, root):
         self.root = root
         self.pet = None
-        self.center_window(400, 650)
+        self.scheduler = TickScheduler(root, on_tick=self.on_tick)
+        self.command_bus = CommandBus(root, on_execute=self.on_command)
+        self.kennel = KennelStore()
+        self.autosaver = AutoSaver(self.kennel.row_for, self.kennel.write_rows)
+        self.kennel_page = 0
+        self.autopilot = None  # loaded the first time it's switched on
+        self.history_chart = None
+        self.animation = None
+        self.household = None  # HouseholdView while every saved pet is being looked after at once
+        self.household_queue = deque()  # kennel entries of household pets not restored yet
+        self.household_total = 0
+        self.household_lost = 0
+        self.household_job = None  # after id of the next restore slice
+        self.screens = {}  # name -> frame; each screen is built once and raised when shown
+        self.screen_stats = {'switches': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'widgets': 0}
+        self.dirty = False
+        self.closed = False
+        self.render_job = None
+        self.shown = {}  # widget key -> value currently on screen
+        self.render_stats = {'requests': 0, 'repaints': 0, 'skipped': 0, 'widget_updates': 0}
+        self.toasts = ToastManager(root)
+        self.toasts.start()
+        self.center_window(400, 800)
+        # Closing the window goes through the same final save as the Quit button
+        self.root.protocol('WM_DELETE_WINDOW', self.quit_game)
+
+        self.import_single_slot_save()
+        # Screens share one grid cell and are switched with tkraise
+        self.root.grid_rowconfigure(0, weight=1)
+        self.root.grid_columnconfigure(0, weight=1)
+        self.setup_ui()
+        self.reset_selection_screen()
+        self.show_screen('selection')
+        # Audio and sprites start only once the first frame is on screen
+        self.root.after_idle(self.start_subsystems)
+
+    def start_subsystems(self):
+        self.root.update_idletasks()
+        audio.start()
         play_background_music(is_init_game=True)
-
-        if os.path.exists('saved_game.pkl'):
-            with open('saved_game.pkl', 'rb') as f:
-                self.pet = pickle.load(f)
-            # Set the callbacks
-            self.pet.update_status_callback = self.update_status
-            self.pet.game_over_callback = self.on_pet_death
-            self.pet.start_time_thread()
-            if self.pet.alive:
-                self.start_game(is_saved=True)
-                self.update_status()
-            else:
-                os.remove('saved_game.pkl')
-                self.setup_ui()
-        else:
-            self.setup_ui()
+        sprites.start_preload()
+        self.show_pet_icons()
+
+    def show_pet_icons(self):
+        """Puts the pet type icons on the selection screen once the sprite atlas is decoded."""
+        if not sprites.loaded:
+            self.root.after(ICON_POLL_MS, self.show_pet_icons)
+            return
+        if self.selection_frame.winfo_exists():
+            for species in registry:
+                if species.icon:
+                    self.species_radios[species.name].config(image=sprites.photo(species.icon, ICON_SIZE))
+
+    def import_single_slot_save(self):
+        """Moves a save left by the old single-slot save files into the kennel."""
+        try:
+            pet = load_pet()
+        except SaveError as e:
+            messagebox.showerror("Error", f"Could not load the saved game: {e}")
+            return
+        if pet is not None:
+            self.kennel.add(pet)
+            delete_save()
 
     def center_window(self, width, height):
         """Centers the window on the screen."""
@@ -46,18 +113,41 @@ class GameManager:
         self.root.geometry(f'{width}x{height}+{x}+{y}')
         self.root.title("Tamagotchi Game")
 
+    def add_screen(self, name, frame):
+        frame.grid(row=0, column=0, sticky="nsew")
+        self.screens[name] = frame
+
+    def show_screen(self, name):
+        """Raises a prebuilt screen. The switch is timed up to the end of the redraw it causes."""
+        started = time.perf_counter()
+        self.screens[name].tkraise()
+        self.toasts.layout()  # keep toasts above the screen that was just raised
+        self.root.update_idletasks()
+        elapsed = time.perf_counter() - started
+        self.screen_stats['switches'] += 1
+        self.screen_stats['total_seconds'] += elapsed
+        self.screen_stats['max_seconds'] = max(self.screen_stats['max_seconds'], elapsed)
+        self.screen_stats['widgets'] = self.widget_count()
+        if METRICS_ENABLED:
+            observe('tamagotchi_screen_switch_seconds', elapsed, name)
+
+    def widget_count(self, widget=None):
+        """Widgets in the whole window tree; stays flat however many pets come and go."""
+        widget = widget or self.root
+        return 1 + sum(self.widget_count(child) for child in widget.winfo_children())
+
     def setup_ui(self):
-        self.root.geometry("400x650")
-        self.root.title("Tamagotchi Game - Pet Selection")
+        """Builds the pet selection screen. Built once; `reset_selection_screen` clears it for reuse."""
+        self.root.geometry("400x800")
 
         # Pet Selection Frame
         self.selection_frame = tk.Frame(self.root)
-        self.selection_frame.pack(pady=20, padx=20)
+        self.add_screen('selection', self.selection_frame)
 
         # Title Label
         self.title_label = tk.Label(self.selection_frame, text="Welcome to Tamagotchi!",
                                     font=("Helvetica", 16, "bold"))
-        self.title_label.pack(pady=10)
+        self.title_label.pack(pady=(30, 10))
 
         # Instructions Label
         self.instruction_label = tk.Label(self.selection_frame, text="Create your pet to start the journey",
@@ -101,29 +191,238 @@ class GameManager:
                                        font=("Helvetica", 12))
         self.pet_type_label.pack(pady=10)
 
-        self.pet_type_var = tk.StringVar(value="dog")
-
-        # Adding images/icons for pet types
-        dog_image = Image.open("dog.jpeg").resize((50, 50))  # Replace with actual path to the image
-        dog_photo = ImageTk.PhotoImage(dog_image)
-        cat_image = Image.open("cat.jpeg").resize((50, 50))  # Replace with actual path to the image
-        cat_photo = ImageTk.PhotoImage(cat_image)
-
-        self.dog_radio = tk.Radiobutton(self.selection_frame, text="Dog", variable=self.pet_type_var, value="dog",
-                                        font=("Helvetica", 12), image=dog_photo, compound="left")
-        self.dog_radio.image = dog_photo  # Keep a reference to the image to avoid garbage collection
-        self.dog_radio.pack(pady=5)
+        self.pet_type_var = tk.StringVar(value=registry.names()[0])
 
-        self.cat_radio = tk.Radiobutton(self.selection_frame, text="Cat", variable=self.pet_type_var, value="cat",
-                                        font=("Helvetica", 12), image=cat_photo, compound="left")
-        self.cat_radio.image = cat_photo  # Keep a reference to the image to avoid garbage collection
-        self.cat_radio.pack(pady=5)
+        # One radio button per species in data/species.json. Icons come from the sprite atlas, see show_pet_icons
+        self.species_radios = {}
+        for species in registry:
+            radio = tk.Radiobutton(self.selection_frame, text=species.label, variable=self.pet_type_var,
+                                   value=species.name, font=("Helvetica", 12), compound="left")
+            radio.pack(pady=5)
+            self.species_radios[species.name] = radio
+        if sprites.loaded:
+            self.show_pet_icons()
 
         # Start Button
         self.start_button = tk.Button(self.selection_frame, text="Start", font=("Helvetica", 14, "bold"),
                                       bg="#4CAF50", fg="white", width=15, command=self.start_game)
         self.start_button.pack(pady=20)
 
+        # Saved pets, listed one page at a time straight from the kennel index
+        self.saved_label = tk.Label(self.selection_frame, text="...or continue with a saved pet:",
+                                    font=("Helvetica", 12))
+        self.saved_label.pack(pady=5)
+
+        self.saved_list = tk.Listbox(self.selection_frame, height=5, width=32, font=("Helvetica", 11))
+        self.saved_list.pack(pady=5)
+
+        self.saved_nav_frame = tk.Frame(self.selection_frame)
+        self.saved_nav_frame.pack(pady=5)
+        self.prev_page_button = tk.Button(self.saved_nav_frame, text="<", command=lambda: self.show_kennel_page(-1))
+        self.prev_page_button.grid(row=0, column=0, padx=5)
+        self.continue_button = tk.Button(self.saved_nav_frame, text="Continue", command=self.continue_saved_pet)
+        self.continue_button.grid(row=0, column=1, padx=5)
+        self.next_page_button = tk.Button(self.saved_nav_frame, text=">", command=lambda: self.show_kennel_page(1))
+        self.next_page_button.grid(row=0, column=2, padx=5)
+
+        self.household_button = tk.Button(self.selection_frame, text="Household (all saved pets)",
+                                          command=self.start_household)
+        self.household_button.pack(pady=5)
+
+    def reset_selection_screen(self):
+        self.root.title("Tamagotchi Game - Pet Selection")
+        for entry in (self.name_entry, self.color_entry, self.pattern_entry, self.accessories_entry):
+            entry.delete(0, tk.END)
+        self.pet_type_var.set(registry.names()[0])
+        self.kennel_page = 0
+        self.show_kennel_page()
+
+    def show_kennel_page(self, step=0):
+        total = self.kennel.count()
+        last_page = max(0, (total - 1) // PAGE_SIZE)
+        self.kennel_page = max(0, min(self.kennel_page + step, last_page))
+        self.kennel_entries = self.kennel.list_pets(offset=self.kennel_page * PAGE_SIZE, limit=PAGE_SIZE)
+
+        self.saved_list.delete(0, tk.END)
+        for entry in self.kennel_entries:
+            stage = Pet.LIFE_STAGES[entry.life_stage]
+            self.saved_list.insert(tk.END, f"{entry.name} ({entry.pet_type}, {stage}, {entry.age} days)")
+        self.prev_page_button.config(state=tk.NORMAL if self.kennel_page > 0 else tk.DISABLED)
+        self.next_page_button.config(state=tk.NORMAL if self.kennel_page < last_page else tk.DISABLED)
+
+    def continue_saved_pet(self):
+        selection = self.saved_list.curselection()
+        if not selection:
+            messagebox.showerror("Error", "Select a saved pet first.")
+            return
+        pet, summary = self.load_saved_pet(self.kennel_entries[selection[0]])
+        # Set the callbacks
+        pet.update_status_callback = self.update_status
+        pet.game_over_callback = self.on_pet_death
+        if summary:
+            messagebox.showinfo("While you were away", "\n".join(summary))
+        if pet.alive:
+            self.pet = pet
+            self.start_game(is_saved=True)
+        else:
+            pet.journal.close()
+            self.kennel.save(pet)
+            self.show_kennel_page()
+
+    def load_saved_pet(self, entry):
+        """Rebuilds a saved pet and replays the ticks that passed while the game was closed.
+
+        Returns the pet and a summary of the missed ticks, empty if there were none.
+        """
+        directory = self.journal_dir(entry.id)
+        if Journal.exists(directory):
+            # The journal is never behind the kennel row, so rebuild the pet from it
+            pet, _ = Journal.restore(directory)
+            pet.kennel_id = entry.id
+            # The kennel row is only written every few ticks, so the journal's tail may be newer
+            pet.saved_at = max(entry.saved_at, pet.journal.updated_at() or 0)
+        else:
+            pet = self.kennel.load(entry.id)
+            Journal.start(pet, directory)
+        missed = pet.missed_ticks()
+        if missed and pet.alive:
+            return pet, pet.catch_up(missed)
+        return pet, []
+
+    def start_household(self):
+        """Looks after every living saved pet at once from one scrollable list.
+
+        The list shows up right away and fills in as pets are restored, a
+        slice at a time from the event loop, since each one replays its journal.
+        """
+        entries = []
+        while True:
+            page = self.kennel.list_pets(offset=len(entries), limit=HOUSEHOLD_PAGE)
+            entries.extend(page)
+            if len(page) < HOUSEHOLD_PAGE:
+                break
+        if not entries:
+            messagebox.showerror("Error", "There are no saved pets yet.")
+            return
+
+        if 'household' not in self.screens:
+            self.setup_household_ui()
+        self.household = self.household_view
+        self.household.set_pets([])
+        self.show_screen('household')
+        self.household.start()
+        self.household_queue = deque(entries)
+        self.household_total = len(entries)
+        self.household_lost = 0
+        self.load_household_slice()
+
+    def load_household_slice(self):
+        self.household_job = None
+        started = time.perf_counter()
+        pets = []
+        while self.household_queue and time.perf_counter() - started < HOUSEHOLD_SLICE_MS / 1000:
+            pet, _ = self.load_saved_pet(self.household_queue.popleft())
+            if not pet.alive:
+                pet.journal.close()
+                self.kennel.save(pet)
+                self.household_lost += 1
+                continue
+            # Household pets are quiet; their messages go to the news line instead of popups
+            pet.muted = True
+            pet.notifier = partial(self.household_notice, pet)
+            pet.update_status_callback = partial(self.household_changed, pet)
+            pet.game_over_callback = partial(self.on_household_death, pet)
+            # Spread the first ticks over one interval so the whole household doesn't tick in the same frame
+            loaded = self.household_total - len(self.household_queue)
+            self.scheduler.add(pet, delay=Pet.TICK_INTERVAL * loaded / self.household_total)
+            pets.append(pet)
+        self.household.add_pets(pets)
+
+        if self.household_queue:
+            loaded = self.household_total - len(self.household_queue)
+            self.household_news.config(text=f"Loading pets... {loaded}/{self.household_total}")
+            self.household_job = self.root.after(1, self.load_household_slice)
+            return
+        news = f"{len(self.household.pets)} pets. Click one to look after it."
+        if self.household_lost:
+            news += f" {self.household_lost} did not survive while you were away."
+        self.household_news.config(text=news)
+
+    def stop_household_load(self):
+        """Stops restoring household pets; the ones not restored yet stay untouched in the kennel."""
+        if self.household_job is not None:
+            self.root.after_cancel(self.household_job)
+            self.household_job = None
+        self.household_queue.clear()
+
+    def setup_household_ui(self):
+        self.household_frame = tk.Frame(self.root)
+        self.add_screen('household', self.household_frame)
+        tk.Label(self.household_frame, text="Household", font=("Helvetica", 16, "bold")).pack(pady=10)
+        self.household_news = tk.Label(self.household_frame, text="", font=("Helvetica", 10), wraplength=360)
+        self.household_news.pack(pady=5)
+        self.household_view = HouseholdView(self.household_frame, self.open_household_pet)
+        self.household_view.frame.pack(pady=5)
+        tk.Button(self.household_frame, text="Back", command=self.leave_household).pack(pady=10)
+
+    def household_notice(self, pet, kind, title, message):
+        self.household_news.config(text=message)
+
+    def household_changed(self, pet):
+        self.household.mark_dirty()
+        if pet is self.pet:
+            self.update_status()
+
+    def open_household_pet(self, pet):
+        """Shows the usual single-pet screen for one household pet; the rest keep ticking."""
+        self.household.stop()
+        self.pet = pet
+        pet.muted = False
+        pet.notifier = None
+        if pet.history is None:
+            pet.history = MeterHistory()
+        self.show_game_screen()
+        self.start_render_loop()
+
+    def show_household(self):
+        self.stop_render_loop()
+        self.close_history()
+        if self.pet is not None:
+            self.pet.muted = True
+            self.pet.notifier = partial(self.household_notice, self.pet)
+            self.pet = None
+        self.show_screen('household')
+        self.household.mark_dirty()
+        self.household.start()
+
+    def on_household_death(self, pet):
+        self.autosaver.discard(pet)
+        self.kennel.save(pet)
+        pet.journal.close()
+        self.household.remove(pet)
+        self.household_news.config(text=f"{pet.name} has passed away.")
+        if pet is self.pet:
+            messagebox.showinfo("Game Over", f"Unfortunately, {pet.name} has passed away.")
+            self.show_household()
+
+    def leave_household(self):
+        self.stop_household_load()
+        self.household.stop()
+        self.command_bus.flush()
+        pets = self.household.pets
+        for pet in pets:
+            self.scheduler.remove(pet)
+            self.autosaver.discard(pet)
+        self.kennel.save_many(pets)
+        for pet in pets:
+            pet.journal.close()
+        self.household = None
+        self.reset_selection_screen()
+        self.show_screen('selection')
+
+    def journal_dir(self, pet_id):
+        return os.path.join(JOURNAL_DIR, f"pet-{pet_id}")
+
     def start_game(self, is_saved: bool = False):
         if not is_saved:
             pet_name = self.name_entry.get()
@@ -132,47 +431,66 @@ class GameManager:
             color = self.color_entry.get()
             pet_type = self.pet_type_var.get()
 
-            if pet_type == "dog":
-                self.pet = Dog(pet_name, color, pattern, accessories, self.update_status, self.on_pet_death, pet_type)
-            elif pet_type == "cat":
-                self.pet = Cat(pet_name, color, pattern, accessories, self.update_status, self.on_pet_death, pet_type)
+            self.pet = registry.create(pet_type, pet_name, color, pattern, accessories, self.update_status,
+                                       self.on_pet_death)
+
+            self.kennel.add(self.pet)
+            Journal.start(self.pet, self.journal_dir(self.pet.kennel_id))
 
+        if self.pet.history is None:
+            self.pet.history = MeterHistory()
         self.pet.characteristic()
-        if self.pet is not None and is_saved == False:
-            self.selection_frame.pack_forget()
-        self.setup_game_ui()
-        self.update_status()
-        self.pet.start_time_thread()
+        self.show_game_screen()
+        self.start_render_loop()
+        self.scheduler.add(self.pet)
+
+    def show_game_screen(self):
+        """Points the single-pet screen at `self.pet`, building it the first time, and raises it."""
+        if 'game' not in self.screens:
+            self.setup_game_ui()
+        self.shown = {}
+        self.autopilot_var.set(False)
+        if self.household is not None:
+            self.household_btn.grid()
+        else:
+            self.household_btn.grid_remove()
+        self.animation.set_pet(self.pet)
+        self.animation.start()
+        self.root.bind('<F3>', self.animation.toggle_overlay)
+        self.show_screen('game')
 
     def setup_game_ui(self):
+        """Builds the single-pet screen. Every widget reads `self.pet` when used, so one screen serves every pet."""
         self.game_frame = tk.Frame(self.root)
-        self.game_frame.pack(fill=tk.BOTH, expand=True)
+        self.add_screen('game', self.game_frame)
+
+        # The animated pet, driven by its own frame loop; F3 shows frame times
+        self.pet_canvas = tk.Canvas(self.game_frame, width=CANVAS_SIZE[0], height=CANVAS_SIZE[1],
+                                    highlightthickness=0)
+        self.pet_canvas.pack(pady=(10, 0))
+        self.animation = PetAnimation(self.pet_canvas, self.pet)
 
         # Status Frame
         self.status_frame = tk.Frame(self.game_frame)
         self.status_frame.pack(pady=10)
 
-        # Status label for displaying overall status text
-        self.status_label = tk.Label(self.status_frame, text="", font=("Arial", 12), justify="left", anchor="w")
-        self.status_label.pack(pady=5)
-
-        # Hunger Label and Progress Bar
-        self.hunger_label = tk.Label(self.status_frame, text="Hunger")
-        self.hunger_label.pack(pady=5)
-        self.hunger_bar = Progressbar(self.status_frame, orient="horizontal", length=200, mode="determinate")
-        self.hunger_bar.pack(pady=5)
-
-        # Happiness Label and Progress Bar
-        self.happiness_label = tk.Label(self.status_frame, text="Happiness")
-        self.happiness_label.pack(pady=5)
-        self.happiness_bar = Progressbar(self.status_frame, orient="horizontal", length=200, mode="determinate")
-        self.happiness_bar.pack(pady=5)
-
-        # Health Label and Progress Bar
-        self.health_label = tk.Label(self.status_frame, text="Health")
-        self.health_label.pack(pady=5)
-        self.health_bar = Progressbar(self.status_frame, orient="horizontal", length=200, mode="determinate")
-        self.health_bar.pack(pady=5)
+        # One value label per status field, so a repaint only touches what changed
+        self.fields_frame = tk.Frame(self.status_frame)
+        self.fields_frame.pack(pady=5)
+        self.field_labels = {}
+        for row, (label, _) in enumerate(self.pet.status_fields()):
+            tk.Label(self.fields_frame, text=f"{label}:", font=("Arial", 12), anchor="w").grid(row=row, column=0,
+                                                                                               sticky="w")
+            self.field_labels[label] = tk.Label(self.fields_frame, text="", font=("Arial", 12), anchor="w")
+            self.field_labels[label].grid(row=row, column=1, sticky="w", padx=(5, 0))
+
+        # A label and progress bar per meter
+        self.meter_bars = {}
+        for meter in METERS:
+            tk.Label(self.status_frame, text=meter.capitalize()).pack(pady=5)
+            self.meter_bars[meter] = Progressbar(self.status_frame, orient="horizontal", length=200,
+                                                 mode="determinate")
+            self.meter_bars[meter].pack(pady=5)
 
         # Button Frame
         self.button_frame = tk.Frame(self.game_frame)
@@ -197,6 +515,12 @@ class GameManager:
         quit_btn = tk.Button(self.button_frame, text="Quit",
                                         command=self.quit_game)
 
+        history_btn = tk.Button(self.button_frame, text="History", command=self.show_history)
+
+        self.autopilot_var = tk.BooleanVar(value=False)
+        autopilot_check = tk.Checkbutton(self.button_frame, text="Autopilot", variable=self.autopilot_var,
+                                         command=self.toggle_autopilot)
+
         # Arrange buttons in a grid layout
         feed_btn.grid(row=0, column=0, padx=5, pady=5)
         sleep_btn.grid(row=0, column=1, padx=5, pady=5)
@@ -205,41 +529,143 @@ class GameManager:
         clean_btn.grid(row=2, column=0, padx=5, pady=5)
         special_ability_btn.grid(row=2, column=1, padx=5, pady=5)
         quit_btn.grid(row=3, column=0, padx=5, pady=5)
-
+        autopilot_check.grid(row=3, column=1, padx=5, pady=5)
+        history_btn.grid(row=4, column=0, padx=5, pady=5)
+        # Only shown while the pet belongs to the household, see show_game_screen
+        self.household_btn = tk.Button(self.button_frame, text="Household", command=self.show_household)
+        self.household_btn.grid(row=4, column=1, padx=5, pady=5)
+
+    def show_history(self):
+        if self.history_chart is not None and self.history_chart.window.winfo_exists():
+            self.history_chart.window.lift()
+            return
+        self.history_chart = HistoryChart(self.root, self.pet)
+
+    def close_history(self):
+        if self.history_chart is not None and self.history_chart.window.winfo_exists():
+            self.history_chart.close()
+        self.history_chart = None
+
+    def toggle_autopilot(self):
+        if not self.autopilot_var.get():
+            return
+        if self.autopilot is None:
+            self.autopilot = Autopilot.load(rebuild=False)
+        if not self.autopilot.available(self.pet):
+            self.autopilot_var.set(False)
+            messagebox.showerror("Autopilot", "The autopilot table is missing or out of date.\n"
+                                              "Run: python -m simulation.care_solver")
+
+    @timed('game.update_status')
     def update_status(self):
-        if self.pet:
-            self.status_label.config(text=self.pet.status())
-            self.hunger_bar["value"] = self.pet.hunger
-            self.happiness_bar["value"] = self.pet.happiness
-            self.health_bar["value"] = self.pet.health
-
-            # Update mood music
-            mood = self.pet.get_mood()
+        """Marks the status panel dirty; the render loop repaints it on its next frame."""
+        self.render_stats['requests'] += 1
+        if self.dirty:
+            self.render_stats['skipped'] += 1
+        self.dirty = True
+
+    def start_render_loop(self):
+        self.shown = {}
+        self.dirty = True
+        if self.render_job is None:
+            self.render_job = self.root.after(FRAME_MS, self.render_frame)
+
+    def stop_render_loop(self):
+        if self.render_job is not None:
+            self.root.after_cancel(self.render_job)
+            self.render_job = None
+        if self.animation is not None:
+            self.animation.stop()
+            self.root.unbind('<F3>')
+
+    def render_frame(self):
+        self.render_job = self.root.after(FRAME_MS, self.render_frame)
+        if self.dirty and self.pet:
+            self.dirty = False
+            self.render()
+
+    @timed('game.render')
+    def render(self):
+        """Pushes the pet's current values into only the widgets whose value changed."""
+        self.render_stats['repaints'] += 1
+        for label, text in self.pet.status_fields():
+            if self.shown.get(label) != text:
+                self.shown[label] = text
+                self.field_labels[label].config(text=text)
+                self.render_stats['widget_updates'] += 1
+        for meter, bar in self.meter_bars.items():
+            value = getattr(self.pet, meter)
+            if self.shown.get(meter) != value:
+                self.shown[meter] = value
+                bar["value"] = value
+                self.render_stats['widget_updates'] += 1
+
+        # Update mood music
+        mood = self.pet.get_mood()
+        if self.shown.get('mood') != mood:
+            self.shown['mood'] = mood
             play_background_music(mood)
+            if self.animation is not None:
+                self.animation.set_mood(mood)
 
     def execute_command(self, command):
-        """Execute a given command."""
-        command.execute()
+        """Queue a command; the bus runs it with anything else submitted in the same frame."""
+        self.command_bus.submit(command)
+
+    def on_command(self, command):
+        if self.animation is not None and command.ACTIVITY and self.pet in command.targets():
+            self.animation.show(command.ACTIVITY)
 
     def unique_action(self):
         if self.pet and self.pet.alive:
-            if isinstance(self.pet, Dog):
-                self.pet.fetch_favorite_toy()
-            elif isinstance(self.pet, Cat):
-                self.pet.sharpen_claws()
-            self.update_status()
+            self.pet.unique_action()
+
+    def on_tick(self, pet):
+        if pet.alive and pet.age % AUTOSAVE_EVERY == 0:
+            self.autosaver.submit(pet)
+        # The autopilot acts between ticks, like a player would
+        if pet is self.pet and self.autopilot_var.get():
+            command = self.autopilot.choose(pet)
+            if command is not None:
+                self.execute_command(command)
 
     def on_pet_death(self):
-        # Delete the saved game file
-        if os.path.exists('saved_game.pkl'):
-            os.remove('saved_game.pkl')
+        self.stop_render_loop()
+        self.close_history()
+        self.command_bus.clear()
+        # Keep the pet in the kennel, marked as no longer alive
+        self.autosaver.discard(self.pet)
+        self.kennel.save(self.pet)
+        self.pet.journal.close()
         messagebox.showinfo("Game Over", f"Unfortunately, {self.pet.name} has passed away.")
         # Return to pet selection
-        self.game_frame.pack_forget()
-        self.setup_ui()
-
-    def quit_game(self):
-        if self.pet and self.pet.alive:
-            with open('saved_game.pkl', 'wb') as f:
-                pickle.dump(self.pet, f)
+        self.reset_selection_screen()
+        self.show_screen('selection')
+
+    def quit_game(self, save=True):
+        """Saves the pets and closes the game.
+
+        With `save=False` queued commands and pending autosaves are dropped
+        instead, so a run that only times the startup leaves the saves alone.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.stop_render_loop()
+        self.stop_household_load()
+        self.scheduler.clear()
+        household = self.household.pets if self.household is not None else []
+        if self.household is not None:
+            self.household.stop()
+        if save:
+            self.command_bus.flush()
+            self.autosaver.submit_many(([self.pet] if self.pet and self.pet.alive else []) + household)
+        else:
+            self.autosaver.discard()
+        for pet in ([self.pet] if self.pet else []) + household:
+            if pet.journal:
+                pet.journal.close()
+        self.toasts.stop()
+        self.autosaver.close()
+        self.kennel.close()
         self.root.quit()
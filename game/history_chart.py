@@ -0,0 +1,74 @@
+import tkinter as tk
+
+from helpers.history import METERS, lttb
+
+WIDTH, HEIGHT = 600, 320
+MARGIN = 40
+REFRESH_MS = 1000  # how often the chart checks for new ticks
+COLORS = {'hunger': '#e67e22', 'happiness': '#f1c40f', 'health': '#e74c3c', 'cleanliness': '#3498db',
+          'weight': '#8e44ad'}
+
+
+class HistoryChart:
+    """Window plotting a pet's meter history, one line per meter.
+
+    Each line is decimated with LTTB to about one point per pixel column, and
+    the history itself is bounded, so a redraw costs the same after a year of
+    ticks as after ten. Lines are created once and only get new coordinates.
+    Weight has its own scale, shown on the right.
+    """
+
+    def __init__(self, root, pet):
+        self.pet = pet
+        self.history = pet.history
+        self.window = tk.Toplevel(root)
+        self.window.title(f"{pet.name}'s history")
+        self.canvas = tk.Canvas(self.window, width=WIDTH, height=HEIGHT, bg='white')
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.lines = {meter: self.canvas.create_line(0, 0, 0, 0, fill=COLORS[meter], width=2) for meter in METERS}
+        self.canvas.create_line(MARGIN, MARGIN, MARGIN, HEIGHT - MARGIN, WIDTH - MARGIN, HEIGHT - MARGIN)
+        self.canvas.create_text(MARGIN - 5, MARGIN, text="100", anchor='e')
+        self.canvas.create_text(MARGIN - 5, HEIGHT - MARGIN, text="0", anchor='e')
+        self.weight_label = self.canvas.create_text(WIDTH - MARGIN + 5, MARGIN, text="", anchor='w',
+                                                    fill=COLORS['weight'])
+        self.range_label = self.canvas.create_text(WIDTH // 2, HEIGHT - MARGIN + 15, text="")
+        for i, meter in enumerate(METERS):
+            self.canvas.create_text(MARGIN + i * 105, MARGIN // 2, text=meter.capitalize(), fill=COLORS[meter],
+                                    anchor='w')
+        self.drawn = None  # `recorded` count at the last redraw
+        self.job = None
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def refresh(self):
+        self.job = self.window.after(REFRESH_MS, self.refresh)
+        if self.history.recorded != self.drawn:
+            self.drawn = self.history.recorded
+            self.redraw()
+
+    def redraw(self):
+        plot_width = WIDTH - 2 * MARGIN
+        plot_height = HEIGHT - 2 * MARGIN
+        series = {meter: lttb(self.history.series(meter), plot_width) for meter in METERS}
+        ticks = [tick for points in series.values() for tick, _ in points]
+        if len(ticks) < 2:
+            return
+        first, last = min(ticks), max(ticks)
+        span = max(1, last - first)
+        heaviest = max((value for _, value in series['weight']), default=1) or 1
+        for meter, points in series.items():
+            top = heaviest if meter == 'weight' else 100
+            coords = []
+            for tick, value in points:
+                coords.append(MARGIN + (tick - first) * plot_width / span)
+                coords.append(HEIGHT - MARGIN - value * plot_height / top)
+            if len(coords) >= 4:
+                self.canvas.coords(self.lines[meter], *coords)
+        self.canvas.itemconfig(self.weight_label, text=f"{heaviest:.1f} kg")
+        self.canvas.itemconfig(self.range_label, text=f"ticks {first} - {last}")
+
+    def close(self):
+        if self.job is not None:
+            self.window.after_cancel(self.job)
+            self.job = None
+        self.window.destroy()
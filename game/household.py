@@ -0,0 +1,166 @@
+import tkinter as tk
+
+WIDTH, HEIGHT = 340, 560
+ROW_HEIGHT = 32
+METERS = ('hunger', 'happiness', 'health')
+BAR_X, BAR_WIDTH, BAR_HEIGHT = 190, 44, 8
+REFRESH_MS = 100  # how often the visible rows pick up new meter values
+
+
+def bar_color(value):
+    if value > 60:
+        return '#2ecc71'
+    if value > 30:
+        return '#f39c12'
+    return '#e74c3c'
+
+
+class RowSlot:
+    """The canvas items of one on-screen row, re-pointed at whichever pet scrolls into it."""
+
+    __slots__ = ('tag', 'row', 'items', 'shown')
+
+    def __init__(self, canvas, index):
+        self.tag = f'slot{index}'
+        self.row = 0  # list index the items are currently positioned for
+        self.shown = {}  # item key -> value currently drawn
+        bottom = ROW_HEIGHT - 1
+        self.items = {
+            'background': canvas.create_rectangle(0, 0, WIDTH, bottom, width=0, tags=self.tag),
+            'name': canvas.create_text(8, 10, anchor='w', font=("Helvetica", 10, "bold"), tags=self.tag),
+            'info': canvas.create_text(8, 23, anchor='w', font=("Helvetica", 8), fill='#555555', tags=self.tag),
+        }
+        for i, meter in enumerate(METERS):
+            x = BAR_X + i * (BAR_WIDTH + 5)
+            y = (ROW_HEIGHT - BAR_HEIGHT) // 2
+            canvas.create_rectangle(x, y, x + BAR_WIDTH, y + BAR_HEIGHT, outline='#bbbbbb', tags=self.tag)
+            self.items[meter] = canvas.create_rectangle(x, y, x, y + BAR_HEIGHT, width=0, tags=self.tag)
+
+
+class HouseholdView:
+    """Scrollable list of pets with a compact meter bar per meter.
+
+    Only the rows on screen have canvas items. Row `r` is always drawn by slot
+    `r % len(slots)`, so scrolling by one row moves a single slot to the other
+    end of the view instead of redrawing them all, and a refresh only touches
+    items whose value changed. The cost of scrolling and of refreshing stays
+    the same whether the household has ten pets or a thousand.
+    """
+
+    def __init__(self, parent, on_select, height=HEIGHT):
+        self.frame = tk.Frame(parent)
+        self.on_select = on_select
+        self.height = height
+        self.canvas = tk.Canvas(self.frame, width=WIDTH, height=height, bg='white', highlightthickness=0,
+                                yscrollincrement=ROW_HEIGHT // 4)
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.slots = [RowSlot(self.canvas, index) for index in range(height // ROW_HEIGHT + 2)]
+        for index, slot in enumerate(self.slots):
+            self.canvas.move(slot.tag, 0, index * ROW_HEIGHT)
+            slot.row = index
+        self.pets = []
+        self.dirty = True
+        self.job = None
+        self.canvas.bind('<Button-1>', self.click)
+        self.canvas.bind('<MouseWheel>', lambda event: self.yview('scroll', -3 if event.delta > 0 else 3, 'units'))
+        self.canvas.bind('<Button-4>', lambda event: self.yview('scroll', -3, 'units'))
+        self.canvas.bind('<Button-5>', lambda event: self.yview('scroll', 3, 'units'))
+
+    def set_pets(self, pets):
+        self.pets = list(pets)
+        self.resize()
+        for slot in self.slots:
+            slot.shown.clear()
+        self.layout()
+
+    def add_pets(self, pets):
+        """Appends pets, e.g. as they finish loading; they're drawn on the next refresh if on screen."""
+        if pets:
+            self.pets.extend(pets)
+            self.resize()
+            self.dirty = True
+
+    def resize(self):
+        self.canvas.configure(scrollregion=(0, 0, WIDTH, max(self.height, len(self.pets) * ROW_HEIGHT)))
+
+    def remove(self, pet):
+        if pet in self.pets:
+            self.pets.remove(pet)
+            self.set_pets(self.pets)
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def start(self):
+        if self.job is None:
+            self.job = self.canvas.after(REFRESH_MS, self.refresh)
+
+    def stop(self):
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+
+    def refresh(self):
+        self.job = self.canvas.after(REFRESH_MS, self.refresh)
+        if self.dirty:
+            self.dirty = False
+            self.draw_visible()
+
+    def yview(self, *args):
+        """Scrollbar and wheel entry point: scrolls the canvas, then re-points the slots that went off screen."""
+        self.canvas.yview(*args)
+        self.layout()
+
+    def first_row(self):
+        return max(0, int(self.canvas.canvasy(0)) // ROW_HEIGHT)
+
+    def layout(self):
+        first = self.first_row()
+        count = len(self.slots)
+        for row in range(first, first + count):
+            slot = self.slots[row % count]
+            if slot.row != row:
+                self.canvas.move(slot.tag, 0, (row - slot.row) * ROW_HEIGHT)
+                slot.row = row
+                slot.shown.clear()
+        self.draw_visible()
+
+    def draw_visible(self):
+        for slot in self.slots:
+            self.draw_slot(slot)
+
+    def draw_slot(self, slot):
+        row = slot.row
+        pet = self.pets[row] if row < len(self.pets) else None
+        values = {'state': tk.NORMAL if pet is not None else tk.HIDDEN}
+        if pet is not None:
+            values['background'] = '#f4f6f7' if row % 2 else 'white'
+            values['name'] = pet.name
+            values['info'] = f"{pet.pet_type}, {pet.life_stage}, {pet.age} days" + (", sick" if pet.sick else "")
+            for meter in METERS:
+                values[meter] = getattr(pet, meter)
+        shown = slot.shown
+        if shown.get('state') != values['state']:
+            self.canvas.itemconfigure(slot.tag, state=values['state'])
+        for key, value in values.items():
+            if shown.get(key) == value or key == 'state':
+                continue
+            item = slot.items[key]
+            if key == 'background':
+                self.canvas.itemconfigure(item, fill=value)
+            elif key in METERS:
+                x = BAR_X + METERS.index(key) * (BAR_WIDTH + 5)
+                y = row * ROW_HEIGHT + (ROW_HEIGHT - BAR_HEIGHT) // 2
+                self.canvas.coords(item, x, y, x + BAR_WIDTH * value / 100, y + BAR_HEIGHT)
+                self.canvas.itemconfigure(item, fill=bar_color(value))
+            else:
+                self.canvas.itemconfigure(item, text=value)
+        slot.shown = values
+
+    def click(self, event):
+        row = int(self.canvas.canvasy(event.y)) // ROW_HEIGHT
+        if 0 <= row < len(self.pets):
+            self.on_select(self.pets[row])
@@ -0,0 +1,103 @@
+import heapq
+import itertools
+import time
+
+from helpers.metrics import ENABLED as METRICS_ENABLED, observe
+from models.pet import Pet
+
+
+class TickScheduler:
+    """Ticks any number of pets from the Tk event loop.
+
+    Due times live in a single heap and only the earliest one is armed with
+    `root.after`, so no threads are started and ticks run on the UI thread
+    alongside commands instead of racing with them.
+    """
+
+    def __init__(self, root, interval=Pet.TICK_INTERVAL, on_tick=None):
+        self.root = root
+        self.interval = interval
+        self.on_tick = on_tick
+        self._heap = []
+        self._scheduled = {}  # id(pet) -> sequence number of its live heap entry
+        self._counter = itertools.count()
+        self._after_id = None
+        self._armed_for = None
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def __contains__(self, pet):
+        return id(pet) in self._scheduled
+
+    def add(self, pet, delay=None):
+        """Starts ticking a pet, first after `delay` seconds (one interval by default).
+
+        Adding an already scheduled pet is a no-op.
+        """
+        if pet in self:
+            return
+        self._push(pet, time.monotonic() + (self.interval if delay is None else delay))
+        self._arm()
+
+    def remove(self, pet):
+        # The heap entry is dropped lazily once it reaches the top
+        self._scheduled.pop(id(pet), None)
+
+    def clear(self):
+        self._heap.clear()
+        self._scheduled.clear()
+        self._cancel()
+
+    def _push(self, pet, due):
+        seq = next(self._counter)
+        self._scheduled[id(pet)] = seq
+        heapq.heappush(self._heap, (due, seq, pet))
+
+    def _cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+            self._armed_for = None
+
+    def _arm(self):
+        """Makes sure a single `after` callback is pending for the earliest due pet."""
+        while self._heap and self._scheduled.get(id(self._heap[0][2])) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self._cancel()
+            return
+        due = self._heap[0][0]
+        if self._armed_for is not None and self._armed_for <= due:
+            return
+        self._cancel()
+        delay_ms = max(0, int((due - time.monotonic()) * 1000))
+        self._armed_for = due
+        self._after_id = self.root.after(delay_ms, self._run_due)
+
+    def _run_due(self):
+        self._after_id = None
+        self._armed_for = None
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            due, seq, pet = heapq.heappop(self._heap)
+            if self._scheduled.get(id(pet)) != seq:
+                continue
+            if METRICS_ENABLED:
+                # How late this tick runs compared to its slot on the fixed schedule
+                observe('tamagotchi_tick_drift_seconds', now - due)
+            # Keep a fixed cadence, but don't replay a burst of ticks after a stall
+            next_due = due + self.interval
+            if next_due <= now:
+                next_due = now + self.interval
+            self._push(pet, next_due)
+            try:
+                pet.tick()
+                if self.on_tick is not None:
+                    self.on_tick(pet)
+            except Exception as e:
+                # One broken pet must not stop the others, so the callback always re-arms
+                print(f"Error ticking {pet.name}: {e}")
+            if not pet.alive:
+                self.remove(pet)
+        self._arm()
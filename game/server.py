@@ -0,0 +1,567 @@
+"""Local HTTP/WebSocket service exposing pets to many concurrent clients.
+
+Built on asyncio streams only. HTTP endpoints:
+
+    POST /pets                     {"name", "pet_type", "color", "pattern", "accessories"} -> pet status
+    GET  /pets/<id>                pet status, loading the pet from the kennel if needed
+    POST /pets/<id>/commands       {"command": "feed", "food_type": "meal"} -> {"status", "messages"}
+    GET  /ws                       WebSocket upgrade
+
+WebSocket clients send JSON requests {"id", "op", ...} with op "create", "subscribe"
+or "command", and get a reply carrying the same id. Subscribed connections also
+receive status and message pushes, batched every PUSH_INTERVAL.
+
+Run from the repository root: python -m game.server [--host HOST] [--port PORT] [--kennel PATH]
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import signal
+import struct
+from collections import defaultdict
+
+from game.commands import (CleanCommand, ExerciseCommand, FeedCommand, PlayCommand, SleepCommand,
+                           SpecialAbilityCommand)
+from game.scheduler import TickScheduler
+from helpers.kennel import KENNEL_PATH, KennelStore
+from helpers.metrics import start_exporters
+from helpers.savegame import PET_CLASSES, AutoSaver
+
+HOST = '127.0.0.1'
+PORT = 8765
+PUSH_INTERVAL = 0.1  # seconds between batched status pushes
+SAVE_INTERVAL = 0.25  # seconds between batched autosaves of changed pets
+AUTOSAVE_EVERY = 4  # ticks
+MAX_BUFFERED = 1024 * 1024  # bytes queued for one client before it is dropped as too slow
+MAX_HEADER = 64 * 1024
+MAX_BODY = 64 * 1024  # bytes of an HTTP request body
+MAX_FRAME = 64 * 1024  # bytes of a WebSocket frame payload
+
+COMMANDS = {
+    'feed': (FeedCommand, ('food_type',)),
+    'sleep': (SleepCommand, ()),
+    'exercise': (ExerciseCommand, ()),
+    'play': (PlayCommand, ('guess',)),
+    'clean': (CleanCommand, ()),
+    'special_ability': (SpecialAbilityCommand, ()),
+}
+
+STATUS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 409: 'Conflict',
+          405: 'Method Not Allowed', 413: 'Payload Too Large'}
+
+WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+OP_CONTINUATION, OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x8, 0x9, 0xA
+CLOSE_PROTOCOL_ERROR, CLOSE_TOO_BIG = 1002, 1009
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class FrameError(Exception):
+    """A WebSocket frame the server won't read; the connection is closed with `code`."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def encode_frame(payload, opcode=OP_TEXT, mask=False):
+    """One final WebSocket frame. Clients must mask what they send; the server never does."""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    length = len(payload)
+    header = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header += bytes([mask_bit | length])
+    elif length < 1 << 16:
+        header += bytes([mask_bit | 126]) + struct.pack('!H', length)
+    else:
+        header += bytes([mask_bit | 127]) + struct.pack('!Q', length)
+    if not mask:
+        return header + payload
+    key = os.urandom(4)
+    return header + key + _apply_mask(payload, key)
+
+
+def _apply_mask(payload, key):
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(len(payload), 'big')
+
+
+async def read_frame(reader, max_size=MAX_FRAME, require_mask=True):
+    """Returns (opcode, payload) of the next frame, unmasking it if needed.
+
+    Messages are always sent as one frame here, so fragments are refused, and
+    so is any payload over `max_size` before a byte of it is read. Clients
+    must mask their frames; a client reading the server's passes
+    `require_mask=False`.
+    """
+    first, second = await reader.readexactly(2)
+    if not first & 0x80 or first & 0x0F == OP_CONTINUATION:
+        raise FrameError(CLOSE_PROTOCOL_ERROR, "Fragmented messages are not supported.")
+    if require_mask and not second & 0x80:
+        raise FrameError(CLOSE_PROTOCOL_ERROR, "Client frames must be masked.")
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack('!Q', await reader.readexactly(8))
+    if length > max_size:
+        raise FrameError(CLOSE_TOO_BIG, f"Frames are limited to {max_size} bytes.")
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if key is not None:
+        payload = _apply_mask(payload, key)
+    return first & 0x0F, payload
+
+
+def websocket_accept(key):
+    return base64.b64encode(hashlib.sha1(key.encode('ascii') + WS_GUID).digest()).decode('ascii')
+
+
+class _LoopTimer:
+    """The two Tk timer calls TickScheduler needs, backed by the asyncio event loop."""
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def after(self, delay_ms, callback):
+        return self.loop.call_later(delay_ms / 1000, callback)
+
+    def after_cancel(self, handle):
+        handle.cancel()
+
+
+class Connection:
+    """One WebSocket client and the pushes waiting for the next batch."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.subscriptions = set()
+        self.seen = {}  # pet id -> version of the pet this client last received
+        self.outbox = []
+        self.closed = False
+
+    def send(self, data):
+        if self.closed:
+            return
+        if self.writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+            # The client stopped reading; drop it instead of buffering without bound
+            self.closed = True
+            self.writer.transport.abort()
+            return
+        self.writer.write(data)
+
+
+class PetService:
+    """Owns the live pets, ticks them and persists them without blocking the event loop.
+
+    Commands run to completion on the event loop, so the commands of one pet are
+    applied one at a time in arrival order and never interleave with its ticks.
+    Changed pets are handed to an AutoSaver, which writes kennel rows on a
+    background thread, in one batch every `save_interval` seconds.
+    """
+
+    def __init__(self, kennel_path=KENNEL_PATH, push_interval=PUSH_INTERVAL, save_interval=SAVE_INTERVAL):
+        self.kennel = KennelStore(kennel_path)
+        self.autosaver = AutoSaver(self.kennel.row_for, self.kennel.write_rows)
+        self.push_interval = push_interval
+        self.save_interval = save_interval
+        self.pets = {}  # kennel id -> pet
+        self.versions = defaultdict(int)  # kennel id -> number of changes so far
+        self.messages = defaultdict(list)  # kennel id -> notifications raised since the last push
+        self.subscribers = defaultdict(set)  # kennel id -> connections
+        self.dirty = set()
+        self.unsaved = set()
+        self.dead = set()  # kennel ids of dead pets, dropped from memory once their last save is written
+        self.scheduler = None
+        self._loading = {}
+        self._tasks = []
+        self.stats = {'commands': 0, 'pushes': 0, 'push_batches': 0, 'dropped_clients': 0}
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self.scheduler = TickScheduler(_LoopTimer(loop), on_tick=self.on_tick)
+        self._tasks = [loop.create_task(self._every(self.push_interval, self.push)),
+                       loop.create_task(self._every(self.save_interval, self.save))]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        if self.scheduler is not None:
+            self.scheduler.clear()
+        self.autosaver.submit_many(pet for pet in self.pets.values() if pet.alive)
+        await asyncio.get_running_loop().run_in_executor(None, self.autosaver.close)
+        self.kennel.close()
+
+    def _attach(self, pet):
+        pet_id = pet.kennel_id
+        pet.muted = True
+        pet.notifier = lambda kind, title, message: self.messages[pet_id].append(
+            {'kind': kind, 'title': title, 'message': message})
+        pet.update_status_callback = lambda: self.changed(pet_id)
+        pet.game_over_callback = lambda: self.on_death(pet_id)
+        self.pets[pet_id] = pet
+        if pet.alive:
+            self.scheduler.add(pet)
+        else:
+            self.dead.add(pet_id)
+
+    async def create_pet(self, fields):
+        if not isinstance(fields, dict):
+            raise ServiceError(400, "The pet must be a JSON object.")
+        pet_type = fields.get('pet_type', 'dog')
+        if pet_type not in PET_CLASSES:
+            raise ServiceError(400, f"Unknown pet type {pet_type!r}.")
+        name = str(fields.get('name') or '').strip()
+        if not name:
+            raise ServiceError(400, "A pet needs a name.")
+        pet = PET_CLASSES[pet_type](name, str(fields.get('color', '')), str(fields.get('pattern', '')),
+                                    str(fields.get('accessories', '')), None, None, pet_type)
+        await asyncio.get_running_loop().run_in_executor(None, self.kennel.add, pet)
+        self._attach(pet)
+        return pet
+
+    async def get_pet(self, pet_id):
+        pet = self.pets.get(pet_id)
+        if pet is not None:
+            return pet
+        # Concurrent requests for the same saved pet share one kennel read
+        loading = self._loading.get(pet_id)
+        if loading is None:
+            loading = asyncio.get_running_loop().run_in_executor(None, self.kennel.load, pet_id)
+            self._loading[pet_id] = loading
+        try:
+            pet = await loading
+        except KeyError:
+            raise ServiceError(404, f"No pet {pet_id}.")
+        finally:
+            self._loading.pop(pet_id, None)
+        if pet_id not in self.pets:
+            self._attach(pet)
+        return self.pets[pet_id]
+
+    def changed(self, pet_id):
+        self.versions[pet_id] += 1
+        self.dirty.add(pet_id)
+
+    async def command(self, pet_id, request, connection=None):
+        pet = await self.get_pet(pet_id)
+        name = request.get('command')
+        if name not in COMMANDS:
+            raise ServiceError(400, f"Unknown command {name!r}.")
+        if not pet.alive:
+            raise ServiceError(409, f"{pet.name} has passed away.")
+        command_class, arguments = COMMANDS[name]
+        kwargs = {argument: str(request[argument]) for argument in arguments if argument in request}
+        if name == 'feed' and kwargs.get('food_type') not in ('meal', 'snack'):
+            raise ServiceError(400, "food_type must be 'meal' or 'snack'.")
+        if name == 'play' and 'guess' not in kwargs:
+            raise ServiceError(400, "play needs a guess.")
+
+        already_queued = len(self.messages[pet_id])
+        command_class(pet, **kwargs).execute()
+        messages = self.messages[pet_id][already_queued:]
+        del self.messages[pet_id][already_queued:]  # returned to the caller instead of pushed
+        self.stats['commands'] += 1
+        self.unsaved.add(pet_id)
+        if connection is not None:
+            # The reply carries the new status, so the next push can skip this client
+            connection.seen[pet_id] = self.versions[pet_id]
+        return {'status': pet_status(pet), 'messages': messages}
+
+    def on_tick(self, pet):
+        if pet.alive and pet.age % AUTOSAVE_EVERY == 0:
+            self.unsaved.add(pet.kennel_id)
+
+    def on_death(self, pet_id):
+        pet = self.pets[pet_id]
+        self.scheduler.remove(pet)
+        self.unsaved.add(pet_id)
+        self.messages[pet_id].append({'kind': 'game_over', 'title': "Game Over",
+                                      'message': f"Unfortunately, {pet.name} has passed away."})
+        self.dirty.add(pet_id)
+        self.dead.add(pet_id)
+
+    def subscribe(self, connection, pet_id):
+        """Subscribes a client that was just sent the pet's current status."""
+        connection.subscriptions.add(pet_id)
+        connection.seen[pet_id] = self.versions[pet_id]
+        self.subscribers[pet_id].add(connection)
+
+    def disconnect(self, connection):
+        connection.closed = True
+        for pet_id in connection.subscriptions:
+            self.subscribers[pet_id].discard(connection)
+            if not self.subscribers[pet_id]:
+                del self.subscribers[pet_id]
+
+    async def _every(self, interval, callback):
+        while True:
+            await asyncio.sleep(interval)
+            callback()
+
+    def save(self):
+        unsaved, self.unsaved = self.unsaved, set()
+        if unsaved:
+            self.autosaver.submit_many(self.pets[pet_id] for pet_id in unsaved)
+        self.evict()
+
+    def evict(self):
+        """Forgets dead pets whose game over was pushed and whose last save is on disk.
+
+        A later request for one loads it from the kennel again, dead, and it is
+        dropped again after that.
+        """
+        for pet_id in list(self.dead):
+            if pet_id in self.unsaved or pet_id in self.dirty or self.autosaver.busy(self.pets[pet_id]):
+                continue
+            self.dead.discard(pet_id)
+            del self.pets[pet_id]
+            self.versions.pop(pet_id, None)
+            self.messages.pop(pet_id, None)
+
+    def push(self):
+        """Encodes each changed pet once and writes every connection's pending frames in one call."""
+        dirty, self.dirty = self.dirty, set()
+        touched = set()
+        for pet_id in dirty:
+            connections = self.subscribers.get(pet_id)
+            messages = self.messages.pop(pet_id, None)
+            if not connections:
+                continue
+            version = self.versions[pet_id]
+            stale = [connection for connection in connections if connection.seen.get(pet_id) != version]
+            if not stale and not messages:
+                continue
+            payload = {'event': 'status', 'status': pet_status(self.pets[pet_id])}
+            if messages:
+                payload['messages'] = messages
+                stale = connections
+            frame = encode_frame(json.dumps(payload))
+            for connection in stale:
+                connection.outbox.append(frame)
+                connection.seen[pet_id] = version
+                touched.add(connection)
+            self.stats['pushes'] += len(stale)
+        for connection in touched:
+            frames, connection.outbox = connection.outbox, []
+            connection.send(b''.join(frames))
+            if connection.closed:
+                self.stats['dropped_clients'] += 1
+                self.disconnect(connection)
+        if touched:
+            self.stats['push_batches'] += 1
+
+
+def pet_status(pet):
+    status = pet.to_dict()
+    del status['extras'], status['saved_at']
+    status['id'] = pet.kennel_id
+    status['life_stage'] = pet.life_stage
+    status['mood'] = pet.get_mood()
+    return status
+
+
+class Server:
+    """Speaks just enough HTTP/1.1 and WebSocket for the pet service."""
+
+    def __init__(self, service, host=HOST, port=PORT):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self.service.start()
+        self._server = await asyncio.start_server(self.handle, self.host, self.port, backlog=4096, limit=MAX_HEADER)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self.service.close()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                try:
+                    method, path, headers = parse_request(head)
+                except ValueError:
+                    respond(writer, 400, {'error': "Malformed request."})
+                    return
+                body = b''
+                if 'content-length' in headers:
+                    length = headers['content-length']
+                    if not length.isdecimal():
+                        respond(writer, 400, {'error': "Invalid Content-Length."})
+                        return
+                    if int(length) > MAX_BODY:
+                        respond(writer, 413, {'error': f"Request bodies are limited to {MAX_BODY} bytes."})
+                        return
+                    body = await reader.readexactly(int(length))
+                if (path == '/ws' and headers.get('upgrade', '').lower() == 'websocket'
+                        and 'sec-websocket-key' in headers):
+                    await self.websocket(reader, writer, headers)
+                    return
+                status, payload = await self.route(method, path, body)
+                respond(writer, status, payload)
+                if headers.get('connection', '').lower() == 'close':
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        parts = [part for part in path.split('?')[0].split('/') if part]
+        try:
+            request = json.loads(body) if body else {}
+            if not isinstance(request, dict):
+                raise ServiceError(400, "The request body must be a JSON object.")
+            if parts == ['pets'] and method == 'POST':
+                pet = await self.service.create_pet(request)
+                return 201, pet_status(pet)
+            if len(parts) >= 2 and parts[0] == 'pets' and parts[1].isdigit():
+                pet_id = int(parts[1])
+                if len(parts) == 2 and method == 'GET':
+                    return 200, pet_status(await self.service.get_pet(pet_id))
+                if parts[2:] == ['commands'] and method == 'POST':
+                    return 200, await self.service.command(pet_id, request)
+                if parts[2:] in ([], ['commands']):
+                    raise ServiceError(405, f"{method} is not allowed here.")
+            raise ServiceError(404, f"Nothing at {path}.")
+        except ServiceError as e:
+            return e.status, {'error': str(e)}
+        except ValueError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+
+    async def websocket(self, reader, writer, headers):
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Accept: {websocket_accept(headers["sec-websocket-key"])}\r\n\r\n')
+                     .encode('ascii'))
+        connection = Connection(writer)
+        try:
+            while not connection.closed:
+                try:
+                    opcode, payload = await read_frame(reader)
+                except FrameError as e:
+                    writer.write(encode_frame(struct.pack('!H', e.code) + str(e).encode('utf-8'), OP_CLOSE))
+                    return
+                if opcode == OP_CLOSE:
+                    writer.write(encode_frame(payload[:2], OP_CLOSE))
+                    return
+                if opcode == OP_PING:
+                    connection.send(encode_frame(payload, OP_PONG))
+                elif opcode == OP_TEXT:
+                    reply = await self.websocket_request(connection, payload)
+                    connection.send(encode_frame(json.dumps(reply)))
+        finally:
+            self.service.disconnect(connection)
+
+    async def websocket_request(self, connection, payload):
+        service = self.service
+        request_id = None
+        try:
+            request = json.loads(payload)
+            if not isinstance(request, dict):
+                raise ServiceError(400, "Requests must be JSON objects.")
+            request_id = request.get('id')
+            op = request.get('op')
+            if op == 'create':
+                pet = await service.create_pet(request.get('pet', {}))
+                service.subscribe(connection, pet.kennel_id)
+                return {'id': request_id, 'ok': True, 'status': pet_status(pet)}
+            pet_id = request.get('pet_id')
+            if not isinstance(pet_id, int):
+                raise ServiceError(400, "pet_id must be an integer.")
+            if op == 'subscribe':
+                pet = await service.get_pet(pet_id)
+                service.subscribe(connection, pet_id)
+                return {'id': request_id, 'ok': True, 'status': pet_status(pet)}
+            if op == 'command':
+                return {'id': request_id, 'ok': True, **await service.command(pet_id, request, connection)}
+            raise ServiceError(400, f"Unknown op {op!r}.")
+        except ServiceError as e:
+            return {'id': request_id, 'ok': False, 'error': str(e)}
+        except ValueError as e:
+            return {'id': request_id, 'ok': False, 'error': f"Invalid JSON: {e}"}
+
+
+def parse_request(head):
+    lines = head.decode('latin-1').split('\r\n')
+    method, path, _ = lines[0].split(' ', 2)
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, path, headers
+
+
+def respond(writer, status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    writer.write((f'HTTP/1.1 {status} {STATUS[status]}\r\nContent-Type: application/json\r\n'
+                  f'Content-Length: {len(body)}\r\n\r\n').encode('ascii') + body)
+
+
+def raise_open_file_limit():
+    """Every connection is a file descriptor, so allow as many as the hard limit permits."""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def serve(host=HOST, port=PORT, kennel_path=KENNEL_PATH, ready=None):
+    server = await Server(PetService(kennel_path), host, port).start()
+    print(f"Serving on http://{server.host}:{server.port}", flush=True)
+    if ready is not None:
+        ready(server)
+    # Shut down cleanly on Ctrl+C or SIGTERM so the last autosaves reach the kennel
+    loop, task = asyncio.get_running_loop(), asyncio.current_task()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve pets over HTTP and WebSocket.")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--kennel', default=KENNEL_PATH)
+    args = parser.parse_args()
+    raise_open_file_limit()
+    start_exporters()
+    try:
+        asyncio.run(serve(args.host, args.port, args.kennel))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import time
+import tkinter as tk
+from collections import deque
+
+from helpers.notifications import notifications
+
+TOAST_MS = 3500  # how long a toast stays up after its last repeat
+MAX_TOASTS = 4
+POLL_MS = 100
+MAX_PENDING = 256  # a burst beyond this drops its oldest notifications before they're shown
+TOAST_SPACING = 34
+COLORS = {'info': '#34495e', 'warning': '#d35400', 'error': '#c0392b'}
+
+
+class ToastManager:
+    """Shows bus notifications as small non-modal toasts stacked at the bottom of the window.
+
+    The bus listener only queues, so publishing never touches Tk and can't
+    block a tick. The queue is drained from `after`. A notification that says
+    the same as a toast already up bumps that toast's count and lifetime
+    instead of stacking a copy. The labels are created once and reused.
+    """
+
+    def __init__(self, root, bus=notifications, duration_ms=TOAST_MS, max_toasts=MAX_TOASTS):
+        self.root = root
+        self.bus = bus
+        self.duration = duration_ms / 1000
+        self.pending = deque(maxlen=MAX_PENDING)
+        self.labels = [tk.Label(root, font=("Helvetica", 10), fg='white', padx=10, pady=4, wraplength=360)
+                       for _ in range(max_toasts)]
+        self.toasts = []  # [notification, count, expires at], oldest first, at most one per label
+        self.stats = {'shown': 0, 'coalesced': 0}
+        self.job = None
+        bus.subscribe(self.pending.append)
+
+    def start(self):
+        if self.job is None:
+            self.job = self.root.after(POLL_MS, self.poll)
+
+    def stop(self):
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+        self.bus.unsubscribe(self.pending.append)
+
+    def poll(self):
+        self.job = self.root.after(POLL_MS, self.poll)
+        now = time.monotonic()
+        changed = False
+        while self.pending:
+            notification = self.pending.popleft()
+            changed = True
+            for toast in self.toasts:
+                if toast[0].key == notification.key:
+                    toast[1] += 1
+                    toast[2] = now + self.duration
+                    self.stats['coalesced'] += 1
+                    break
+            else:
+                if len(self.toasts) == len(self.labels):
+                    self.toasts.pop(0)  # the oldest makes room
+                self.toasts.append([notification, 1, now + self.duration])
+                self.stats['shown'] += 1
+        live = [toast for toast in self.toasts if toast[2] > now]
+        if changed or len(live) != len(self.toasts):
+            self.toasts = live
+            self.layout()
+
+    def layout(self):
+        for i, label in enumerate(self.labels):
+            if i >= len(self.toasts):
+                label.place_forget()
+                continue
+            notification, count, _ = self.toasts[i]
+            text = notification.message if count == 1 else f"{notification.message} (x{count})"
+            label.config(text=text, bg=COLORS.get(notification.kind, COLORS['info']))
+            label.place(relx=0.5, rely=1.0, y=-10 - (len(self.toasts) - 1 - i) * TOAST_SPACING, anchor='s')
+            label.lift()
@@ -0,0 +1,128 @@
+from array import array
+
+METERS = ('hunger', 'happiness', 'health', 'cleanliness', 'weight')
+CAPACITY = 512  # samples kept per resolution level
+FACTOR = 16  # samples of one level averaged into one sample of the next
+LEVELS = 4  # 512 ticks at full resolution, then ~1.4 days, ~22 days and ~1 year at 15 s per tick
+
+
+class RingBuffer:
+    """Fixed-capacity typed buffer that overwrites its oldest value once full."""
+
+    __slots__ = ('data', 'start', 'size')
+
+    def __init__(self, capacity, typecode='f'):
+        self.data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self.start = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, value):
+        capacity = len(self.data)
+        if self.size < capacity:
+            self.data[(self.start + self.size) % capacity] = value
+            self.size += 1
+        else:
+            self.data[self.start] = value
+            self.start = (self.start + 1) % capacity
+
+    def __getitem__(self, index):
+        if not -self.size <= index < self.size:
+            raise IndexError("ring buffer index out of range")
+        return self.data[(self.start + index % self.size) % len(self.data)]
+
+    def __iter__(self):
+        """Values oldest first."""
+        end = self.start + self.size
+        if end <= len(self.data):
+            return iter(self.data[self.start:end])
+        return iter(self.data[self.start:] + self.data[:end - len(self.data)])
+
+
+class MeterHistory:
+    """Per-tick meter values of one pet at several resolutions, in bounded memory.
+
+    Level 0 keeps the last `capacity` ticks as recorded. Every `factor`
+    samples of a level are averaged into one sample of the next, so each
+    level reaches `factor` times further back than the one before it and the
+    whole history never holds more than `levels * capacity` samples per meter.
+    """
+
+    def __init__(self, capacity=CAPACITY, factor=FACTOR, levels=LEVELS):
+        self.factor = factor
+        self.ticks = [RingBuffer(capacity, 'l') for _ in range(levels)]
+        self.values = [{meter: RingBuffer(capacity, 'f') for meter in METERS} for _ in range(levels)]
+        self._sums = [[0.0] * len(METERS) for _ in range(levels)]  # pending average for the next level
+        self._counts = [0] * levels
+        self.recorded = 0
+
+    def record(self, pet):
+        """Stores the pet's meters for its current tick."""
+        self.recorded += 1
+        self._push(0, pet.age, [getattr(pet, meter) for meter in METERS])
+
+    def _push(self, level, tick, values):
+        self.ticks[level].append(tick)
+        for meter, value in zip(METERS, values):
+            self.values[level][meter].append(value)
+        if level + 1 == len(self.ticks):
+            return
+        sums = self._sums[level]
+        for i, value in enumerate(values):
+            sums[i] += value
+        self._counts[level] += 1
+        if self._counts[level] == self.factor:
+            self._push(level + 1, tick, [total / self.factor for total in sums])
+            self._sums[level] = [0.0] * len(METERS)
+            self._counts[level] = 0
+
+    def series(self, meter):
+        """(tick, value) pairs for the whole history, oldest first, each span at the finest level that covers it."""
+        points = []
+        for level in reversed(range(len(self.ticks))):
+            ticks = self.ticks[level]
+            if not len(ticks):
+                continue
+            # Stop where the next finer level starts; it reaches less far back but has more detail
+            finer = self.ticks[level - 1][0] if level else None
+            for tick, value in zip(ticks, self.values[level][meter]):
+                if finer is not None and tick >= finer:
+                    break
+                if not points or tick > points[-1][0]:
+                    points.append((tick, value))
+        return points
+
+    def nbytes(self):
+        return sum(buffer.data.itemsize * len(buffer.data)
+                   for level in range(len(self.ticks))
+                   for buffer in [self.ticks[level], *self.values[level].values()])
+
+
+def lttb(points, threshold):
+    """Largest-Triangle-Three-Buckets: picks `threshold` of `points` that keep the shape of the line."""
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    bucket = (count - 2) / (threshold - 2)
+    previous = points[0]
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        # Average of the next bucket, or the last point for the final one
+        next_end = min(int((i + 2) * bucket) + 1, count)
+        following = points[end:next_end] or points[-1:]
+        avg_x = sum(x for x, _ in following) / len(following)
+        avg_y = sum(y for _, y in following) / len(following)
+        ax, ay = previous
+        best, best_area = None, -1.0
+        for point in points[start:end]:
+            area = abs((ax - avg_x) * (point[1] - ay) - (ax - point[0]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = point, area
+        sampled.append(best)
+        previous = best
+    sampled.append(points[-1])
+    return sampled
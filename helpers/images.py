@@ -0,0 +1,142 @@
+import glob
+import json
+import os
+import threading
+
+from models.species import registry
+
+CACHE_DIR = '.cache'
+ATLAS_FILE = 'sprites.png'
+MANIFEST_FILE = 'sprites.json'
+ATLAS_WIDTH = 1024
+
+ICON_SIZE = (50, 50)
+SPRITE_SIZE = (150, 150)
+
+
+def default_variants():
+    """Every (source, size) pair the game draws: pet type icons and the activity sprites."""
+    variants = [(species.icon, ICON_SIZE) for species in registry if species.icon]
+    for path in sorted(glob.glob('images/*.png')):
+        variants.append((path.replace(os.sep, '/'), SPRITE_SIZE))
+    return variants
+
+
+def variant_key(source, size):
+    return f"{source}@{size[0]}x{size[1]}"
+
+
+class SpriteAtlas:
+    """Packs pre-resized sprites into one cached atlas image.
+
+    The atlas and a manifest describing it are written to `cache_dir` the first
+    time the game runs, and rebuilt only when a source file's mtime or size
+    changes. Each `PhotoImage` is created once per process and then reused.
+    PIL is only imported once the atlas is first needed, and `start_preload`
+    can decode it on a background thread while the first frame paints.
+    """
+
+    def __init__(self, variants=None, cache_dir=CACHE_DIR):
+        self.variants = variants if variants is not None else default_variants()
+        self.atlas_path = os.path.join(cache_dir, ATLAS_FILE)
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        self._atlas = None
+        self._boxes = {}
+        self._photos = {}
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._atlas is not None
+
+    def start_preload(self):
+        threading.Thread(target=self.load, name="sprite-preload", daemon=True).start()
+
+    def _fingerprint(self, source, size):
+        stat = os.stat(source)
+        return {'source': source, 'size': list(size), 'mtime_ns': stat.st_mtime_ns, 'bytes': stat.st_size}
+
+    def _manifest_is_fresh(self, manifest):
+        entries = manifest.get('sprites', {})
+        if set(entries) != {variant_key(*v) for v in self.variants}:
+            return False
+        for source, size in self.variants:
+            entry = dict(entries[variant_key(source, size)])
+            entry.pop('box')
+            if entry != self._fingerprint(source, size):
+                return False
+        return os.path.exists(self.atlas_path)
+
+    def load(self):
+        """Opens the cached atlas, rebuilding it first if any source changed."""
+        with self._load_lock:
+            if self._atlas is None:
+                self._load()
+
+    def _load(self):
+        from PIL import Image
+        manifest = None
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = None
+        if manifest is None or not self._manifest_is_fresh(manifest):
+            manifest = self.build()
+        boxes = {key: tuple(entry['box']) for key, entry in manifest['sprites'].items()}
+        with Image.open(self.atlas_path) as atlas:
+            atlas = atlas.convert('RGBA')
+        self._boxes = boxes
+        self._atlas = atlas
+
+    def build(self):
+        """Resizes every variant and shelf-packs them into a single atlas image."""
+        from PIL import Image
+        sprites = []
+        for source, size in self.variants:
+            with Image.open(source) as image:
+                sprites.append((source, size, image.convert('RGBA').resize(size, Image.LANCZOS)))
+
+        boxes = {}
+        x = y = shelf_height = 0
+        for source, size, image in sprites:
+            width, height = image.size
+            if x + width > ATLAS_WIDTH:
+                x, y = 0, y + shelf_height
+                shelf_height = 0
+            boxes[variant_key(source, size)] = (x, y, x + width, y + height)
+            x += width
+            shelf_height = max(shelf_height, height)
+
+        atlas = Image.new('RGBA', (ATLAS_WIDTH, max(1, y + shelf_height)))
+        for source, size, image in sprites:
+            atlas.paste(image, boxes[variant_key(source, size)][:2])
+
+        manifest = {'sprites': {}}
+        for source, size in self.variants:
+            entry = self._fingerprint(source, size)
+            entry['box'] = list(boxes[variant_key(source, size)])
+            manifest['sprites'][variant_key(source, size)] = entry
+
+        os.makedirs(os.path.dirname(self.atlas_path) or '.', exist_ok=True)
+        atlas.save(self.atlas_path + '.tmp', format='PNG')
+        os.replace(self.atlas_path + '.tmp', self.atlas_path)
+        with open(self.manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+        return manifest
+
+    def photo(self, source, size):
+        """Returns the shared `PhotoImage` for `source` resized to `size`."""
+        key = variant_key(source, size)
+        photo = self._photos.get(key)
+        if photo is None:
+            from PIL import ImageTk
+            self.load()
+            photo = ImageTk.PhotoImage(self._atlas.crop(self._boxes[key]))
+            self._photos[key] = photo
+        return photo
+
+
+sprites = SpriteAtlas()
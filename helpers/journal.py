@@ -0,0 +1,292 @@
+import glob
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+from helpers.savegame import SaveError, atomic_write, decode_pet, encode_pet
+
+JOURNAL_DIR = 'journals'
+SNAPSHOT_EVERY = 100  # events between snapshots
+KEEP_SNAPSHOTS = 5  # recent snapshots kept besides the initial one
+LOG_FILE = 'events.log'
+SNAPSHOT_PATTERN = 'snapshot-*.bin'
+
+# Pet methods that can appear in a journal, in wire order. Only ever append to this tuple.
+ACTIONS = ('tick', 'feed', 'play_guess', 'sleep', 'exercise', 'clean', 'activate_special_ability',
+           'fetch_favorite_toy', 'sharpen_claws', 'catch_up', 'unique_action')
+_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+RECORD = struct.Struct('<IBB')  # sequence number, action code, argument tag
+# _ARG_MANY is followed by an argument count and then a tag and value per argument
+_ARG_NONE, _ARG_STR, _ARG_INT, _ARG_MANY = 0, 1, 2, 3
+_STR_LENGTH = struct.Struct('<H')
+_INT = struct.Struct('<q')
+_TAG = struct.Struct('<B')  # argument count or tag inside an _ARG_MANY record
+
+SNAPSHOT_HEADER = struct.Struct('<II')  # last sequence number covered, pet blob length
+RNG_STATE = struct.Struct('<B625Id')  # random.Random state: version, Mersenne Twister words, gauss_next
+
+
+def _encode_arg(arg):
+    """(tag, encoded value) of one event argument."""
+    if isinstance(arg, int):
+        return _ARG_INT, _INT.pack(arg)
+    raw = str(arg).encode('utf-8')
+    return _ARG_STR, _STR_LENGTH.pack(len(raw)) + raw
+
+
+def encode_event(seq, action, args):
+    if not args:
+        return RECORD.pack(seq, _CODES[action], _ARG_NONE)
+    if len(args) == 1:
+        tag, value = _encode_arg(args[0])
+        return RECORD.pack(seq, _CODES[action], tag) + value
+    out = RECORD.pack(seq, _CODES[action], _ARG_MANY) + _TAG.pack(len(args))
+    for arg in args:
+        tag, value = _encode_arg(arg)
+        out += _TAG.pack(tag) + value
+    return out
+
+
+def _read_arg(data, offset, tag):
+    """Returns (value, offset after it), or None if the log ends partway through it."""
+    if tag == _ARG_INT:
+        if offset + _INT.size > len(data):
+            return None
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if offset + _STR_LENGTH.size > len(data):
+        return None
+    (length,) = _STR_LENGTH.unpack_from(data, offset)
+    offset += _STR_LENGTH.size
+    if offset + length > len(data):
+        return None
+    return data[offset:offset + length].decode('utf-8'), offset + length
+
+
+def read_events(path, after=0):
+    """Yields (seq, action, args) for every complete event after sequence number `after`."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset + RECORD.size <= len(data):
+        seq, code, tag = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if tag == _ARG_NONE:
+            tags = []
+        elif tag == _ARG_MANY:
+            if offset >= len(data):
+                return
+            tags = [None] * data[offset]  # each argument is preceded by its own tag
+            offset += 1
+        else:
+            tags = [tag]
+        args = []
+        for arg_tag in tags:
+            if arg_tag is None:
+                if offset >= len(data):
+                    return
+                arg_tag = data[offset]
+                offset += 1
+            arg = _read_arg(data, offset, arg_tag)
+            if arg is None:
+                return  # torn write at the end of the log
+            value, offset = arg
+            args.append(value)
+        if seq > after:
+            yield seq, ACTIONS[code], tuple(args)
+
+
+class Journal:
+    """Append-only log of everything that happens to one pet.
+
+    Each command and tick is appended as a small binary record. Every
+    `snapshot_every` events the pet and its RNG state are snapshotted, so
+    rebuilding a pet only replays the tail after the nearest snapshot. The log
+    itself is never rewritten, which keeps saves append-only and lets any
+    point in the pet's life be reproduced.
+    """
+
+    def __init__(self, directory, snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        self.log_path = os.path.join(directory, LOG_FILE)
+        self.snapshot_every = snapshot_every
+        self.pet = None
+        self.seq = 0
+        self._since_snapshot = 0
+
+    @classmethod
+    def exists(cls, directory):
+        return bool(cls(directory).snapshots())
+
+    def snapshots(self):
+        """Sequence numbers of the snapshots on disk, oldest first."""
+        paths = glob.glob(os.path.join(self.directory, SNAPSHOT_PATTERN))
+        return sorted(int(os.path.basename(path)[len('snapshot-'):-len('.bin')]) for path in paths)
+
+    def updated_at(self):
+        """When anything was last written to the journal, or None if nothing was."""
+        paths = [self.log_path] + [self._snapshot_path(seq) for seq in self.snapshots()[-1:]]
+        return max((os.path.getmtime(path) for path in paths if os.path.exists(path)), default=None)
+
+    def _snapshot_path(self, seq):
+        return os.path.join(self.directory, f'snapshot-{seq:010d}.bin')
+
+    @classmethod
+    def start(cls, pet, directory, seed=None):
+        """Begins journaling `pet`: gives it a seeded RNG stream and writes the initial snapshot."""
+        os.makedirs(directory, exist_ok=True)
+        journal = cls(directory)
+        pet.seed_rng(seed)
+        journal.attach(pet, 0)
+        journal.snapshot()
+        return journal
+
+    @classmethod
+    def restore(cls, directory, until=None, on_event=None):
+        """Rebuilds a pet from the latest snapshot and the events logged after it.
+
+        With `until`, replay starts from the nearest earlier snapshot and stops
+        after that sequence number, and the journal is left detached since the
+        pet is no longer at the end of its history. Otherwise the journal is
+        attached so the pet keeps recording. Returns (pet, last replayed seq).
+        """
+        journal = cls(directory)
+        snapshots = journal.snapshots()
+        if not snapshots:
+            raise SaveError(f"No journal snapshot in {directory}.")
+        if until is not None:
+            snapshots = [seq for seq in snapshots if seq <= until] or snapshots[:1]
+        seq, pet = journal._load_snapshot(snapshots[-1])
+        pet.muted = True
+        pet.notifier = on_event or (lambda kind, title, message: None)
+        for seq_number, action, args in read_events(journal.log_path, after=seq):
+            if until is not None and seq_number > until:
+                break
+            getattr(pet, action)(*args)
+            seq = seq_number
+        pet.muted = False
+        pet.notifier = None
+        if until is None:
+            journal.attach(pet, seq)
+        return pet, seq
+
+    def attach(self, pet, seq):
+        if seq < self._last_logged_seq():
+            raise SaveError("Cannot keep recording from the middle of a journal.")
+        self.pet = pet
+        self.seq = seq
+        self._since_snapshot = seq - self.snapshots()[-1] if self.snapshots() else 0
+        pet.journal = self
+
+    def _last_logged_seq(self):
+        last = 0
+        for last, _, _ in read_events(self.log_path):
+            pass
+        return last
+
+    def append(self, action, *args):
+        # Called before the action touches the pet, so a snapshot taken here
+        # still reflects every earlier event and none of this one
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        self.seq += 1
+        # Opened per event rather than held, so a household of many journaled pets doesn't pin a file each
+        with open(self.log_path, 'ab') as log:
+            log.write(encode_event(self.seq, action, args))
+        self._since_snapshot += 1
+
+    def snapshot(self):
+        blob = encode_pet(self.pet)
+        version, words, gauss_next = self.pet.rng.getstate()
+        rng_state = RNG_STATE.pack(version, *words, float('nan') if gauss_next is None else gauss_next)
+        atomic_write(self._snapshot_path(self.seq), SNAPSHOT_HEADER.pack(self.seq, len(blob)) + blob + rng_state)
+        self._since_snapshot = 0
+        # Keep the initial snapshot so the whole life can always be replayed
+        for seq in self.snapshots()[1:-KEEP_SNAPSHOTS]:
+            os.remove(self._snapshot_path(seq))
+
+    def _load_snapshot(self, seq):
+        with open(self._snapshot_path(seq), 'rb') as f:
+            data = f.read()
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise SaveError("Journal snapshot is truncated.")
+        seq, length = SNAPSHOT_HEADER.unpack_from(data)
+        blob = data[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + length]
+        pet = decode_pet(blob)
+        state = RNG_STATE.unpack_from(data, SNAPSHOT_HEADER.size + length)
+        gauss_next = None if state[-1] != state[-1] else state[-1]
+        pet.rng = random.Random()
+        pet.rng.setstate((state[0], tuple(state[1:-1]), gauss_next))
+        return seq, pet
+
+    def close(self):
+        if self.pet is not None and self.pet.journal is self:
+            self.pet.journal = None
+
+
+def replay(directory, until=None, verbose=False):
+    """Rebuilds a journaled pet as fast as possible and prints where it ended up."""
+    def on_event(kind, title, message):
+        if verbose:
+            print(f"[{title}] {message}")
+
+    started = time.perf_counter()
+    pet, events = Journal.restore(directory, until=until, on_event=on_event)
+    elapsed = time.perf_counter() - started
+    if pet.journal is not None:
+        pet.journal.close()
+    print(pet.status())
+    print(f"Replayed up to event {events} in {elapsed * 1000:.1f} ms")
+    return pet
+
+
+def check_round_trip(ticks=350, snapshot_every=7, seed=1):
+    """Drives journaled pets through merged commands and, after every tick, checks that
+    restoring them gives back the live pet. Returns the first difference per species."""
+    from models.species import registry
+
+    differences = []
+    for species in registry:
+        with tempfile.TemporaryDirectory() as directory:
+            pet = registry.create(species.name, 'Check')
+            pet.muted = True
+            pet.notifier = lambda kind, title, message: None
+            journal = Journal.start(pet, directory, seed=seed)
+            journal.snapshot_every = snapshot_every  # small, so snapshots keep landing next to merged commands
+            for i in range(ticks):
+                if i % 3 == 0:
+                    pet.feed('meal' if i % 2 else 'snack', times=1 + i % 4)
+                if i % 5 == 0:
+                    pet.sleep(times=2)
+                if i % 7 == 0:
+                    pet.exercise(times=3)
+                if i % 11 == 0:
+                    pet.clean(times=2)
+                pet.tick()
+                restored, seq = Journal.restore(directory)
+                restored.journal.close()
+                live, rebuilt = pet.to_dict(), restored.to_dict()
+                fields = [field for field in live if field != 'saved_at' and live[field] != rebuilt[field]]
+                if pet.rng.getstate() != restored.rng.getstate():
+                    fields.append('rng')
+                if fields:
+                    differences.append(f"{species.name} after event {seq}: " + ", ".join(
+                        f"{field} live {live.get(field)!r}, restored {rebuilt.get(field)!r}" for field in fields))
+                    break
+    return differences
+
+
+if __name__ == '__main__':
+    # python -m helpers.journal journals/pet-1 [until-seq] [-v]
+    # python -m helpers.journal --check
+    if '--check' in sys.argv:
+        differences = check_round_trip()
+        print("\n".join(differences) or "Restored pets match the live ones.")
+        sys.exit(1 if differences else 0)
+    arguments = [arg for arg in sys.argv[1:] if arg != '-v']
+    replay(arguments[0], until=int(arguments[1]) if len(arguments) > 1 else None, verbose='-v' in sys.argv)
@@ -0,0 +1,168 @@
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from helpers.savegame import decode_pet, encode_pet
+
+KENNEL_PATH = 'kennel.db'
+POOL_SIZE = 4
+PAGE_SIZE = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    pet_type TEXT NOT NULL,
+    life_stage INTEGER NOT NULL,
+    alive INTEGER NOT NULL,
+    age INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pets_name ON pets (name);
+CREATE INDEX IF NOT EXISTS pets_type ON pets (pet_type, alive, saved_at);
+CREATE INDEX IF NOT EXISTS pets_life_stage ON pets (life_stage);
+CREATE INDEX IF NOT EXISTS pets_alive ON pets (alive, saved_at);
+"""
+
+UPSERT = """
+INSERT INTO pets (id, name, pet_type, life_stage, alive, age, saved_at, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    name = excluded.name, pet_type = excluded.pet_type, life_stage = excluded.life_stage,
+    alive = excluded.alive, age = excluded.age, saved_at = excluded.saved_at, data = excluded.data
+"""
+
+# Lightweight listing row; the pet itself is only decoded by KennelStore.load
+KennelEntry = namedtuple('KennelEntry', 'id name pet_type life_stage alive age saved_at')
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared by the UI and background threads."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self._connections = queue.Queue()
+        for _ in range(size):
+            connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            self._connections.put(connection)
+        self.size = size
+
+    @contextmanager
+    def connection(self):
+        connection = self._connections.get()
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        for _ in range(self.size):
+            self._connections.get().close()
+
+
+class KennelStore:
+    """SQLite store holding one row per pet, in WAL mode so reads never wait on writes."""
+
+    def __init__(self, path=KENNEL_PATH, pool_size=POOL_SIZE):
+        self.pool = ConnectionPool(path, pool_size)
+        self._id_lock = threading.Lock()
+        with self.pool.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def row_for(self, pet):
+        """Encodes a pet into an upsert row. Cheap enough to call on the UI thread."""
+        blob = encode_pet(pet)
+        return (pet.kennel_id, pet.name, pet.pet_type, pet.life_stage_index, int(pet.alive), pet.age,
+                time.time(), blob)
+
+    def write_rows(self, rows):
+        """Upserts many rows in a single transaction."""
+        with self.pool.connection() as connection:
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(UPSERT, rows)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def add(self, pet):
+        """Stores a pet that has no row yet and assigns its `kennel_id`."""
+        with self._id_lock, self.pool.connection() as connection:
+            row = self.row_for(pet)
+            cursor = connection.execute(UPSERT, row)
+            pet.kennel_id = cursor.lastrowid
+        return pet.kennel_id
+
+    def save(self, pet):
+        if pet.kennel_id is None:
+            self.add(pet)
+        else:
+            self.write_rows([self.row_for(pet)])
+
+    def save_many(self, pets):
+        """Saves many pets in one transaction, assigning ids to the new ones."""
+        with self._id_lock, self.pool.connection() as connection:
+            connection.execute("BEGIN")
+            try:
+                rows = []
+                for pet in pets:
+                    row = self.row_for(pet)
+                    if pet.kennel_id is None:
+                        pet.kennel_id = connection.execute(UPSERT, row).lastrowid
+                    else:
+                        rows.append(row)
+                connection.executemany(UPSERT, rows)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def load(self, pet_id):
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT data FROM pets WHERE id = ?", (pet_id,)).fetchone()
+        if row is None:
+            raise KeyError(pet_id)
+        pet = decode_pet(row[0])
+        pet.kennel_id = pet_id
+        return pet
+
+    def delete(self, pet_id):
+        with self.pool.connection() as connection:
+            connection.execute("DELETE FROM pets WHERE id = ?", (pet_id,))
+
+    def _where(self, alive, pet_type, name):
+        clauses, params = [], []
+        if alive is not None:
+            clauses.append("alive = ?")
+            params.append(int(alive))
+        if pet_type is not None:
+            clauses.append("pet_type = ?")
+            params.append(pet_type)
+        if name is not None:
+            clauses.append("name = ?")
+            params.append(name)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def list_pets(self, offset=0, limit=PAGE_SIZE, alive=True, pet_type=None, name=None):
+        """Returns one page of pets, most recently saved first, without decoding them."""
+        where, params = self._where(alive, pet_type, name)
+        query = (f"SELECT id, name, pet_type, life_stage, alive, age, saved_at FROM pets{where}"
+                 f" ORDER BY saved_at DESC, id DESC LIMIT ? OFFSET ?")
+        with self.pool.connection() as connection:
+            rows = connection.execute(query, params + [limit, offset]).fetchall()
+        return [KennelEntry(*row) for row in rows]
+
+    def count(self, alive=True, pet_type=None, name=None):
+        where, params = self._where(alive, pet_type, name)
+        with self.pool.connection() as connection:
+            return connection.execute(f"SELECT COUNT(*) FROM pets{where}", params).fetchone()[0]
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,255 @@
+"""Opt-in instrumentation for the game's hot paths.
+
+Enabled by setting TAMAGOTCHI_METRICS=1 before the game starts. When it is not
+set, `timed` hands back the undecorated function and `observe` is never called,
+so instrumented code runs exactly as it would without this module.
+
+With metrics on, these environment variables control export:
+
+    TAMAGOTCHI_METRICS_FILE   Prometheus text file rewritten every EXPORT_INTERVAL seconds
+    TAMAGOTCHI_METRICS_PORT   serve the same text over HTTP at /metrics on localhost
+    TAMAGOTCHI_PROFILE_DIR    where captures started by SIGUSR1 (cProfile) or SIGUSR2 (sampling) go
+"""
+import bisect
+import functools
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+ENABLED = os.environ.get('TAMAGOTCHI_METRICS', '').lower() in ('1', 'true', 'yes', 'on')
+METRICS_FILE = os.environ.get('TAMAGOTCHI_METRICS_FILE', 'metrics.prom')
+METRICS_PORT = os.environ.get('TAMAGOTCHI_METRICS_PORT')
+PROFILE_DIR = os.environ.get('TAMAGOTCHI_PROFILE_DIR', 'profiles')
+EXPORT_INTERVAL = 10  # seconds
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+# Upper bounds in seconds, roughly logarithmic from 1 us to 30 s
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Prometheus-style cumulative latency histogram."""
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile."""
+        target, seen = q * self.count, 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0.0
+
+
+class Registry:
+    def __init__(self):
+        self.histograms = {}  # (metric name, path label) -> Histogram
+        self._lock = threading.Lock()
+
+    def histogram(self, name, path=''):
+        key = (name, path)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name, value, path=''):
+        self.histogram(name, path).observe(value)
+
+    def prometheus(self):
+        """Renders every histogram in the Prometheus text exposition format."""
+        lines = []
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, path), histogram in sorted(self.histograms.items()):
+                if metric != name:
+                    continue
+                label = f'path="{path}",' if path else ''
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label}le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label}le="+Inf"}} {histogram.count}')
+                label = f'{{path="{path}"}}' if path else ''
+                lines.append(f'{name}_sum{label} {histogram.total:.9f}')
+                lines.append(f'{name}_count{label} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=METRICS_FILE):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        """Call count, mean and approximate p50/p99 per instrumented path, for quick printing."""
+        return {f"{name}{{{path}}}" if path else name: {
+            'count': histogram.count,
+            'mean': histogram.total / histogram.count if histogram.count else 0.0,
+            'p50': histogram.quantile(0.5),
+            'p99': histogram.quantile(0.99),
+        } for (name, path), histogram in sorted(self.histograms.items())}
+
+
+registry = Registry()
+
+
+def timed(path, name='tamagotchi_call_seconds'):
+    """Records the latency of every call to the decorated function, if metrics are enabled."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        histogram = registry.histogram(name, path)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def observe(name, value, path=''):
+    registry.observe(name, value, path)
+
+
+class SamplingProfiler:
+    """Samples one thread's stack on a timer and counts collapsed stacks, flamegraph style."""
+
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self, path):
+        self._stop.set()
+        self._thread.join()
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Captures:
+    """Starts and stops on-demand profiler captures, one of each kind at a time."""
+
+    def __init__(self, directory=PROFILE_DIR):
+        self.directory = directory
+        self.cprofile = None
+        self.sampler = None
+
+    def _path(self, kind, extension):
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+    def toggle_cprofile(self):
+        """Starts a cProfile capture of the calling thread, or stops it and writes a .prof file."""
+        if self.cprofile is None:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+            return None
+        self.cprofile.disable()
+        path = self._path('cprofile', 'prof')
+        self.cprofile.dump_stats(path)
+        self.cprofile = None
+        return path
+
+    def toggle_sampling(self):
+        """Starts sampling the main thread, or stops and writes collapsed stacks."""
+        if self.sampler is None:
+            self.sampler = SamplingProfiler()
+            self.sampler.start()
+            return None
+        path = self._path('samples', 'txt')
+        self.sampler.stop(path)
+        self.sampler = None
+        return path
+
+
+captures = Captures()
+
+
+def _write_periodically(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            registry.write(path)
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
+
+
+def start_exporters():
+    """Starts the file and HTTP exporters and the profiling signals. Does nothing when disabled."""
+    if not ENABLED:
+        return
+    threading.Thread(target=_write_periodically, args=(METRICS_FILE, EXPORT_INTERVAL), name="metrics-file",
+                     daemon=True).start()
+    if METRICS_PORT:
+        serve_metrics(int(METRICS_PORT))
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: _report(captures.toggle_cprofile()))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: _report(captures.toggle_sampling()))
+
+
+def serve_metrics(port, host='127.0.0.1'):
+    """Serves the Prometheus text at http://host:port/metrics from a background thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _report(path):
+    print(f"Profile written to {path}" if path else "Profiling started")
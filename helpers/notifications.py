@@ -0,0 +1,55 @@
+from collections import deque
+
+RECENT = 100  # notifications kept for anyone who subscribes late or runs without a UI
+
+
+class Notification:
+    __slots__ = ('kind', 'title', 'message', 'source')
+
+    def __init__(self, kind, title, message, source=None):
+        self.kind = kind  # 'info', 'warning' or 'error'
+        self.title = title
+        self.message = message
+        self.source = source  # the pet it's about, if any
+
+    @property
+    def key(self):
+        """Notifications with the same key say the same thing and can be shown as one."""
+        return self.kind, self.title, self.message
+
+    def __repr__(self):
+        return f"Notification({self.kind!r}, {self.title!r}, {self.message!r})"
+
+
+class NotificationBus:
+    """Carries messages for the player from the models to whatever displays them.
+
+    Publishing never waits on anyone: listeners are called right away on the
+    publishing thread and are expected to just queue the notification, like
+    the toasts in `game.toasts` do. With no listeners, e.g. in a headless run,
+    notifications only land in `recent`.
+    """
+
+    def __init__(self, recent=RECENT):
+        self.listeners = []
+        self.recent = deque(maxlen=recent)
+        self.published = 0
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def publish(self, kind, title, message, source=None):
+        notification = Notification(kind, title, message, source)
+        self.recent.append(notification)
+        self.published += 1
+        for listener in tuple(self.listeners):
+            listener(notification)
+        return notification
+
+
+notifications = NotificationBus()
@@ -0,0 +1,251 @@
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+from models.species import registry
+
+SAVE_PATH = 'saved_game.sav'
+LEGACY_SAVE_PATH = 'saved_game.pkl'
+
+PET_CLASSES = registry.classes()  # pet_type -> class, from data/species.json
+
+MAGIC = b'TPET'
+HEADER = struct.Struct('<4sHII')  # magic, schema version, payload length, payload crc32
+
+# Field layout of every schema version ever written. Never edit an old entry:
+# add a new version and a migration that upgrades the previous one instead.
+SCHEMAS = {
+    1: (
+        ('pet_type', 'str'), ('name', 'str'), ('color', 'str'), ('pattern', 'str'), ('accessories', 'str'),
+        ('hunger', 'i16'), ('happiness', 'i16'), ('training', 'i16'), ('health', 'i16'), ('cleanliness', 'i16'),
+        ('age', 'u32'), ('weight', 'f64'), ('life_stage_index', 'u8'),
+        ('alive', 'bool'), ('sick', 'bool'), ('game_over', 'bool'),
+        ('saved_at', 'f64'), ('extras', 'map'),
+    ),
+}
+SCHEMA_VERSION = max(SCHEMAS)
+
+# version -> function upgrading a decoded dict from `version` to `version + 1`
+MIGRATIONS = {}
+
+_NUMBERS = {'u8': struct.Struct('<B'), 'i16': struct.Struct('<h'), 'u32': struct.Struct('<I'),
+            'i64': struct.Struct('<q'), 'f64': struct.Struct('<d'), 'bool': struct.Struct('<?')}
+_LENGTH = struct.Struct('<H')
+# Type tags for the free-form `extras` map of species-specific attributes
+_MAP_TAGS = {int: b'i', float: b'f', str: b's', bool: b'b'}
+_MAP_CODES = {b'i': 'i64', b'f': 'f64', b's': 'str', b'b': 'bool'}
+
+
+class SaveError(Exception):
+    pass
+
+
+def _write_value(out, kind, value):
+    if kind == 'str':
+        raw = (value or '').encode('utf-8')
+        out += _LENGTH.pack(len(raw)) + raw
+    elif kind == 'map':
+        out += _NUMBERS['u8'].pack(len(value))
+        for key, item in value.items():
+            tag = _MAP_TAGS[type(item)]
+            _write_value(out, 'str', key)
+            out += tag
+            _write_value(out, _MAP_CODES[tag], item)
+    elif kind == 'f64' and value is None:
+        out += _NUMBERS['f64'].pack(float('nan'))
+    else:
+        out += _NUMBERS[kind].pack(value)
+
+
+def _read_value(view, offset, kind):
+    if kind == 'str':
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        return bytes(view[offset:offset + length]).decode('utf-8'), offset + length
+    if kind == 'map':
+        (count,) = _NUMBERS['u8'].unpack_from(view, offset)
+        offset += 1
+        result = {}
+        for _ in range(count):
+            key, offset = _read_value(view, offset, 'str')
+            tag = bytes(view[offset:offset + 1])
+            if tag not in _MAP_CODES:
+                raise SaveError(f"Unknown value type {tag!r} in save file.")
+            result[key], offset = _read_value(view, offset + 1, _MAP_CODES[tag])
+        return result, offset
+    (value,) = _NUMBERS[kind].unpack_from(view, offset)
+    if kind == 'f64' and value != value:
+        value = None
+    return value, offset + _NUMBERS[kind].size
+
+
+def encode_pet(pet):
+    """Serializes a pet into the current compact binary schema."""
+    data = pet.to_dict()
+    data['saved_at'] = time.time()
+    payload = bytearray()
+    for field, kind in SCHEMAS[SCHEMA_VERSION]:
+        _write_value(payload, kind, data[field])
+    return HEADER.pack(MAGIC, SCHEMA_VERSION, len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_dict(blob):
+    """Parses a save blob of any known version and migrates it to the current schema."""
+    if len(blob) < HEADER.size:
+        raise SaveError("Save file is truncated.")
+    magic, version, length, crc = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise SaveError("Not a Tamagotchi save file.")
+    if version not in SCHEMAS:
+        raise SaveError(f"Unsupported save version {version}.")
+    payload = memoryview(blob)[HEADER.size:HEADER.size + length]
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise SaveError("Save file is corrupted.")
+
+    data = {}
+    offset = 0
+    try:
+        for field, kind in SCHEMAS[version]:
+            data[field], offset = _read_value(payload, offset, kind)
+    except (struct.error, UnicodeDecodeError) as e:
+        raise SaveError(f"Save file is truncated or corrupted ({e}).") from None
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    return data
+
+
+def decode_pet(blob):
+    data = decode_dict(blob)
+    if data['pet_type'] not in PET_CLASSES:
+        raise SaveError(f"Unknown pet type {data['pet_type']!r} in save file.")
+    return PET_CLASSES[data['pet_type']].from_dict(data)
+
+
+def atomic_write(path, data):
+    """Writes `data` to a temp file, fsyncs it and renames it over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    try:
+        # Persist the rename itself; not supported on every platform
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def save_pet(pet, path=SAVE_PATH):
+    atomic_write(path, encode_pet(pet))
+
+
+def load_pet(path=SAVE_PATH, legacy_path=LEGACY_SAVE_PATH):
+    """Loads the saved pet, converting a legacy pickle save on first use. Returns None if there is no save."""
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return decode_pet(f.read())
+    if os.path.exists(legacy_path):
+        # Pickle saves were only ever written locally by older versions of the game
+        with open(legacy_path, 'rb') as f:
+            pet = pickle.load(f)
+        save_pet(pet, path)
+        os.remove(legacy_path)
+        return decode_pet(encode_pet(pet))
+    return None
+
+
+def delete_save(path=SAVE_PATH, legacy_path=LEGACY_SAVE_PATH):
+    for save_path in (path, legacy_path):
+        if os.path.exists(save_path):
+            os.remove(save_path)
+
+
+def write_save_file(entries, path=SAVE_PATH):
+    """AutoSaver writer for the single-slot save file: only the newest snapshot matters."""
+    atomic_write(path, entries[-1])
+
+
+class AutoSaver:
+    """Writes saves on a background thread so the tick loop never waits on disk.
+
+    Pets are encoded on the calling thread with `encode`, which is cheap. The
+    writer thread hands every pending snapshot to `write` in one batch, keeping
+    only the newest snapshot per pet if several arrive while a write is busy.
+    """
+
+    def __init__(self, encode=encode_pet, write=write_save_file):
+        self.encode = encode
+        self.write = write
+        self._pending = {}  # id(pet) -> encoded snapshot
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self.saves = 0
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def submit(self, pet):
+        self.submit_many((pet,))
+
+    def submit_many(self, pets):
+        """Encodes several pets and wakes the writer once for all of them."""
+        snapshots = {id(pet): self.encode(pet) for pet in pets}
+        with self._condition:
+            self._pending.update(snapshots)
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                entries, self._pending = list(self._pending.values()), {}
+                # Taken before releasing the condition so discard() can't slip in between
+                self._write_lock.acquire()
+            try:
+                self.write(entries)
+                self.saves += len(entries)
+            except Exception as e:
+                print(f"Error autosaving: {e}")
+            finally:
+                self._write_lock.release()
+
+    def busy(self, pet):
+        """Whether a snapshot of `pet` is waiting, or any write is still in flight."""
+        with self._condition:
+            return id(pet) in self._pending or self._write_lock.locked()
+
+    def discard(self, pet=None):
+        """Drops pending snapshots (of one pet, or all) and waits for an in-flight write to finish."""
+        with self._condition:
+            if pet is None:
+                self._pending.clear()
+            else:
+                self._pending.pop(id(pet), None)
+        with self._write_lock:
+            pass
+
+    def close(self):
+        """Flushes pending snapshots and stops the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
@@ -1,18 +1,209 @@
-import pygame
 import datetime
+import os
+import threading
+import time
+from collections import OrderedDict
 
+from helpers.metrics import timed
+
+SOUNDS_DIR = 'sounds'
+MEMORY_BUDGET = 64 * 1024 * 1024  # decoded PCM bytes kept in the cache
+STREAM_THRESHOLD = 1024 * 1024  # music files bigger than this on disk are streamed
+MUSIC_SUFFIX = '_music.mp3'  # background tracks; every other sound is an effect and always decoded
+CROSSFADE_MS = 1500
+
+MUSIC_CHANNELS = (0, 2)  # alternated so two decoded tracks can overlap while crossfading
+EFFECTS_CHANNEL = 1
+
+pygame = None  # imported by AudioManager.start, off the startup path
+
+
+class AudioManager:
+    """Decoded sound cache with background preloading and mood crossfades.
+
+    Decoded `pygame.mixer.Sound` objects are kept in an LRU bounded by
+    `memory_budget` bytes of PCM. Long music tracks are streamed through
+    `pygame.mixer.music` instead of being decoded into memory.
+
+    pygame is imported and only its mixer initialized on a background thread
+    by `start`. Music requested before then is played once the mixer is up;
+    effects are dropped.
+    """
+
+    def __init__(self, sounds_dir=SOUNDS_DIR, memory_budget=MEMORY_BUDGET,
+                 stream_threshold=STREAM_THRESHOLD, crossfade_ms=CROSSFADE_MS):
+        self.sounds_dir = sounds_dir
+        self.memory_budget = memory_budget
+        self.stream_threshold = stream_threshold
+        self.crossfade_ms = crossfade_ms
+        self._cache = OrderedDict()  # path -> (Sound, size in bytes)
+        self._decoding = {}  # path -> Event set once an in-flight decode finishes
+        self._lock = threading.Lock()
+        self._preload_thread = None
+        self._music_lock = threading.Lock()
+        self._pending_music = None
+        self.ready = threading.Event()
+        self.cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+        self.music_path = None
+        self._music_streamed = False
+        self._music_channel = None
+        self._next_music_channel = 0
+
+    def start(self, preload=True):
+        """Imports pygame, initializes the mixer and optionally decodes every sound, all in the background."""
+        if self._preload_thread is not None:
+            return
+        self._preload_thread = threading.Thread(target=self._start, args=(preload,), name="audio-start",
+                                                daemon=True)
+        self._preload_thread.start()
+
+    def _start(self, preload):
+        global pygame
+        try:
+            import pygame
+            pygame.mixer.init()
+        except Exception as e:
+            print(f"Error initializing audio: {e}")
+            return
+        self.ready.set()
+        with self._music_lock:
+            pending, self._pending_music = self._pending_music, None
+        if pending is not None:
+            self.play_music(pending)
+        if preload:
+            self._preload()
+
+    def _preload(self):
+        paths = [os.path.join(self.sounds_dir, file_name).replace(os.sep, '/')
+                 for file_name in sorted(os.listdir(self.sounds_dir))]
+        # Music first, so if the budget runs out the LRU evicts a track rather than an effect
+        paths.sort(key=lambda path: not self.is_music(path))
+        for path in paths:
+            if not self.should_stream(path):
+                try:
+                    self.get(path, count=False)
+                except Exception as e:
+                    print(f"Error preloading {path}: {e}")
+
+    def is_music(self, path):
+        return path.endswith(MUSIC_SUFFIX)
+
+    def should_stream(self, path):
+        """Only long music tracks are streamed; effects are decoded however big they are."""
+        return self.is_music(path) and os.path.getsize(path) > self.stream_threshold
+
+    def _sound_size(self, sound):
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency * channels * abs(sample_format) // 8)
+
+    def get(self, path, count=True):
+        """Returns the decoded sound for `path`, decoding it on a cache miss."""
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is not None:
+                self._cache.move_to_end(path)
+                if count:
+                    self.hits += 1
+                return entry[0]
+            if count:
+                self.misses += 1
+            in_flight = self._decoding.get(path)
+            if in_flight is None:
+                self._decoding[path] = threading.Event()
+
+        if in_flight is not None:
+            # The preloader is already decoding this file; wait for it instead of decoding twice
+            in_flight.wait()
+            with self._lock:
+                entry = self._cache.get(path)
+            if entry is not None:
+                return entry[0]
+
+        try:
+            started = time.perf_counter()
+            sound = pygame.mixer.Sound(path)
+            elapsed = time.perf_counter() - started
+            size = self._sound_size(sound)
+            with self._lock:
+                self.decodes += 1
+                self.decode_seconds += elapsed
+                if path not in self._cache and size <= self.memory_budget:
+                    while self._cache and self.cache_bytes + size > self.memory_budget:
+                        _, (_, evicted_size) = self._cache.popitem(last=False)
+                        self.cache_bytes -= evicted_size
+                    self._cache[path] = (sound, size)
+                    self.cache_bytes += size
+        finally:
+            if in_flight is None:
+                with self._lock:
+                    self._decoding.pop(path).set()
+        return sound
+
+    def play_music(self, path):
+        """Crossfades from the current background track to `path`."""
+        with self._music_lock:
+            if not self.ready.is_set():
+                self._pending_music = path
+                return
+            self._play_music(path)
+
+    def _play_music(self, path):
+        if path == self.music_path:
+            return
+        fade = self.crossfade_ms
+        streamed = self.should_stream(path)
+
+        if self._music_channel is not None:
+            self._music_channel.fadeout(fade)
+            self._music_channel = None
+        if self._music_streamed and not streamed:
+            pygame.mixer.music.fadeout(fade)
+
+        if streamed:
+            # pygame has a single music stream, so a streamed track replaces the previous one
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.play(loops=-1, fade_ms=fade)
+        else:
+            channel = pygame.mixer.Channel(MUSIC_CHANNELS[self._next_music_channel])
+            self._next_music_channel = 1 - self._next_music_channel
+            channel.play(self.get(path), loops=-1, fade_ms=fade)
+            self._music_channel = channel
+        self._music_streamed = streamed
+        self.music_path = path
+
+    def play_effect(self, path):
+        if not self.ready.is_set():
+            return
+        pygame.mixer.Channel(EFFECTS_CHANNEL).play(self.get(path))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'decodes': self.decodes,
+                'decode_seconds': self.decode_seconds,
+                'cached_sounds': len(self._cache),
+                'cache_bytes': self.cache_bytes,
+            }
+
+
+audio = AudioManager()
 prev_mood = "neutral"
 
+@timed('sound.play_background_music')
 def play_background_music(mood='neutral', is_init_game=False):
     global prev_mood
     if mood == prev_mood and not is_init_game: return
 
-    pygame.mixer.music.stop()
+    prev_mood = mood
     if mood == 'happy':
-        prev_mood = mood
         music_file = 'sounds/happy_music.mp3'
     elif mood == 'sad':
-        prev_mood = mood
         music_file = 'sounds/sad_music.mp3'
     else:
         current_hour = datetime.datetime.now().hour
@@ -21,16 +212,12 @@ def play_background_music(mood='neutral', is_init_game=False):
         else:
             music_file = 'sounds/night_music.mp3'
     try:
-        sound = pygame.mixer.Sound(music_file)
-        channel = pygame.mixer.Channel(0)  # Use channel 0 for background music
-        channel.play(sound, loops=-1)  # Play in a loop to keep background music going
+        audio.play_music(music_file)
     except Exception as e:
         print(f"Error playing background music: {e}")
 
 def play_sound_effect(sound_file):
     try:
-        sound = pygame.mixer.Sound(sound_file)
-        channel = pygame.mixer.Channel(1)  # Use channel 1 for sound effects
-        channel.play(sound)
+        audio.play_effect(sound_file)
     except Exception as e:
         print(f"Error playing sound effect: {e}")
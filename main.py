@@ -1,12 +1,47 @@
+import sys
+import time
+
+STARTED = time.perf_counter()
+
 import tkinter as tk
-import pygame
 
 from game.game_manger import GameManager
+from helpers.metrics import start_exporters
+
+
+def first_frame_report(root):
+    root.update_idletasks()
+    print(f"First frame after {(time.perf_counter() - STARTED) * 1000:.1f} ms", file=sys.stderr)
+    root.quit()
+
+
+def startup_report(top=15):
+    """Runs the game under -X importtime up to its first frame and prints the slowest imports."""
+    import subprocess
+    result = subprocess.run([sys.executable, '-X', 'importtime', __file__, '--first-frame'],
+                            capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not name[1:].startswith(' '):  # top-level imports only
+                imports.append((int(cumulative), name.strip()))
+        elif not line.startswith('import time:'):
+            print(line)
+    print(f"{'cumulative [ms]':>16}  module")
+    for cumulative, name in sorted(imports, reverse=True)[:top]:
+        print(f"{cumulative / 1000:16.1f}  {name}")
 
-pygame.init()
-pygame.mixer.init()
 
 if __name__ == "__main__":
+    if '--startup-report' in sys.argv:
+        startup_report()
+        sys.exit()
+    start_exporters()
     root = tk.Tk()
-    GameManager(root)
-    root.mainloop()
\ No newline at end of file
+    manager = GameManager(root)
+    if '--first-frame' in sys.argv:
+        root.after_idle(first_frame_report, root)
+    root.mainloop()
+    if '--first-frame' in sys.argv:
+        manager.quit_game(save=False)  # only timing the startup; leave the saves alone
@@ -0,0 +1,109 @@
+import json
+import os
+from functools import lru_cache
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+EVENTS_FILE = os.path.join(DATA_DIR, 'events.json')
+
+# Meters a random event may change
+EFFECTS = ('happiness', 'health')
+
+
+class AliasTable:
+    """Walker/Vose alias table: samples an index by weight in O(1), whatever the number of entries.
+
+    With equal weights a sample draws exactly what `rng.choice` would, so seeded
+    streams written before events had weights replay the same.
+    """
+
+    def __init__(self, weights):
+        count = len(weights)
+        if not count:
+            raise ValueError("An alias table needs at least one weight.")
+        total = float(sum(weights))
+        if total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative and not all zero.")
+        scaled = [weight * count / total for weight in weights]
+        self.probability = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.probability[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1 - scaled[low]
+            (small if scaled[high] < 1 else large).append(high)
+        # Whatever is left only differs from 1 by rounding error
+
+    def __len__(self):
+        return len(self.probability)
+
+    def sample(self, rng):
+        column = rng.randrange(len(self.probability))
+        if self.probability[column] < 1 and rng.random() >= self.probability[column]:
+            return self.alias[column]
+        return column
+
+
+class Event:
+    __slots__ = ('message', 'weight', 'happiness', 'health')
+
+    def __init__(self, message, weight=1, happiness=0, health=0):
+        self.message = message
+        self.weight = weight
+        self.happiness = happiness
+        self.health = health
+
+    @classmethod
+    def from_dict(cls, data):
+        unknown = set(data) - {'event', 'weight'} - set(EFFECTS)
+        if unknown:
+            raise ValueError(f"Event {data.get('event')!r} has unknown fields: {', '.join(sorted(unknown))}")
+        return cls(data['event'], data.get('weight', 1), **{name: data[name] for name in EFFECTS if name in data})
+
+    def to_dict(self):
+        data = {'event': self.message, 'weight': self.weight}
+        data.update({name: getattr(self, name) for name in EFFECTS if getattr(self, name)})
+        return data
+
+
+class EventTable:
+    """Random events compiled for O(1) sampling: a 1-in-`odds` chance per tick, then an alias draw by weight."""
+
+    def __init__(self, events, odds):
+        self.events = tuple(events)
+        self.odds = odds
+        self.alias = AliasTable([event.weight for event in self.events])
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls([Event.from_dict(event) for event in data['events']], data['odds'])
+
+    def extended(self, events):
+        """This table with `events` added, e.g. a species' own events."""
+        return EventTable(self.events + tuple(events), self.odds) if events else self
+
+    def pick(self, rng):
+        return self.events[self.alias.sample(rng)]
+
+    def roll(self, rng):
+        """The event that happens this tick, or None. Same draws as Pet.tick made with a plain event list."""
+        if rng.randint(1, self.odds) == 1:
+            return self.pick(rng)
+        return None
+
+    def probabilities(self):
+        """Chance of each event happening on a given tick."""
+        total = sum(event.weight for event in self.events)
+        return [event.weight / total / self.odds for event in self.events]
+
+    def to_dict(self):
+        return {'odds': self.odds, 'events': [event.to_dict() for event in self.events]}
+
+
+@lru_cache(maxsize=None)
+def load_events(path=EVENTS_FILE):
+    """Compiles an events file once per process."""
+    with open(path, encoding='utf-8') as f:
+        return EventTable.from_dict(json.load(f))
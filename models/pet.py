@@ -1,21 +1,146 @@
-import tkinter as tk
 from abc import ABC, abstractmethod
-from tkinter import messagebox
-import threading
 import random
+import sys
 import time
+import weakref
+from collections import Counter
+from functools import lru_cache
+from helpers.metrics import timed
+from helpers.notifications import notifications
+from models.events import load_events
 from helpers.sound import *
 
 
+@lru_cache(maxsize=64)
+def _format_accessories(accessories):
+    return ', '.join(accessories.split(',')) if accessories else 'None'
+
+
+class PetHooks:
+    """The callbacks a pet reports to. Never changed once built.
+
+    Pets handed the same callbacks, like every pet a GameManager shows, share
+    one instance, so attaching a UI costs a pet nothing but its `_hooks` slot.
+    """
+    NAMES = ('update_status_callback', 'game_over_callback', 'notifier')
+    __slots__ = NAMES + ('__weakref__',)
+    _shared = weakref.WeakValueDictionary()  # callbacks -> the PetHooks holding them
+
+    @classmethod
+    def get(cls, callbacks):
+        """The hooks for a tuple of callbacks in NAMES order, or None if they are all None."""
+        if not any(callback is not None for callback in callbacks):
+            return None
+        try:
+            hooks = cls._shared.get(callbacks)
+        except TypeError:  # a bound method of an unhashable object
+            return cls(callbacks)
+        if hooks is None:
+            hooks = cls._shared[callbacks] = cls(callbacks)
+        return hooks
+
+    def __init__(self, callbacks):
+        for name, callback in zip(self.NAMES, callbacks):
+            setattr(self, name, callback)
+
+
+def _hook_attribute(name):
+    index = PetHooks.NAMES.index(name)
+
+    def get(self):
+        hooks = self._hooks
+        return None if hooks is None else getattr(hooks, name)
+
+    def set(self, value):
+        callbacks = [getattr(self, other) for other in PetHooks.NAMES]
+        callbacks[index] = value
+        self._hooks = PetHooks.get(tuple(callbacks))
+
+    return property(get, set)
+
+
+class PetContext:
+    """Bookkeeping that only journaled or stored pets need.
+
+    Kept out of `Pet` itself so a plain simulated pet pays for one empty slot
+    instead of six.
+    """
+    DEFAULTS = {
+        'rng': random,  # shared module RNG unless the pet is journaled with its own stream
+        'journal': None,
+        'muted': False,
+        'saved_at': None,
+        'kennel_id': None,
+        'history': None,  # MeterHistory recording the meters every tick
+    }
+    __slots__ = tuple(DEFAULTS)
+
+    def __init__(self):
+        for name, value in self.DEFAULTS.items():
+            setattr(self, name, value)
+
+
+def _context_attribute(name):
+    default = PetContext.DEFAULTS[name]
+
+    def get(self):
+        context = self._context
+        return default if context is None else getattr(context, name)
+
+    def set(self, value):
+        if self._context is None:
+            if value is default:
+                return
+            self._context = PetContext()
+        setattr(self._context, name, value)
+
+    return property(get, set)
+
+
 class Pet(ABC):
     LIFE_STAGES = ['Baby', 'Child', 'Teenager', 'Adult', 'Senior']
+    TICK_INTERVAL = 15  # seconds between ticks
+
+    # Per-tick decay ranges (inclusive), shared with the batch simulator
+    HUNGER_DECAY = (5, 10)
+    HAPPINESS_DECAY = (2, 5)
+    CLEANLINESS_DECAY = (5, 10)
+    HEALTH_DECAY = (0, 2)
+    DAYS_PER_STAGE = 5
+    SICKNESS_THRESHOLD = 30
+    SICKNESS_DAMAGE = 20
+    EVENTS = load_events()  # random events from data/events.json; species classes add their own
+
+    # Attributes written to save files; subclasses list their own in SAVED_EXTRAS
+    SAVED_FIELDS = ('pet_type', 'name', 'color', 'pattern', 'accessories', 'hunger', 'happiness', 'training',
+                    'health', 'cleanliness', 'age', 'weight', 'life_stage_index', 'alive', 'sick', 'game_over',
+                    'saved_at')
+    SAVED_EXTRAS = ()
+
+    # No per-instance __dict__: large populations of pets stay compact
+    __slots__ = ('name', 'pet_type', 'color', 'pattern', 'accessories', 'hunger', 'happiness', 'training',
+                 'health', 'cleanliness', 'age', '_weight', 'life_stage_index', 'alive', 'sick', 'game_over',
+                 '_context', '_hooks')
+
+    update_status_callback = _hook_attribute('update_status_callback')
+    game_over_callback = _hook_attribute('game_over_callback')
+    notifier = _hook_attribute('notifier')
+    rng = _context_attribute('rng')
+    journal = _context_attribute('journal')
+    muted = _context_attribute('muted')
+    saved_at = _context_attribute('saved_at')
+    kennel_id = _context_attribute('kennel_id')
+    history = _context_attribute('history')
 
     def __init__(self, name, color, pattern, accessories, update_status_callback, game_over_callback, pet_type):
-        self.name = name
-        self.pet_type = pet_type
-        self.color = color
-        self.pattern = pattern
-        self.accessories = accessories
+        # Interned so thousands of pets share one copy of repeated strings
+        self.name = sys.intern(name)
+        self.pet_type = sys.intern(pet_type)
+        self.color = sys.intern(color)
+        self.pattern = sys.intern(pattern)
+        self.accessories = sys.intern(accessories)
+        self._context = None
+        self._hooks = None
         self.hunger = 50
         self.happiness = 50
         self.training = 0
@@ -24,7 +149,6 @@ class Pet(ABC):
         self.age = 0
         self.weight = 5
         self.life_stage_index = 0
-        self.life_stage = self.LIFE_STAGES[self.life_stage_index]
         self.alive = True
         self.sick = False
         self.update_status_callback = update_status_callback
@@ -42,11 +166,6 @@ class Pet(ABC):
         else:
             return "sad"
 
-    def start_time_thread(self):
-        self.time_thread = threading.Thread(target=self.time_passes)
-        self.time_thread.daemon = True
-        self.time_thread.start()
-
     def get_mood(self):
         if self.happiness >= 70:
             return 'happy'
@@ -55,23 +174,89 @@ class Pet(ABC):
         else:
             return 'neutral'
 
+    @property
+    def life_stage(self):
+        return self.LIFE_STAGES[self.life_stage_index]
+
+    @property
+    def weight(self):
+        return self._weight / 10
+
+    @weight.setter
+    def weight(self, value):
+        # Stored as a small int of tenths of a kilogram instead of a float object per pet
+        self._weight = round(value * 10)
+
     def __getstate__(self):
-        state = self.__dict__.copy()
-        # Remove unpicklable entries.
-        if 'update_status_callback' in state:
-            del state['update_status_callback']
-        if 'game_over_callback' in state:
-            del state['game_over_callback']
-        if 'time_thread' in state:
-            del state['time_thread']
+        # Only persistent data; callbacks and other runtime hooks are not picklable.
+        state = {field: getattr(self, field) for field in self.SAVED_FIELDS + self.SAVED_EXTRAS}
+        state['kennel_id'] = self.kennel_id
+        # Remember when the game was closed so missed ticks can be replayed on load
+        state['saved_at'] = time.time()
         return state
 
     def __setstate__(self, state):
-        self.__dict__.update(state)
-        # Set default values for unpicklable attributes.
-        self.update_status_callback = None
-        self.game_over_callback = None
-        self.time_thread = None
+        # Pickles written before __slots__ also hold runtime and derived entries such as `life_stage`
+        self._context = None
+        self._hooks = None
+        persistent = self.SAVED_FIELDS + self.SAVED_EXTRAS + ('kennel_id',)
+        for name, value in state.items():
+            if name in persistent:
+                setattr(self, name, sys.intern(value) if isinstance(value, str) else value)
+        if 'game_over' not in state:
+            self.game_over = False
+
+    def to_dict(self):
+        """Plain-data snapshot of the pet used by the save format."""
+        data = {field: getattr(self, field) for field in self.SAVED_FIELDS}
+        data['extras'] = {field: getattr(self, field) for field in self.SAVED_EXTRAS}
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        pet = cls(data['name'], data['color'], data['pattern'], data['accessories'], None, None, data['pet_type'])
+        for field in cls.SAVED_FIELDS:
+            if field in data:
+                value = data[field]
+                setattr(pet, field, sys.intern(value) if isinstance(value, str) else value)
+        for field, value in data.get('extras', {}).items():
+            if field in cls.SAVED_EXTRAS:
+                setattr(pet, field, value)
+        return pet
+
+    def seed_rng(self, seed=None):
+        """Gives the pet its own random stream so its history can be replayed exactly."""
+        self.rng = random.Random(seed)
+
+    def _record(self, action, *args):
+        if self.journal is not None:
+            self.journal.append(action, *args)
+
+    def _record_times(self, times, action, *args):
+        # A merged action is one event carrying its count, so a snapshot can't land between its repeats
+        if times == 1:
+            self._record(action, *args)
+        else:
+            self._record(action, *args, times)
+
+    def _changed(self):
+        if self.update_status_callback is not None:
+            self.update_status_callback()
+
+    def _game_over(self):
+        if self.game_over_callback is not None:
+            self.game_over_callback()
+
+    def _play_sound(self, sound_file):
+        if not self.muted:
+            play_sound_effect(sound_file)
+
+    def _notify(self, kind, title, message):
+        """Hands a message for the player to `notifier` when one is set, otherwise to the notification bus."""
+        if self.notifier is not None:
+            self.notifier(kind, title, message)
+        else:
+            notifications.publish(kind, title, message, self)
 
     @abstractmethod
     def characteristic(self):
@@ -86,30 +271,76 @@ class Pet(ABC):
         pass
 
     def activate_special_ability(self):
+        self._record('activate_special_ability')
         if self.alive:
             self.special_ability_effect()
-            self.update_status_callback()
+            self._changed()
         else:
-            messagebox.showinfo("Info", f"{self.name} is not able to perform this action.")
-
-    def time_passes(self):
-        while self.alive:
-            time.sleep(15)
-            self.update_meters()
-            self.update_status_callback()
-            if random.randint(1, 5) == 1:
-                self.random_event()
-                self.update_status_callback()
-            if not self.alive:
-                self.game_over = True
-                self.game_over_callback()
-                break
-
+            self._notify('info', "Info", f"{self.name} is not able to perform this action.")
+
+    @timed('pet.tick')
+    def tick(self):
+        """Advances the pet by one time step. Called on the UI thread by the TickScheduler."""
+        if not self.alive:
+            return
+        self._record('tick')
+        self.update_meters()
+        if self.history is not None:
+            self.history.record(self)
+        self._changed()
+        event = self.EVENTS.roll(self.rng)
+        if event is not None:
+            self.random_event(event)
+            self._changed()
+        if not self.alive:
+            self.game_over = True
+            self._game_over()
+
+    def missed_ticks(self, now=None):
+        """Number of ticks that should have happened since the pet was saved."""
+        if self.saved_at is None:
+            return 0
+        now = time.time() if now is None else now
+        return max(0, int((now - self.saved_at) // self.TICK_INTERVAL))
+
+    def catch_up(self, ticks):
+        """Fast-forwards `ticks` missed ticks without popups or UI callbacks.
+
+        Stops as soon as the pet dies, so even weeks away only costs a few
+        iterations. Returns a summary of what happened as a list of lines.
+        """
+        self._record('catch_up', ticks)
+        messages = Counter()
+        notifier = self.notifier
+        self.notifier = lambda kind, title, message: messages.update([message])
+        played = 0
+        try:
+            while played < ticks and self.alive:
+                self.update_meters()
+                if self.history is not None:
+                    self.history.record(self)
+                event = self.EVENTS.roll(self.rng)
+                if event is not None:
+                    self.random_event(event)
+                played += 1
+        finally:
+            self.notifier = notifier
+        if not self.alive:
+            self.game_over = True
+
+        summary = [f"{self.name} lived through {played} of {ticks} missed ticks."]
+        for message, count in messages.items():
+            summary.append(message if count == 1 else f"{message} (x{count})")
+        if not self.alive:
+            summary.append(f"{self.name} did not survive while you were away.")
+        return summary
+
+    @timed('pet.update_meters')
     def update_meters(self):
-        self.hunger -= random.randint(5, 10)
-        self.happiness -= random.randint(2, 5)
-        self.cleanliness -= random.randint(5, 10)
-        self.health -= random.randint(0, 2)
+        self.hunger -= self.rng.randint(*self.HUNGER_DECAY)
+        self.happiness -= self.rng.randint(*self.HAPPINESS_DECAY)
+        self.cleanliness -= self.rng.randint(*self.CLEANLINESS_DECAY)
+        self.health -= self.rng.randint(*self.HEALTH_DECAY)
         self.age += 1
 
         self.hunger = max(0, min(self.hunger, 100))
@@ -117,7 +348,7 @@ class Pet(ABC):
         self.health = max(0, min(self.health, 100))
         self.cleanliness = max(0, min(self.cleanliness, 100))
 
-        if self.age % 5 == 0:
+        if self.age % self.DAYS_PER_STAGE == 0:
             self.advance_life_stage()
 
         self.check_sickness()
@@ -130,97 +361,93 @@ class Pet(ABC):
     def advance_life_stage(self):
         if self.life_stage_index < len(self.LIFE_STAGES) - 1:
             self.life_stage_index += 1
-            self.life_stage = self.LIFE_STAGES[self.life_stage_index]
-            messagebox.showinfo("Life Stage", f"{self.name} has grown to the {self.life_stage} stage!")
+            self._notify('info', "Life Stage", f"{self.name} has grown to the {self.life_stage} stage!")
             self.special_ability()
 
-    def feed(self, food_type):
+    def feed(self, food_type, times=1):
+        """Feeds the pet `times` servings at once, same end state as that many separate feeds."""
+        self._record_times(times, 'feed', food_type)
         if food_type == 'meal':
-            self.hunger += 30
-            self.weight += 0.5
-            messagebox.showinfo("Feeding", f"{self.name} enjoyed a hearty meal!")
+            self.hunger += 30 * times
+            self.weight += 0.5 * times
+            self._notify('info', "Feeding", f"{self.name} enjoyed a hearty meal!")
         elif food_type == 'snack':
-            self.hunger += 10
-            self.happiness += 5
-            self.weight += 0.2
-            messagebox.showinfo("Feeding", f"{self.name} loved the tasty snack!")
+            self.hunger += 10 * times
+            self.happiness += 5 * times
+            self.weight += 0.2 * times
+            self._notify('info', "Feeding", f"{self.name} loved the tasty snack!")
         self.hunger = min(self.hunger, 100)
         self.happiness = min(self.happiness, 100)
-        self.update_status_callback()
+        self._changed()
 
 
         # Play eating sound
-        play_sound_effect(f'sounds/{self.pet_type}_play.mp3')
-
-    def play_with(self):
-        def play_game():
-            number = random.randint(1, 5)
-            try:
-                guess = int(guess_entry.get())
-                if guess == number:
-                    messagebox.showinfo("Game", "You guessed it! That was fun!")
-                    self.happiness += 15
-                else:
-                    messagebox.showinfo("Game", f"Oops! The correct number was {number}. Maybe next time!")
-                    self.happiness += 5
-            except ValueError:
-                messagebox.showerror("Error", "Please enter a valid number.")
-            self.hunger -= 5
-            self.happiness = min(self.happiness, 100)
-            self.hunger = max(0, self.hunger)
-            game_window.destroy()
-            self.update_status_callback()
-
-            # Play play sound
-            play_sound_effect(f'sounds/{self.pet_type}_play.mp3')
+        self._play_sound(f'sounds/{self.pet_type}_play.mp3')
+
+    def play_guess(self, guess):
+        """Plays one round of the guessing game with the player's raw `guess` text."""
+        self._record('play_guess', guess)
+        number = self.rng.randint(1, 5)
+        try:
+            if int(guess) == number:
+                self._notify('info', "Game", "You guessed it! That was fun!")
+                self.happiness += 15
+            else:
+                self._notify('info', "Game", f"Oops! The correct number was {number}. Maybe next time!")
+                self.happiness += 5
+        except ValueError:
+            self._notify('error', "Error", "Please enter a valid number.")
+        self.hunger -= 5
+        self.happiness = min(self.happiness, 100)
+        self.hunger = max(0, self.hunger)
+        self._changed()
 
-        game_window = tk.Toplevel()
-        game_window.title("Guess the Number")
-        tk.Label(game_window, text="Guess a number between 1 and 5").pack()
-        guess_entry = tk.Entry(game_window)
-        guess_entry.pack()
-        tk.Button(game_window, text="Submit", command=play_game).pack()
+        # Play play sound
+        self._play_sound(f'sounds/{self.pet_type}_play.mp3')
 
-    def sleep(self):
-        self.health += 20
-        self.hunger -= 10
-        self.cleanliness -= 5
+    def sleep(self, times=1):
+        self._record_times(times, 'sleep')
+        self.health += 20 * times
+        self.hunger -= 10 * times
+        self.cleanliness -= 5 * times
         self.health = min(self.health, 100)
         self.hunger = max(0, self.hunger)
         self.cleanliness = max(0, self.cleanliness)
-        messagebox.showinfo("Sleep", f"{self.name} had a good rest!")
-        self.update_status_callback()
+        self._notify('info', "Sleep", f"{self.name} had a good rest!")
+        self._changed()
 
         # Play sleep sound
-        play_sound_effect('sounds/sleep_sound.mp3')
-
-    def exercise(self):
-        self.training += 10
-        self.happiness += 5
-        self.hunger -= 10
-        self.weight -= 0.5
+        self._play_sound('sounds/sleep_sound.mp3')
+
+    def exercise(self, times=1):
+        self._record_times(times, 'exercise')
+        self.training += 10 * times
+        self.happiness += 5 * times
+        self.hunger -= 10 * times
+        self.weight -= 0.5 * times
         self.training = min(self.training, 100)
         self.happiness = min(self.happiness, 100)
         self.hunger = max(0, self.hunger)
         self.weight = max(1, self.weight)
-        messagebox.showinfo("Exercise", f"{self.name} enjoyed the exercise!")
-        self.update_status_callback()
+        self._notify('info', "Exercise", f"{self.name} enjoyed the exercise!")
+        self._changed()
 
-    def clean(self):
+    def clean(self, times=1):
+        self._record_times(times, 'clean')
         self.cleanliness = 100
-        self.happiness += 5
+        self.happiness += 5 * times
         self.happiness = min(self.happiness, 100)
-        messagebox.showinfo("Clean", f"You cleaned {self.name}!")
+        self._notify('info', "Clean", f"You cleaned {self.name}!")
         if self.sick:
             self.cure_sickness()
-        self.update_status_callback()
+        self._changed()
 
     def check_sickness(self):
-        if self.cleanliness < 30 and not self.sick:
-            if random.choice([True, False]):
+        if self.cleanliness < self.SICKNESS_THRESHOLD and not self.sick:
+            if self.rng.choice([True, False]):
                 self.sick = True
-                messagebox.showwarning("Sickness", f"Oh no! {self.name} has gotten sick due to poor cleanliness!")
-                self.health -= 20
+                self._notify('warning', "Sickness", f"Oh no! {self.name} has gotten sick due to poor cleanliness!")
+                self.health -= self.SICKNESS_DAMAGE
                 self.health = max(0, self.health)
 
     def cure_sickness(self):
@@ -228,36 +455,33 @@ class Pet(ABC):
             self.sick = False
             self.health += 20
             self.health = min(self.health, 100)
-            messagebox.showinfo("Recovery", f"{self.name} has been cured!")
-
-    def random_event(self):
-        events = [
-            {"event": "found a treasure!", "happiness": 20},
-            {"event": "got scared by a thunderstorm.", "happiness": -15},
-            {"event": "made a new friend!", "happiness": 10},
-            {"event": "ate something bad.", "health": -20},
-        ]
-        event = random.choice(events)
-        messagebox.showinfo("Random Event", f"{self.name} {event['event']}")
-        self.happiness += event.get('happiness', 0)
-        self.health += event.get('health', 0)
+            self._notify('info', "Recovery", f"{self.name} has been cured!")
+
+    def random_event(self, event=None):
+        if event is None:
+            event = self.EVENTS.pick(self.rng)
+        self._notify('info', "Random Event", f"{self.name} {event.message}")
+        self.happiness += event.happiness
+        self.health += event.health
         self.happiness = max(0, min(self.happiness, 100))
         self.health = max(0, min(self.health, 100))
 
-    def status(self):
-        sick_status = "Yes" if self.sick else "No"
-        status_text = (
-            f"Life Stage: {self.life_stage}\n"
-            f"Hunger: {self.hunger}\n"
-            f"Happiness: {self.happiness}\n"
-            f"Training: {self.training}\n"
-            f"Health: {self.health}\n"
-            f"Cleanliness: {self.cleanliness}\n"
-            f"Age: {self.age} days\n"
-            f"Weight: {self.weight:.2f} kg\n"
-            f"Sick: {sick_status}\n"
-            f"Color: {self.color}\n"
-            f"Pattern: {self.pattern}\n"
-            f"Accessories: {', '.join(self.accessories.split(',')) if self.accessories else 'None'}\n"
+    def status_fields(self):
+        """(label, text) pairs shown in the status panel, in display order."""
+        return (
+            ("Life Stage", self.life_stage),
+            ("Hunger", str(self.hunger)),
+            ("Happiness", str(self.happiness)),
+            ("Training", str(self.training)),
+            ("Health", str(self.health)),
+            ("Cleanliness", str(self.cleanliness)),
+            ("Age", f"{self.age} days"),
+            ("Weight", f"{self.weight:.2f} kg"),
+            ("Sick", "Yes" if self.sick else "No"),
+            ("Color", self.color),
+            ("Pattern", self.pattern),
+            ("Accessories", _format_accessories(self.accessories)),
         )
-        return status_text
+
+    def status(self):
+        return "".join(f"{label}: {text}\n" for label, text in self.status_fields())
@@ -0,0 +1,139 @@
+import importlib
+import json
+import os
+from functools import lru_cache
+
+from models.events import DATA_DIR, Event, load_events
+from models.pet import Pet
+
+SPECIES_FILE = os.path.join(DATA_DIR, 'species.json')
+
+
+class Species:
+    """One entry of the species file, compiled into lookup tables for `SpeciesPet`."""
+
+    def __init__(self, name, data, events):
+        self.name = name
+        self.data = data
+        self.label = data.get('label', name.capitalize())
+        self.class_path = data.get('class')
+        self.icon = data.get('icon')
+        self.attributes = dict(data.get('attributes', {}))
+        characteristic = data.get('characteristic', {})
+        self.characteristic_message = characteristic.get('message', "{name} is a pet.")
+        self.characteristic_sound = characteristic.get('sound')
+        # Life stage index -> message shown when the pet grows into that stage, or None
+        abilities = data.get('abilities', {})
+        self.abilities = tuple(abilities.get(stage) for stage in Pet.LIFE_STAGES)
+        self.special_message, self.special_effects = self._action(data.get('special_ability', {}))
+        unique = data.get('unique_action', {})
+        self.unique_title = unique.get('title', self.label)
+        self.unique_message, self.unique_effects = self._action(unique)
+        self.events = events.extended(Event.from_dict(event) for event in data.get('events', ()))
+
+    def _action(self, data):
+        effects = tuple((name, delta) for name, delta in data.items() if name not in ('message', 'title'))
+        for name, _ in effects:
+            if name not in Pet.__slots__ and name not in self.attributes:
+                raise ValueError(f"Species {self.name!r} changes unknown attribute {name!r}")
+        return data.get('message'), effects
+
+
+class SpeciesPet(Pet):
+    """A pet whose species behaviour comes from its `SPECIES` entry in the species file."""
+
+    SPECIES = None
+    __slots__ = ()
+
+    def __init__(self, name, color, pattern, accessories, update_status_callback, game_over_callback, pet_type):
+        super().__init__(name, color, pattern, accessories, update_status_callback, game_over_callback, pet_type)
+        for attribute, value in self.SPECIES.attributes.items():
+            setattr(self, attribute, value)
+
+    def _format(self, message):
+        return message.format(name=self.name, **{name: getattr(self, name) for name in self.SPECIES.attributes})
+
+    def _apply(self, effects):
+        for name, delta in effects:
+            setattr(self, name, max(0, min(getattr(self, name) + delta, 100)))
+
+    def characteristic(self):
+        self._notify('info', "Pet Info", self._format(self.SPECIES.characteristic_message))
+        if self.SPECIES.characteristic_sound:
+            self._play_sound(self.SPECIES.characteristic_sound)
+
+    def special_ability(self):
+        message = self.SPECIES.abilities[self.life_stage_index]
+        if message:
+            self._notify('info', "Special Ability", self._format(message))
+
+    def special_ability_effect(self):
+        if self.SPECIES.special_message:
+            self._notify('info', "Special Ability", self._format(self.SPECIES.special_message))
+        self._apply(self.SPECIES.special_effects)
+
+    def unique_action(self):
+        self._record('unique_action')
+        if self.SPECIES.unique_message:
+            self._notify('info', self.SPECIES.unique_title, self._format(self.SPECIES.unique_message))
+        self._apply(self.SPECIES.unique_effects)
+        self._changed()
+
+
+class SpeciesRegistry:
+    """Every species in the species file, with the pet class that plays it."""
+
+    def __init__(self, species):
+        self.species = species  # name -> Species, in file order
+        self._classes = None
+
+    @classmethod
+    def from_dict(cls, data, events):
+        return cls({name: Species(name, entry, events) for name, entry in data.items()})
+
+    def __getitem__(self, name):
+        return self.species[name]
+
+    def __contains__(self, name):
+        return name in self.species
+
+    def __iter__(self):
+        return iter(self.species.values())
+
+    def names(self):
+        return tuple(self.species)
+
+    def classes(self):
+        """Species name -> pet class. Species without a `class` in the file get a generated one."""
+        if self._classes is None:
+            classes = {}
+            for name, species in self.species.items():
+                if species.class_path:
+                    module, _, class_name = species.class_path.rpartition('.')
+                    classes[name] = getattr(importlib.import_module(module), class_name)
+                else:
+                    attributes = tuple(species.attributes)
+                    classes[name] = type(f"{species.label.replace(' ', '')}Pet", (SpeciesPet,), {
+                        '__slots__': attributes, '__module__': __name__, 'SPECIES': species,
+                        'SAVED_EXTRAS': attributes, 'EVENTS': species.events,
+                    })
+            self._classes = classes
+        return self._classes
+
+    def pet_class(self, name):
+        return self.classes()[name]
+
+    def create(self, pet_type, name, color='', pattern='', accessories='', update_status_callback=None,
+               game_over_callback=None):
+        return self.pet_class(pet_type)(name, color, pattern, accessories, update_status_callback,
+                                        game_over_callback, pet_type)
+
+
+@lru_cache(maxsize=None)
+def load_registry(path=SPECIES_FILE):
+    """Compiles a species file once per process."""
+    with open(path, encoding='utf-8') as f:
+        return SpeciesRegistry.from_dict(json.load(f), load_events())
+
+
+registry = load_registry()
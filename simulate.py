@@ -0,0 +1,45 @@
+"""Runs scenario files headless and streams per-tick records as JSON lines.
+
+    python simulate.py data/example_scenarios.json [-o runs.jsonl] [--every N]
+
+No Tk window or audio is started. See simulation/scenarios.py for the file format.
+"""
+import argparse
+import sys
+import time
+
+from simulation.scenarios import ScenarioError, every_nth_tick, load_scenarios, run_all, to_jsonl
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Tamagotchi scenarios headless and write JSONL records.")
+    parser.add_argument('scenarios', nargs='+', help="scenario files, .json or .jsonl")
+    parser.add_argument('-o', '--output', help="write records here instead of stdout")
+    parser.add_argument('--every', type=int, default=1,
+                        help="keep every Nth tick record; 0 keeps only the end-of-run records")
+    args = parser.parse_args()
+
+    def scenarios():
+        for path in args.scenarios:
+            yield from load_scenarios(path)
+
+    started = time.perf_counter()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    lines = 0
+    try:
+        for line in to_jsonl(every_nth_tick(run_all(scenarios()), args.every)):
+            out.write(line)
+            lines += 1
+    except ScenarioError as e:
+        sys.exit(f"Error: {e}")
+    except BrokenPipeError:
+        sys.stderr.close()  # e.g. piped into head; nothing left to report
+        return
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{lines} records in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
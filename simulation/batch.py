@@ -0,0 +1,218 @@
+from functools import lru_cache
+
+import numpy as np
+
+from models.pet import Pet
+from models.species import registry
+
+SPECIES = registry.names()
+
+# Struct-of-arrays layout, one entry per pet
+FIELDS = {
+    'species': np.int8,
+    'hunger': np.int16,
+    'happiness': np.int16,
+    'training': np.int16,
+    'health': np.int16,
+    'cleanliness': np.int16,
+    'age': np.int32,
+    'weight': np.float32,
+    'life_stage': np.int8,
+    'sick': np.bool_,
+    'alive': np.bool_,
+    'cause': np.int8,
+}
+
+# Values stored in the `cause` field once a pet dies
+CAUSES = ('alive', 'hunger', 'health', 'cleanliness')
+
+
+@lru_cache(maxsize=None)
+def _event_tables():
+    """Every species' event alias table as (species, column) arrays, padded to the longest one."""
+    tables = [registry.pet_class(name).EVENTS for name in SPECIES]
+    width = max(len(table.events) for table in tables)
+    arrays = {
+        'odds': np.array([table.odds for table in tables], dtype=np.float32),
+        'size': np.array([len(table.events) for table in tables], dtype=np.float64),
+        'probability': np.ones((len(tables), width), dtype=np.float32),
+        'alias': np.zeros((len(tables), width), dtype=np.intp),
+        'happiness': np.zeros((len(tables), width), dtype=np.int16),
+        'health': np.zeros((len(tables), width), dtype=np.int16),
+    }
+    for row, table in enumerate(tables):
+        count = len(table.events)
+        arrays['probability'][row, :count] = table.alias.probability
+        arrays['alias'][row, :count] = table.alias.alias
+        arrays['happiness'][row, :count] = [event.happiness for event in table.events]
+        arrays['health'][row, :count] = [event.health for event in table.events]
+    return arrays
+
+
+class PetBatch:
+    """Headless simulator advancing many pets per tick with the same rules as `Pet`."""
+
+    def __init__(self, arrays, rng=None):
+        self.arrays = arrays
+        for name in FIELDS:
+            setattr(self, name, arrays[name])
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._events = _event_tables()
+
+    @classmethod
+    def create(cls, size, species='dog', rng=None):
+        """Creates `size` freshly hatched pets, matching `Pet.__init__` defaults."""
+        arrays = {name: np.zeros(size, dtype=dtype) for name, dtype in FIELDS.items()}
+        arrays['species'][:] = SPECIES.index(species)
+        arrays['hunger'][:] = 50
+        arrays['happiness'][:] = 50
+        arrays['health'][:] = 100
+        arrays['cleanliness'][:] = 100
+        arrays['weight'][:] = 5
+        arrays['alive'][:] = True
+        return cls(arrays, rng)
+
+    @classmethod
+    def from_pets(cls, pets, rng=None):
+        """Copies the state of existing `Dog`/`Cat` objects into a batch."""
+        batch = cls.create(len(pets), rng=rng)
+        for i, pet in enumerate(pets):
+            batch.species[i] = SPECIES.index(pet.pet_type)
+            batch.hunger[i] = pet.hunger
+            batch.happiness[i] = pet.happiness
+            batch.training[i] = pet.training
+            batch.health[i] = pet.health
+            batch.cleanliness[i] = pet.cleanliness
+            batch.age[i] = pet.age
+            batch.weight[i] = pet.weight
+            batch.life_stage[i] = pet.life_stage_index
+            batch.sick[i] = pet.sick
+            batch.alive[i] = pet.alive
+        return batch
+
+    def __len__(self):
+        return len(self.alive)
+
+    def _decay(self, meter, bounds, mask):
+        low, high = bounds
+        meter -= self.rng.integers(low, high + 1, size=len(meter), dtype=np.int16) * mask
+        np.clip(meter, 0, 100, out=meter)
+
+    def tick(self):
+        """Advances every living pet by one `Pet.tick` step; returns the mask of pets that died."""
+        started_alive = self.alive.copy()
+        mask = started_alive.astype(np.int16)
+
+        # Pet.update_meters
+        self._decay(self.hunger, Pet.HUNGER_DECAY, mask)
+        self._decay(self.happiness, Pet.HAPPINESS_DECAY, mask)
+        self._decay(self.cleanliness, Pet.CLEANLINESS_DECAY, mask)
+        self._decay(self.health, Pet.HEALTH_DECAY, mask)
+        self.age += mask
+
+        grows = started_alive & (self.age % Pet.DAYS_PER_STAGE == 0) & (self.life_stage < len(Pet.LIFE_STAGES) - 1)
+        self.life_stage += grows
+
+        # Pet.check_sickness
+        falls_sick = started_alive & ~self.sick & (self.cleanliness < Pet.SICKNESS_THRESHOLD)
+        falls_sick &= self.rng.random(len(self), dtype=np.float32) < 0.5
+        self.sick |= falls_sick
+        self.health -= falls_sick * np.int16(Pet.SICKNESS_DAMAGE)
+        np.maximum(self.health, 0, out=self.health)
+
+        # Pet.check_alive, keeping the first failing meter as the cause of death
+        died = started_alive & ((self.hunger <= 0) | (self.health <= 0) | (self.cleanliness <= 0))
+        cause = np.where(self.hunger <= 0, 1, np.where(self.health <= 0, 2, 3)).astype(np.int8)
+        self.cause[died] = cause[died]
+        self.alive &= ~died
+
+        # Pet.random_event, which Pet.tick rolls even on the tick a pet dies: the 1-in-odds chance, then an
+        # alias table draw in the pet's species table
+        events, species = self._events, self.species.astype(np.intp)
+        hit = (self.rng.random(len(self), dtype=np.float32) * events['odds'][species] < 1) & started_alive
+        column = (self.rng.random(len(self)) * events['size'][species]).astype(np.intp)
+        keep = self.rng.random(len(self), dtype=np.float32) < events['probability'][species, column]
+        event = np.where(keep, column, events['alias'][species, column])
+        self.happiness += events['happiness'][species, event] * hit
+        self.health += events['health'][species, event] * hit
+        np.clip(self.happiness, 0, 100, out=self.happiness)
+        np.clip(self.health, 0, 100, out=self.health)
+
+        return died
+
+    # Care actions, each applied to the living pets selected by `mask` with the same effect as the Pet method
+
+    def _cared(self, mask):
+        return (mask & self.alive).astype(np.int16)
+
+    def feed(self, mask, food_type, times=1):
+        mask = self._cared(mask)
+        if food_type == 'meal':
+            self.hunger += mask * np.int16(30 * times)
+            self.weight += mask * np.float32(0.5 * times)
+        elif food_type == 'snack':
+            self.hunger += mask * np.int16(10 * times)
+            self.happiness += mask * np.int16(5 * times)
+            self.weight += mask * np.float32(0.2 * times)
+        np.minimum(self.hunger, 100, out=self.hunger)
+        np.minimum(self.happiness, 100, out=self.happiness)
+
+    def play(self, mask):
+        """One round of the guessing game with a random guess, so a 1-in-5 chance of the bigger reward."""
+        mask = self._cared(mask)
+        guessed = self.rng.integers(0, 5, size=len(self), dtype=np.int16) == 0
+        self.happiness += mask * np.where(guessed, np.int16(15), np.int16(5))
+        self.hunger -= mask * np.int16(5)
+        np.minimum(self.happiness, 100, out=self.happiness)
+        np.maximum(self.hunger, 0, out=self.hunger)
+
+    def sleep(self, mask, times=1):
+        mask = self._cared(mask)
+        self.health += mask * np.int16(20 * times)
+        self.hunger -= mask * np.int16(10 * times)
+        self.cleanliness -= mask * np.int16(5 * times)
+        np.minimum(self.health, 100, out=self.health)
+        np.maximum(self.hunger, 0, out=self.hunger)
+        np.maximum(self.cleanliness, 0, out=self.cleanliness)
+
+    def exercise(self, mask, times=1):
+        mask = self._cared(mask)
+        self.training += mask * np.int16(10 * times)
+        self.happiness += mask * np.int16(5 * times)
+        self.hunger -= mask * np.int16(10 * times)
+        self.weight -= mask * np.float32(0.5 * times)
+        np.minimum(self.training, 100, out=self.training)
+        np.minimum(self.happiness, 100, out=self.happiness)
+        np.maximum(self.hunger, 0, out=self.hunger)
+        np.maximum(self.weight, 1, out=self.weight)
+
+    def clean(self, mask, times=1):
+        cared = mask & self.alive
+        self.cleanliness[cared] = 100
+        self.happiness += cared * np.int16(5 * times)
+        np.minimum(self.happiness, 100, out=self.happiness)
+        # Pet.cure_sickness
+        cured = cared & self.sick
+        self.sick &= ~cured
+        self.health += cured * np.int16(20)
+        np.minimum(self.health, 100, out=self.health)
+
+    def run(self, ticks):
+        """Runs up to `ticks` ticks, stopping early once every pet has died."""
+        for _ in range(ticks):
+            if not self.alive.any():
+                break
+            self.tick()
+
+    def deaths_by_cause(self):
+        counts = np.bincount(self.cause[~self.alive], minlength=len(CAUSES))
+        return {name: int(counts[i]) for i, name in enumerate(CAUSES) if i}
+
+    def summary(self):
+        alive = self.alive
+        stats = {'pets': len(self), 'alive': int(alive.sum())}
+        for name in ('hunger', 'happiness', 'health', 'cleanliness'):
+            values = getattr(self, name)[alive]
+            stats[f'mean_{name}'] = float(values.mean()) if len(values) else 0.0
+        stats['deaths'] = self.deaths_by_cause()
+        return stats
@@ -0,0 +1,259 @@
+"""Offline solve behind the autopilot table in `game.autopilot`.
+
+Value iteration over every bucketed state (hunger, happiness, health,
+cleanliness, sick). A tick is split in two steps:
+
+1. The chosen action. Its effect is measured by running the real command on a
+   probe pet set to each state, so the solve always sees the current `feed`,
+   `sleep`, `clean` etc. The probes run in parallel across a process pool.
+2. `Pet.tick`. The meters decay independently, so the tick is one small
+   matrix per meter, coupled only by sickness (cleanliness drives it, health
+   pays for it) and the shared random event roll.
+
+Values between two buckets are rounded to one of them at random in
+proportion to the distance, so the expected meter values match the game's.
+Post-action values live on a finer FINE-wide grid so small effects like
+a snack's +5 happiness aren't rounded away before the tick.
+
+Run from the repository root: python -m simulation.care_solver [--force] [--workers N]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+from game.autopilot import ACTIONS, GAMMA, HAPPINESS_WEIGHT, LEVELS, PET_CLASSES, STATES, STEP, TABLE_FILE, \
+    fingerprint, read_tables, write_tables
+
+FINE = 5  # grid for meter values right after an action, before the tick
+FINE_LEVELS = 100 // FINE + 1
+TOLERANCE = 1e-4  # stop once no state value moves more than this in an iteration
+MAX_ITERATIONS = 2000
+CHUNK_STATES = 2048  # states probed per task
+
+
+class _FixedRoll(random.Random):
+    """An RNG whose randint always lands on `value`, to enumerate the outcomes of `play_guess`."""
+
+    def __init__(self, value):
+        super().__init__(0)
+        self.value = value
+
+    def randint(self, a, b):
+        return self.value
+
+
+def _split(value, step):
+    """[(index, probability)] of `value` rounded onto a `step` grid, keeping the mean."""
+    value = min(100, max(0, value))
+    low, rest = divmod(value, step)
+    if not rest:
+        return [(low, 1.0)]
+    return [(low, 1 - rest / step), (low + 1, rest / step)]
+
+
+def _decode(state):
+    state, sick = divmod(state, 2)
+    state, cleanliness = divmod(state, LEVELS)
+    state, health = divmod(state, LEVELS)
+    hunger, happiness = divmod(state, LEVELS)
+    return hunger * STEP, happiness * STEP, health * STEP, cleanliness * STEP, bool(sick)
+
+
+def _probe(task):
+    """Post-action outcomes of every action for states [start, stop) as (probability, fine state) lists."""
+    species, start, stop = task
+    pet_class = PET_CLASSES[species]
+    pet = pet_class("Probe", "", "", "", None, None, species)
+    pet.muted = True
+    pet.notifier = lambda kind, title, message: None
+    # play_guess draws randint(1, 5); PlayCommand always guesses "1", so each draw is one outcome
+    rolls = [_FixedRoll(number) for number in range(1, 6)]
+    results = []
+    for state in range(start, stop):
+        hunger, happiness, health, cleanliness, sick = _decode(state)
+        per_action = []
+        for name, command_class, kwargs in ACTIONS:
+            outcomes = {}
+            for roll in (rolls if name == 'play' else rolls[:1]):
+                pet.hunger, pet.happiness, pet.health, pet.cleanliness = hunger, happiness, health, cleanliness
+                pet.sick, pet.alive, pet.rng = sick, True, roll
+                if command_class is not None:
+                    command_class(pet, **kwargs).execute()
+                weight = 1 / len(rolls) if name == 'play' else 1.0
+                for fh, ph in _split(pet.hunger, FINE):
+                    for fa, pa in _split(pet.happiness, FINE):
+                        for fe, pe in _split(pet.health, FINE):
+                            for fc, pc in _split(pet.cleanliness, FINE):
+                                index = ((((fh * FINE_LEVELS) + fa) * FINE_LEVELS + fe) * FINE_LEVELS + fc) * 2 \
+                                        + pet.sick
+                                outcomes[index] = outcomes.get(index, 0.0) + weight * ph * pa * pe * pc
+            per_action.append(list(outcomes.items()))
+        results.append(per_action)
+    return start, results
+
+
+def post_action_outcomes(species, workers=None):
+    """(index, probability) arrays of shape (STATES, len(ACTIONS), outcomes) into the fine post-action grid."""
+    tasks = [(species, start, min(start + CHUNK_STATES, STATES)) for start in range(0, STATES, CHUNK_STATES)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        chunks = list(map(_probe, tasks))
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        with multiprocessing.get_context('fork' if 'fork' in methods else None).Pool(workers) as pool:
+            chunks = pool.map(_probe, tasks)
+    width = max(len(outcomes) for _, results in chunks for per_action in results for outcomes in per_action)
+    index = np.zeros((STATES, len(ACTIONS), width), dtype=np.int32)
+    probability = np.zeros((STATES, len(ACTIONS), width), dtype=np.float64)
+    for start, results in chunks:
+        for offset, per_action in enumerate(results):
+            for action, outcomes in enumerate(per_action):
+                for k, (target, p) in enumerate(outcomes):
+                    index[start + offset, action, k] = target
+                    probability[start + offset, action, k] = p
+    return index, probability
+
+
+def _decays(bounds):
+    low, high = bounds
+    return [(d, 1 / (high - low + 1)) for d in range(low, high + 1)]
+
+
+def _meter_matrix(rule):
+    """FINE_LEVELS x LEVELS matrix from a post-action value to the bucket after the tick.
+
+    `rule(value)` lists (probability, value after the tick or None if the pet died).
+    Rows don't sum to one when the pet can die.
+    """
+    matrix = np.zeros((FINE_LEVELS, LEVELS))
+    for row in range(FINE_LEVELS):
+        for p, value in rule(row * FINE):
+            if value is not None:
+                for column, q in _split(value, STEP):
+                    matrix[row, column] += p * q
+    return matrix
+
+
+def tick_model(pet_class):
+    """The per-meter matrices of one `Pet.tick`, following update_meters, check_sickness and random_event."""
+    clamp = lambda value: min(100, max(0, value))
+
+    def decayed(bounds, value):
+        return [(p, clamp(value - d)) for d, p in _decays(bounds)]
+
+    # Events with the same effect are one outcome, so the solve doesn't grow with the number of event types
+    table = pet_class.EVENTS
+    effects = {(0, 0): 1 - 1 / table.odds}
+    for p, event in zip(table.probabilities(), table.events):
+        effects[event.happiness, event.health] = effects.get((event.happiness, event.health), 0) + p
+    events = [(p, {'happiness': happiness, 'health': health}) for (happiness, health), p in effects.items()]
+
+    def health_rule(event, damage):
+        def rule(value):
+            outcomes = []
+            for p, health in decayed(pet_class.HEALTH_DECAY, value):
+                health = max(0, health - damage)
+                outcomes.append((p, clamp(health + event.get('health', 0)) if health > 0 else None))
+            return outcomes
+        return rule
+
+    threshold = pet_class.SICKNESS_THRESHOLD
+    return {
+        'events': [p for p, _ in events],
+        'hunger': _meter_matrix(lambda value: [(p, x if x > 0 else None)
+                                               for p, x in decayed(pet_class.HUNGER_DECAY, value)]),
+        'happiness': [_meter_matrix(lambda value, event=event: [(p, clamp(x + event.get('happiness', 0)))
+                                                                for p, x in decayed(pet_class.HAPPINESS_DECAY, value)])
+                      for _, event in events],
+        'health': [_meter_matrix(health_rule(event, 0)) for _, event in events],
+        'health_sick': [_meter_matrix(health_rule(event, pet_class.SICKNESS_DAMAGE)) for _, event in events],
+        # Cleanliness after the tick, split by whether it's low enough to risk sickness
+        'clean_safe': _meter_matrix(lambda value: [(p, x if x >= threshold else None)
+                                                   for p, x in decayed(pet_class.CLEANLINESS_DECAY, value)]),
+        'clean_risky': _meter_matrix(lambda value: [(p, x if 0 < x < threshold else None)
+                                                    for p, x in decayed(pet_class.CLEANLINESS_DECAY, value)]),
+    }
+
+
+def _expected(model, values, clean, health):
+    """Expected value after the tick from each fine post-action state, for one sick flag outcome."""
+    partial = np.einsum('ijkl,xi,wl->xjkw', values, model['hunger'], clean, optimize=True)
+    total = 0
+    for p, happiness, health_matrix in zip(model['events'], model['happiness'], health):
+        total = total + p * np.einsum('xjkw,yj,zk->xyzw', partial, happiness, health_matrix, optimize=True)
+    return total
+
+
+def solve(species, workers=None, verbose=False):
+    """Value iteration for one species; returns the best action index per state as bytes."""
+    pet_class = PET_CLASSES[species]
+    started = time.perf_counter()
+    index, probability = post_action_outcomes(species, workers)
+    model = tick_model(pet_class)
+    if verbose:
+        print(f"{species}: transitions built in {time.perf_counter() - started:.1f} s")
+
+    happiness = np.arange(LEVELS) * STEP / 100
+    reward = np.broadcast_to((1 + HAPPINESS_WEIGHT * happiness)[None, :, None, None, None],
+                             (LEVELS,) * 4 + (2,)).reshape(STATES)
+    values = np.zeros(STATES)
+    risky = model['clean_risky']
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        grid = values.reshape((LEVELS,) * 4 + (2,))
+        healthy, sick = grid[..., 0], grid[..., 1]
+        # Already sick: stays sick, no new damage
+        if_sick = _expected(model, sick, model['clean_safe'] + risky, model['health'])
+        # Not sick: low cleanliness is a coin flip between staying well and falling sick with damage
+        if_well = (_expected(model, healthy, model['clean_safe'] + 0.5 * risky, model['health'])
+                   + _expected(model, sick, 0.5 * risky, model['health_sick']))
+        after_tick = np.stack([if_well, if_sick], axis=-1).reshape(-1)
+        q = (probability * after_tick[index]).sum(axis=2)
+        updated = reward + GAMMA * q.max(axis=1)
+        delta = np.abs(updated - values).max()
+        values = updated
+        if delta < TOLERANCE:
+            break
+    policy = q.argmax(axis=1).astype(np.uint8)
+    if verbose:
+        counts = np.bincount(policy, minlength=len(ACTIONS))
+        print(f"{species}: {iteration} iterations, {time.perf_counter() - started:.1f} s total, actions: "
+              + ", ".join(f"{ACTIONS[i][0]} {counts[i]}" for i in range(len(ACTIONS))))
+    return policy.tobytes()
+
+
+def build_tables(path=TABLE_FILE, force=False, workers=None, verbose=False):
+    """Solves every species whose stored table is missing or stale and rewrites the table file.
+
+    Returns species -> (fingerprint, table bytes).
+    """
+    tables = read_tables(path)
+    changed = False
+    for species, pet_class in PET_CLASSES.items():
+        digest = fingerprint(pet_class)
+        if not force and species in tables and tables[species][0] == digest:
+            if verbose:
+                print(f"{species}: table is up to date")
+            continue
+        tables[species] = (digest, solve(species, workers, verbose))
+        changed = True
+    tables = {species: entry for species, entry in tables.items() if species in PET_CLASSES}
+    if changed:
+        write_tables(tables, path)
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the autopilot's optimal care table.")
+    parser.add_argument('--force', action='store_true', help="solve even if the stored tables are up to date")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=TABLE_FILE)
+    args = parser.parse_args()
+    build_tables(args.output, args.force, args.workers, verbose=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Runs a large pet population across a process pool.
+
+Pet state lives in one shared-memory block laid out like `PetBatch`, so each
+worker ticks its own slice of the arrays in place and nothing is pickled per
+tick. Workers write per-tick aggregates into a second small shared block, and
+the parent only sums those rows.
+
+Run from the repository root: python -m simulation.farm [pets] [ticks] [workers]
+"""
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from simulation.batch import CAUSES, FIELDS, PetBatch
+
+CHUNK_TICKS = 100  # ticks each worker runs per task before the parent collects aggregates
+
+# Columns of the per-tick aggregate rows written by each shard
+STATS = ('alive', 'hunger', 'happiness', 'health', 'cleanliness') + tuple(f'died_{cause}' for cause in CAUSES[1:])
+METERS = STATS[1:5]
+
+_shared = {}  # worker-side state installed by _init_worker
+
+
+def _layout(size):
+    """Byte offset of every field in the shared block, each 8-byte aligned, and the block size."""
+    offsets, total = {}, 0
+    for name, dtype in FIELDS.items():
+        total = -(-total // 8) * 8
+        offsets[name] = total
+        total += np.dtype(dtype).itemsize * size
+    return offsets, max(total, 1)
+
+
+def _views(buffer, size):
+    offsets, _ = _layout(size)
+    return {name: np.ndarray(size, dtype=dtype, buffer=buffer, offset=offsets[name])
+            for name, dtype in FIELDS.items()}
+
+
+def _stats_view(buffer, shards, ticks):
+    return np.ndarray((shards, ticks, len(STATS)), dtype=np.int64, buffer=buffer)
+
+
+def _init_worker(population, stats, size, shards, chunk):
+    # Under fork the SharedMemory objects are inherited as-is; under spawn they re-attach by name
+    _shared['population'] = population
+    _shared['stats'] = stats
+    _shared['arrays'] = _views(population.buf, size)
+    _shared['rows'] = _stats_view(stats.buf, shards, chunk)
+
+
+def _run_shard(shard, start, stop, first_tick, ticks, seed):
+    """Ticks pets [start, stop) in place and writes one aggregate row per tick for this shard."""
+    arrays = {name: array[start:stop] for name, array in _shared['arrays'].items()}
+    # Seeded by shard and tick, so results don't depend on which process runs the task
+    batch = PetBatch(arrays, np.random.default_rng([seed, shard, first_tick]))
+    rows = _shared['rows'][shard]
+    rows[:] = 0
+    for tick in range(ticks):
+        if not batch.alive.any():
+            break
+        died = batch.tick()
+        alive = batch.alive
+        row = rows[tick]
+        row[0] = np.count_nonzero(alive)
+        for column, meter in enumerate(METERS, start=1):
+            row[column] = np.sum(getattr(batch, meter), where=alive, dtype=np.int64)
+        row[5:] = np.bincount(batch.cause[died], minlength=len(CAUSES))[1:]
+    return shard
+
+
+class SimulationFarm:
+    """A population of pets in shared memory, sharded across worker processes.
+
+    `run` yields one aggregate dict per tick: alive count, mean meters of the
+    living pets and deaths by cause. Results depend on the seed and the shard
+    count, not on how many processes there are or how tasks get scheduled.
+    """
+
+    def __init__(self, size, workers=None, shards=None, seed=None, chunk=CHUNK_TICKS):
+        self.size = size
+        self.workers = workers or os.cpu_count() or 1
+        self.shards = min(shards or self.workers, max(size, 1))
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2 ** 32)
+        self.chunk = chunk
+        self.ticks = 0
+        _, nbytes = _layout(size)
+        self._population = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._stats = shared_memory.SharedMemory(create=True, size=self.shards * chunk * len(STATS) * 8)
+        self.batch = PetBatch(_views(self._population.buf, size))
+        self._rows = _stats_view(self._stats.buf, self.shards, chunk)
+        bounds = np.linspace(0, size, self.shards + 1).astype(int)
+        self._bounds = list(zip(bounds[:-1], bounds[1:]))
+        self._pool = None
+
+    @classmethod
+    def create(cls, size, species='dog', **kwargs):
+        """A farm of `size` freshly hatched pets, as `PetBatch.create` makes them."""
+        farm = cls(size, **kwargs)
+        farm._fill(PetBatch.create(size, species))
+        return farm
+
+    @classmethod
+    def from_pets(cls, pets, **kwargs):
+        """A farm seeded with the state of existing `Dog`/`Cat` objects."""
+        farm = cls(len(pets), **kwargs)
+        farm._fill(PetBatch.from_pets(pets))
+        return farm
+
+    def _fill(self, batch):
+        for name in FIELDS:
+            self.batch.arrays[name][:] = batch.arrays[name]
+
+    def _start_pool(self):
+        if self._pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+            self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                      initargs=(self._population, self._stats, self.size, self.shards, self.chunk))
+        return self._pool
+
+    def run(self, ticks):
+        """Advances every pet by up to `ticks` ticks, yielding the aggregates of each tick as it completes."""
+        pool = self._start_pool()
+        remaining = ticks
+        while remaining > 0:
+            count = min(self.chunk, remaining)
+            tasks = [(shard, start, stop, self.ticks, count, self.seed)
+                     for shard, (start, stop) in enumerate(self._bounds)]
+            pool.starmap(_run_shard, tasks)
+            totals = self._rows[:, :count].sum(axis=0)
+            for offset in range(count):
+                yield self._tick_stats(self.ticks + offset + 1, totals[offset])
+            self.ticks += count
+            remaining -= count
+            if not totals[-1, 0]:
+                break
+
+    def _tick_stats(self, tick, row):
+        alive = int(row[0])
+        stats = {'tick': tick, 'alive': alive}
+        for column, meter in enumerate(METERS, start=1):
+            stats[f'mean_{meter}'] = float(row[column]) / alive if alive else 0.0
+        stats['deaths'] = {cause: int(row[4 + i]) for i, cause in enumerate(CAUSES) if i}
+        return stats
+
+    def summary(self):
+        return self.batch.summary()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        # Drop our array views before releasing the buffers they point into
+        self.batch = self._rows = None
+        for block in (self._population, self._stats):
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(size=1000000, ticks=100, workers=None):
+    with SimulationFarm.create(size, workers=workers, seed=0) as farm:
+        started = time.perf_counter()
+        for stats in farm.run(ticks):
+            last = stats
+        elapsed = time.perf_counter() - started
+        print(f"{farm.workers} workers, {farm.shards} shards: {size} pets x {last['tick']} ticks in {elapsed:.2f} s "
+              f"({size * last['tick'] / elapsed / 1e6:.1f}M pet-ticks/s)")
+        print(farm.summary())
+
+
+if __name__ == '__main__':
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    main(*arguments)
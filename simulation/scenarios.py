@@ -0,0 +1,225 @@
+"""Headless scenario runs through the real `Pet` rules, streamed as JSON lines.
+
+A scenario file is JSON, either a list of scenarios or an object with
+`scenarios` and optional `defaults` that fill in whatever a scenario leaves
+out. A `.jsonl` file holds one scenario per line and is read lazily.
+
+    {
+      "defaults": {"ticks": 500, "runs": 10},
+      "scenarios": [
+        {"name": "meals and baths", "species": "dog", "seed": 7,
+         "stats": {"hunger": 40, "cleanliness": 60},
+         "script": [
+           {"every": 3, "command": "feed", "food_type": "meal"},
+           {"every": 4, "from": 2, "command": "clean"},
+           {"at": 10, "command": "play", "guess": "3"}
+         ]}
+      ]
+    }
+
+`species` is any species in data/species.json. `stats` sets the starting
+value of any of STATS. Each script step runs a `Command` (see COMMANDS) right
+before tick `at`, or before every `every`-th tick starting at `from`; its
+other keys are the command's arguments, and inputs the game would ask for in
+a dialog (`food_type`, `guess`) must be given. Run `r` of a scenario seeds
+its pet with `seed + r`, so a file always reproduces the same records.
+
+Scenarios, runs, ticks and output lines are a chain of generators, so memory
+stays flat however many ticks go through.
+"""
+import inspect
+import json
+import os
+
+from game.commands import (CleanCommand, ExerciseCommand, FeedCommand, PlayCommand, SleepCommand,
+                           SpecialAbilityCommand)
+from models.species import registry
+
+COMMANDS = {
+    'feed': FeedCommand,
+    'sleep': SleepCommand,
+    'exercise': ExerciseCommand,
+    'play': PlayCommand,
+    'clean': CleanCommand,
+    'special_ability': SpecialAbilityCommand,
+}
+STATS = ('hunger', 'happiness', 'training', 'health', 'cleanliness', 'age', 'weight', 'life_stage_index', 'sick')
+DEFAULTS = {'species': 'dog', 'seed': 0, 'ticks': 1000, 'runs': 1, 'stats': {}, 'script': []}
+
+
+class ScenarioError(Exception):
+    pass
+
+
+def _whole_number(value, where, name, minimum=0):
+    # bool is an int subclass, but `true` is never meant as a tick count
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise ScenarioError(f"{where}: '{name}' must be a whole number of at least {minimum}.")
+    return value
+
+
+def _object(value, where):
+    if not isinstance(value, dict):
+        raise ScenarioError(f"{where}: expected an object.")
+    return value
+
+
+class ScriptStep:
+    __slots__ = ('at', 'every', 'start', 'command', 'command_class', 'kwargs')
+
+    def __init__(self, data, where):
+        data = dict(_object(data, where))
+        self.command = data.pop('command', None)
+        if self.command not in COMMANDS:
+            raise ScenarioError(f"{where}: unknown command {self.command!r}, expected one of {', '.join(COMMANDS)}.")
+        self.command_class = COMMANDS[self.command]
+        self.at = data.pop('at', None)
+        self.every = data.pop('every', None)
+        self.start = _whole_number(data.pop('from', 0), where, 'from')
+        if (self.at is None) == (self.every is None):
+            raise ScenarioError(f"{where}: give either 'at' or 'every'.")
+        if self.at is not None:
+            _whole_number(self.at, where, 'at')
+        else:
+            _whole_number(self.every, where, 'every', minimum=1)
+        try:
+            inspect.signature(self.command_class).bind(None, **data)
+        except TypeError as e:
+            raise ScenarioError(f"{where}: bad arguments for {self.command}: {e}.") from None
+        missing = [name for name in self.command_class.INPUTS if data.get(name) is None]
+        if missing:
+            raise ScenarioError(f"{where}: {self.command} needs {', '.join(missing)} up front.")
+        self.kwargs = data
+
+    def due(self, tick):
+        if self.at is not None:
+            return tick == self.at
+        return tick >= self.start and (tick - self.start) % self.every == 0
+
+
+class Scenario:
+    __slots__ = ('name', 'species', 'seed', 'ticks', 'runs', 'stats', 'script')
+
+    def __init__(self, data, index=0):
+        _object(data, f"scenario {index}")
+        where = f"scenario {data.get('name', index)!r}"
+        unknown = set(data) - set(DEFAULTS) - {'name'}
+        if unknown:
+            raise ScenarioError(f"{where}: unknown keys {', '.join(sorted(unknown))}.")
+        self.name = str(data.get('name', index))
+        self.species = data['species']
+        if not isinstance(self.species, str) or self.species not in registry:
+            raise ScenarioError(f"{where}: unknown species {self.species!r}.")
+        self.seed = data['seed']
+        if self.seed is not None and (not isinstance(self.seed, int) or isinstance(self.seed, bool)):
+            raise ScenarioError(f"{where}: 'seed' must be a whole number or null.")
+        self.ticks = _whole_number(data['ticks'], where, 'ticks')
+        self.runs = _whole_number(data['runs'], where, 'runs')
+        self.stats = dict(_object(data['stats'], f"{where}, stats"))
+        unknown = set(self.stats) - set(STATS)
+        if unknown:
+            raise ScenarioError(f"{where}: unknown stats {', '.join(sorted(unknown))}.")
+        for name, value in self.stats.items():
+            if name == 'sick':
+                if not isinstance(value, bool):
+                    raise ScenarioError(f"{where}: stat 'sick' must be true or false.")
+            elif name == 'weight':  # kilograms, fractions allowed
+                if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+                    raise ScenarioError(f"{where}: stat 'weight' must be a positive number.")
+            else:
+                _whole_number(value, f"{where}, stats", name)
+        if not isinstance(data['script'], list):
+            raise ScenarioError(f"{where}: 'script' must be a list of steps.")
+        self.script = [ScriptStep(step, f"{where}, step {i}") for i, step in enumerate(data['script'])]
+
+    def create_pet(self, run):
+        pet = registry.create(self.species, self.name)
+        pet.muted = True
+        pet.seed_rng(None if self.seed is None else self.seed + run)
+        for name, value in self.stats.items():
+            setattr(pet, name, value)
+        return pet
+
+
+def load_scenarios(path):
+    """Yields the scenarios in a .json or .jsonl file, defaults applied."""
+    if os.path.splitext(path)[1] == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            for index, line in enumerate(f):
+                if line.strip():
+                    where = f"{path}:{index + 1}"
+                    yield Scenario({**DEFAULTS, **_object(_decode(line, where), where)}, index)
+        return
+    with open(path, encoding='utf-8') as f:
+        data = _decode(f.read(), path)
+    defaults = DEFAULTS
+    if isinstance(data, dict):
+        defaults = {**DEFAULTS, **_object(data.get('defaults', {}), f"{path}, defaults")}
+        data = data.get('scenarios', [])
+    if not isinstance(data, list):
+        raise ScenarioError(f"{path}: expected a list of scenarios.")
+    for index, scenario in enumerate(data):
+        yield Scenario({**defaults, **scenario} if isinstance(scenario, dict) else scenario, index)
+
+
+def _decode(text, where):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ScenarioError(f"{where}: {e}") from None
+
+
+def cause_of_death(pet):
+    if pet.hunger <= 0:
+        return 'hunger'
+    if pet.health <= 0:
+        return 'health'
+    return 'cleanliness'
+
+
+def run_scenario(scenario, run):
+    """Yields one record per tick of one run, then an `end` record."""
+    pet = scenario.create_pet(run)
+    messages = []
+    pet.notifier = lambda kind, title, message: messages.append(message)
+    tick = 0
+    while tick < scenario.ticks and pet.alive:
+        commands = []
+        for step in scenario.script:
+            if step.due(tick):
+                step.command_class(pet, **step.kwargs).execute()
+                commands.append(step.command)
+        pet.tick()
+        tick += 1
+        record = {
+            'type': 'tick', 'scenario': scenario.name, 'run': run, 'tick': tick,
+            'hunger': pet.hunger, 'happiness': pet.happiness, 'training': pet.training, 'health': pet.health,
+            'cleanliness': pet.cleanliness, 'weight': round(pet.weight, 2), 'stage': pet.life_stage,
+            'sick': pet.sick, 'alive': pet.alive,
+        }
+        if commands:
+            record['commands'] = commands
+        if messages:
+            record['messages'] = messages[:]
+            messages.clear()
+        yield record
+    yield {'type': 'end', 'scenario': scenario.name, 'run': run, 'ticks': tick, 'alive': pet.alive,
+           'cause': None if pet.alive else cause_of_death(pet), 'age': pet.age, 'stage': pet.life_stage}
+
+
+def run_all(scenarios):
+    for scenario in scenarios:
+        for run in range(scenario.runs):
+            yield from run_scenario(scenario, run)
+
+
+def every_nth_tick(records, every):
+    """Keeps every `every`-th tick record and all `end` records; `every=0` keeps only the `end` records."""
+    for record in records:
+        if record['type'] != 'tick' or (every and record['tick'] % every == 0):
+            yield record
+
+
+def to_jsonl(records):
+    for record in records:
+        yield json.dumps(record, separators=(',', ':')) + '\n'
@@ -0,0 +1,265 @@
+"""Monte Carlo survival analysis of a care policy.
+
+A policy is a small list of rules separated by commas, semicolons or newlines:
+
+    feed meal when hunger < 30, clean every 3 ticks, sleep when health <= 40, clean when sick
+
+Each rule is an action (feed [meal|snack], play, sleep, exercise, clean) and a
+trigger: `when <meter> <op> <number>`, `when sick`, or `every <n> ticks`. The
+rules run in order between ticks, the way a player would act between two
+`Pet.tick` calls, on every living pet whose trigger matches.
+
+Lifetimes are simulated in chunks of `PetBatch` pets spread over a process
+pool. Every finished chunk only sends back small histograms, and `analyze`
+yields an updated report after each one, so results stream in while the run
+goes on. Pets still alive after `ticks` ticks are counted as censored.
+
+Run from the repository root:
+    python -m simulation.survival "feed meal when hunger < 30, clean every 3 ticks" [--lifetimes 200000] [--json]
+"""
+import argparse
+import json
+import multiprocessing
+import operator
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from models.pet import Pet
+from models.species import registry
+from simulation.batch import CAUSES, PetBatch
+
+CHUNK_SIZE = 10000  # lifetimes simulated per task
+MAX_TICKS = 1000  # lifetimes still going after this many ticks are censored
+CURVE_POINTS = 20  # survival curve samples in the text report
+
+ACTIONS = ('feed', 'play', 'sleep', 'exercise', 'clean')
+METERS = ('hunger', 'happiness', 'training', 'health', 'cleanliness')
+OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge, '==': operator.eq,
+             '!=': operator.ne}
+RULE_PATTERN = re.compile(
+    r"(?P<action>[a-z_]+)(?:\s+(?P<food_type>meal|snack))?\s+"
+    r"(?:when\s+(?P<meter>[a-z_]+)\s*(?P<op><=|>=|==|!=|<|>)\s*(?P<value>-?\d+)"
+    r"|when\s+(?P<sick>sick)"
+    r"|every\s+(?P<every>\d+)\s+ticks?)"
+)
+
+
+class CareRule:
+    """One `<action> <trigger>` rule of a care policy."""
+
+    def __init__(self, action, food_type=None, meter=None, op=None, value=None, sick=False, every=None):
+        self.action = action
+        self.food_type = food_type
+        self.meter = meter
+        self.op = op
+        self.value = value
+        self.sick = sick
+        self.every = every
+
+    @classmethod
+    def parse(cls, text):
+        match = RULE_PATTERN.fullmatch(text.strip().lower())
+        if match is None:
+            raise ValueError(f"Can't read care rule {text.strip()!r}")
+        action, food_type, meter = match['action'], match['food_type'], match['meter']
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}, expected one of {', '.join(ACTIONS)}")
+        if action == 'feed':
+            food_type = food_type or 'meal'
+        elif food_type is not None:
+            raise ValueError(f"Only feed takes a food type, got {text.strip()!r}")
+        if meter is not None and meter not in METERS:
+            raise ValueError(f"Unknown meter {meter!r}, expected one of {', '.join(METERS)}")
+        every = int(match['every']) if match['every'] else None
+        if every == 0:
+            raise ValueError("A rule can't run every 0 ticks")
+        value = int(match['value']) if match['value'] else None
+        return cls(action, food_type, meter, match['op'], value, bool(match['sick']), every)
+
+    def selects(self, batch, tick):
+        """Mask of the pets this rule acts on after `tick` ticks."""
+        if self.every is not None:
+            return batch.alive if tick and tick % self.every == 0 else np.zeros(len(batch), dtype=np.bool_)
+        if self.sick:
+            return batch.sick & batch.alive
+        return OPERATORS[self.op](getattr(batch, self.meter), self.value) & batch.alive
+
+    def apply(self, batch, tick):
+        mask = self.selects(batch, tick)
+        if not mask.any():
+            return
+        if self.action == 'feed':
+            batch.feed(mask, self.food_type)
+        else:
+            getattr(batch, self.action)(mask)
+
+    def __str__(self):
+        action = f"{self.action} {self.food_type}" if self.food_type else self.action
+        if self.every is not None:
+            return f"{action} every {self.every} ticks"
+        if self.sick:
+            return f"{action} when sick"
+        return f"{action} when {self.meter} {self.op} {self.value}"
+
+
+class CarePolicy:
+    """An ordered list of care rules, applied to a whole batch between ticks."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+
+    @classmethod
+    def parse(cls, text):
+        parts = [part for part in re.split(r"[,;\n]", text) if part.strip()]
+        return cls(CareRule.parse(part) for part in parts)
+
+    def apply(self, batch, tick):
+        for rule in self.rules:
+            rule.apply(batch, tick)
+
+    def __str__(self):
+        return ", ".join(str(rule) for rule in self.rules) or "no care"
+
+
+def simulate(policy, size, ticks, seed, species='dog'):
+    """Runs `size` lifetimes under `policy`.
+
+    Returns two histograms: deaths[tick, cause], where cause 0 holds the pets
+    still alive at the end, and stages[cause, life stage reached].
+    """
+    batch = PetBatch.create(size, species, rng=np.random.default_rng(seed))
+    died_at = np.zeros(size, dtype=np.int32)
+    for tick in range(ticks):
+        policy.apply(batch, tick)
+        died = batch.tick()
+        died_at[died] = tick + 1
+        if not batch.alive.any():
+            break
+    died_at[batch.alive] = ticks
+    cause = batch.cause.astype(np.intp)
+    deaths = np.zeros((ticks + 1, len(CAUSES)), dtype=np.int64)
+    np.add.at(deaths, (died_at, cause), 1)
+    stages = np.zeros((len(CAUSES), len(Pet.LIFE_STAGES)), dtype=np.int64)
+    np.add.at(stages, (cause, batch.life_stage.astype(np.intp)), 1)
+    return deaths, stages
+
+
+def _simulate_chunk(task):
+    policy, size, ticks, seed, chunk, species = task
+    return simulate(policy, size, ticks, [seed, chunk], species)
+
+
+def _quantile(histogram, q):
+    """The tick at the q-th quantile of a deaths-per-tick histogram."""
+    cumulative = np.cumsum(histogram)
+    return int(np.searchsorted(cumulative, q * cumulative[-1]))
+
+
+def report(policy, deaths, stages, ticks):
+    """Summarizes the histograms collected so far into a JSON-friendly dict."""
+    lifetimes = int(deaths.sum())
+    dead_per_tick = deaths[:, 1:].sum(axis=1)
+    survival = 1 - np.cumsum(dead_per_tick) / lifetimes if lifetimes else np.ones(ticks + 1)
+    by_cause = {}
+    for i, cause in enumerate(CAUSES[1:], start=1):
+        count = int(deaths[:, i].sum())
+        if not count:
+            continue
+        by_cause[cause] = {
+            'deaths': count,
+            'mean_tick': float(np.dot(np.arange(ticks + 1), deaths[:, i]) / count),
+            'p10_tick': _quantile(deaths[:, i], 0.1),
+            'median_tick': _quantile(deaths[:, i], 0.5),
+            'p90_tick': _quantile(deaths[:, i], 0.9),
+            'life_stage': dict(zip(Pet.LIFE_STAGES, stages[i].tolist())),
+        }
+    return {
+        'policy': str(policy),
+        'lifetimes': lifetimes,
+        'ticks': ticks,
+        'alive_at_end': int(deaths[:, 0].sum()),
+        'survival': survival.tolist(),  # fraction still alive after each tick, index 0 = hatching
+        'time_to_death': by_cause,
+        'life_stage': dict(zip(Pet.LIFE_STAGES, stages.sum(axis=0).tolist())),
+    }
+
+
+def analyze(policy, lifetimes, ticks=MAX_TICKS, workers=None, seed=0, chunk_size=CHUNK_SIZE, species='dog'):
+    """Simulates `lifetimes` pets under `policy` in parallel, yielding the running report after every chunk.
+
+    Chunks are seeded by index, so the final report only depends on the seed and
+    the chunk size, not on the number of workers.
+    """
+    if isinstance(policy, str):
+        policy = CarePolicy.parse(policy)
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(chunk_size, lifetimes - start) for start in range(0, lifetimes, chunk_size)]
+    tasks = [(policy, size, ticks, seed, chunk, species) for chunk, size in enumerate(sizes)]
+    deaths = np.zeros((ticks + 1, len(CAUSES)), dtype=np.int64)
+    stages = np.zeros((len(CAUSES), len(Pet.LIFE_STAGES)), dtype=np.int64)
+    if workers == 1:
+        results = map(_simulate_chunk, tasks)
+        pool = None
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        pool = multiprocessing.get_context('fork' if 'fork' in methods else None).Pool(workers)
+        results = pool.imap_unordered(_simulate_chunk, tasks)
+    try:
+        for chunk_deaths, chunk_stages in results:
+            deaths += chunk_deaths
+            stages += chunk_stages
+            yield report(policy, deaths, stages, ticks)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def print_report(stats, elapsed):
+    print(f"Policy: {stats['policy']}")
+    print(f"{stats['lifetimes']} lifetimes in {elapsed:.1f} s, {stats['alive_at_end']} still alive "
+          f"after {stats['ticks']} ticks")
+    survival = stats['survival']
+    step = max(1, len(survival) // CURVE_POINTS)
+    print("Survival: " + "  ".join(f"{tick}:{survival[tick]:.3f}" for tick in range(0, len(survival), step)))
+    for cause, entry in stats['time_to_death'].items():
+        print(f"Died of {cause}: {entry['deaths']} (mean tick {entry['mean_tick']:.1f}, p10 {entry['p10_tick']}, "
+              f"median {entry['median_tick']}, p90 {entry['p90_tick']})")
+    print("Life stage reached: " + ", ".join(f"{stage} {count}" for stage, count in stats['life_stage'].items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo survival analysis of a pet care policy.")
+    parser.add_argument('policy', nargs='?', default='', help='e.g. "feed when hunger < 30, clean every 3 ticks"')
+    parser.add_argument('--lifetimes', type=int, default=200000)
+    parser.add_argument('--ticks', type=int, default=MAX_TICKS, help="censor lifetimes after this many ticks")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE, help="lifetimes per task")
+    parser.add_argument('--species', choices=registry.names(), default='dog')
+    parser.add_argument('--json', action='store_true', help="stream one JSON report per finished chunk")
+    args = parser.parse_args(argv)
+    try:
+        policy = CarePolicy.parse(args.policy)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    stats = None
+    for stats in analyze(policy, args.lifetimes, args.ticks, args.workers, args.seed, args.chunk, args.species):
+        if args.json:
+            print(json.dumps(stats), flush=True)
+        else:
+            print(f"\r{stats['lifetimes']}/{args.lifetimes} lifetimes", end='', file=sys.stderr, flush=True)
+    if not args.json:
+        print(file=sys.stderr)
+        if stats is not None:
+            print_report(stats, time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    main()